@@ -0,0 +1,19 @@
+# abgenesis - Headless AbGenesis 2.0 antibody design library
+from abgenesis.aggregates import DesignAggregates
+from abgenesis.cache import LRUCache
+from abgenesis.engine import AntibodyDesignEngine, design_id_for, spawn_design_seeds
+from abgenesis.store import DesignStore, DesignView
+from abgenesis.timing import StageTimings
+
+__version__ = '2.1.0'
+
+__all__ = [
+    'AntibodyDesignEngine',
+    'DesignAggregates',
+    'DesignStore',
+    'DesignView',
+    'LRUCache',
+    'StageTimings',
+    'design_id_for',
+    'spawn_design_seeds',
+]
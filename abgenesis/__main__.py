@@ -0,0 +1,130 @@
+# abgenesis/__main__.py - Batch design generation without Streamlit
+#
+# Usage:
+#   python -m abgenesis --antigen HER2 --count 1000000 --seed 42 --output her2.jsonl.gz
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from abgenesis.engine import AntibodyDesignEngine
+from abgenesis.export import COMPRESSIONS, EXPORT_FORMATS, guess_export_options, write_export
+from abgenesis.repository import DesignRepository
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        prog='python -m abgenesis',
+        description='Generate AbGenesis 2.0 antibody designs in batch and write them to disk.'
+    )
+    parser.add_argument('--antigen', required=True, help='Target antigen name')
+    parser.add_argument('--count', type=int, required=True, help='Number of designs to generate')
+    parser.add_argument('--seed', type=int, default=None, help='Master seed (random if omitted)')
+    parser.add_argument('--output', default=None, help='Output file, e.g. designs.jsonl or designs.csv.gz')
+    parser.add_argument('--db', default=None, help='SQLite design library to insert designs into')
+    parser.add_argument(
+        '--format', choices=sorted(EXPORT_FORMATS), default=None,
+        help='Output format (inferred from --output, default jsonl)'
+    )
+    parser.add_argument(
+        '--compression', choices=['none'] + sorted(COMPRESSIONS), default=None,
+        help='Output compression (inferred from --output)'
+    )
+    parser.add_argument(
+        '--params', default=None,
+        help='Design parameters as a JSON string or a path to a JSON file'
+    )
+    parser.add_argument(
+        '--length-sampling', choices=['natural', 'fixed'], default=None,
+        help='CDR length sampling (overrides --params)'
+    )
+    parser.add_argument(
+        '--epitope-weight', type=float, default=None,
+        help='Epitope weight (overrides --params)'
+    )
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--shard-size', type=int, default=256, help='Designs per worker task')
+    args = parser.parse_args(argv)
+    if args.output is None and args.db is None:
+        parser.error('at least one of --output or --db is required')
+    return args
+
+
+def load_params(args):
+    """Build the design parameter dict from --params and override flags"""
+    params = {'cdr_length_sampling': 'natural', 'epitope_weight': 0.3}
+    
+    if args.params:
+        if os.path.exists(args.params):
+            with open(args.params) as f:
+                params.update(json.load(f))
+        else:
+            params.update(json.loads(args.params))
+    
+    if args.length_sampling is not None:
+        params['cdr_length_sampling'] = args.length_sampling
+    if args.epitope_weight is not None:
+        params['epitope_weight'] = args.epitope_weight
+    
+    return params
+
+
+def main(argv=None):
+    """Run a batch design job"""
+    args = parse_args(argv)
+    params = load_params(args)
+    engine = AntibodyDesignEngine()
+    
+    # Pick and report a master seed so unseeded runs can still be replayed
+    seed = args.seed if args.seed is not None else np.random.SeedSequence().entropy
+    print(f"Master seed: {seed}", file=sys.stderr)
+    
+    repository = DesignRepository(args.db) if args.db else None
+    
+    start = time.perf_counter()
+    written = 0
+    
+    def designs():
+        nonlocal written
+        batch = []
+        for design in engine.iter_parallel(
+            args.antigen, params, args.count,
+            seed=seed, max_workers=args.workers, shard_size=args.shard_size,
+            skip=repository
+        ):
+            written += 1
+            if repository is not None:
+                batch.append(design)
+                if len(batch) >= 1000:
+                    repository.add_many(batch)
+                    batch = []
+            yield design
+        if batch:
+            repository.add_many(batch)
+    
+    if args.output:
+        guessed_format, guessed_compression = guess_export_options(args.output)
+        write_export(designs(), args.output, args.format or guessed_format, args.compression or guessed_compression)
+    else:
+        for _ in designs():
+            pass
+    
+    if repository is not None:
+        repository.close()
+    
+    elapsed = time.perf_counter() - start
+    print(
+        f"Wrote {written} designs for {args.antigen} to {', '.join(filter(None, [args.output, args.db]))} "
+        f"({args.count - written} duplicates skipped) "
+        f"in {elapsed:.1f}s ({args.count / max(elapsed, 1e-9):.0f} designs/s)",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
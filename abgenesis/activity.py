@@ -0,0 +1,90 @@
+# abgenesis/activity.py - Activity event log with per-day counters
+import json
+import threading
+from collections import Counter, deque
+from datetime import date, datetime, timedelta
+
+# Kinds of event the log accepts
+ACTIVITY_KINDS = ['design', 'commit', 'issue', 'repository', 'export', 'job', 'library']
+
+class ActivityLog:
+    """Activity events kept three ways
+    
+    The newest events stay in a ring buffer of size recent, every event is
+    appended as one JSON line to the segment file at path (when given), and
+    per-day counters by kind are updated as events arrive, so timelines
+    never rescan events. An existing segment is replayed once on open;
+    a torn last line is skipped. Safe to share across threads.
+    """
+    
+    def __init__(self, path=None, recent=500):
+        self.path = path
+        self._recent = deque(maxlen=recent)
+        self._daily = {}
+        self._lock = threading.Lock()
+        self._file = None
+        if path is not None:
+            torn = self._replay(path)
+            self._file = open(path, 'a', encoding='utf-8')
+            if torn:
+                self._file.write('\n')
+    
+    def _replay(self, path):
+        """Load a segment; returns True if it ends in a torn line"""
+        line = ''
+        try:
+            f = open(path, encoding='utf-8')
+        except FileNotFoundError:
+            return False
+        with f:
+            for line in f:
+                try:
+                    self._add(json.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return bool(line) and not line.endswith('\n')
+    
+    def _add(self, event):
+        day = self._daily.setdefault(event['time'][:10], Counter())
+        day[event['kind']] += event['count']
+        self._recent.append(event)
+    
+    def close(self):
+        """Close the segment file; later events are only kept in memory"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+    
+    def record(self, kind, message, count=1, owner=None):
+        """Log one event; count is what it adds to the day's counter for kind"""
+        if kind not in ACTIVITY_KINDS:
+            raise ValueError(f"Unknown activity kind: {kind}")
+        event = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'kind': kind,
+            'message': message,
+            'count': count,
+            'owner': owner
+        }
+        with self._lock:
+            self._add(event)
+            if self._file is not None:
+                self._file.write(json.dumps(event) + '\n')
+                self._file.flush()
+        return event
+    
+    def recent(self, limit=10, owner=None):
+        """Up to limit of the buffered events, newest first, optionally only one owner's"""
+        with self._lock:
+            events = list(self._recent)
+        events = [event for event in reversed(events) if owner is None or event['owner'] == owner]
+        return events[:limit]
+    
+    def daily_counts(self, kinds=ACTIVITY_KINDS, days=30, end=None):
+        """(dates, {kind: counts per date}) for the days days up to end (default today)"""
+        end = end or date.today()
+        dates = [end - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+        with self._lock:
+            daily = [self._daily.get(day.isoformat(), {}) for day in dates]
+            return dates, {kind: [counts.get(kind, 0) for counts in daily] for kind in kinds}
@@ -0,0 +1,210 @@
+# abgenesis/aggregates.py - Incrementally maintained design library statistics
+import heapq
+import math
+from collections import Counter
+
+SCORE_COMPONENTS = ['overall', 'physics', 'epitope', 'developability']
+
+def _score(design, component):
+    """A score component as a float (None when missing or not numeric)"""
+    try:
+        value = float(design.get('scores', {})[component])
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+    return None if math.isnan(value) else value
+
+def _h3_length(design):
+    h3 = design.get('cdrs', {}).get('H3')
+    return len(h3) if isinstance(h3, str) else None
+
+class _RunningMoments:
+    """Count, mean and variance with O(1) insert and delete (Welford)"""
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+    
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+    
+    def remove(self, value):
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        delta = value - self.mean
+        self.count -= 1
+        self.mean -= delta / self.count
+        self.m2 = max(self.m2 - delta * (value - self.mean), 0.0)
+    
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else math.nan
+
+class _TopK:
+    """The k largest values of a group under inserts and deletes
+    
+    The heap always holds the best len(heap) live entries; everything
+    outside it is no larger than its minimum. Deleting a heap entry only
+    shrinks the heap, and the refill callback is asked for the group's
+    best entries once it holds fewer than a query needs.
+    """
+    
+    def __init__(self, capacity, refill=None):
+        self.capacity = capacity
+        self.refill = refill
+        self.heap = []
+        self.members = set()
+        self.total = 0
+    
+    def add(self, key, value):
+        self.total += 1
+        entry = (value, key)
+        if len(self.heap) < self.capacity:
+            # Outside entries exist only after deletions; they cap what may join
+            if len(self.heap) == self.total - 1 or (self.heap and entry >= self.heap[0]):
+                heapq.heappush(self.heap, entry)
+                self.members.add(key)
+        elif entry > self.heap[0]:
+            _, dropped = heapq.heapreplace(self.heap, entry)
+            self.members.discard(dropped)
+            self.members.add(key)
+    
+    def remove(self, key, value):
+        self.total -= 1
+        if key in self.members:
+            self.members.discard(key)
+            self.heap.remove((value, key))
+            heapq.heapify(self.heap)
+    
+    def items(self, k):
+        """Up to k (value, key) pairs, best first"""
+        k = min(k, self.capacity)
+        if len(self.heap) < min(k, self.total) and self.refill is not None:
+            self.heap = [tuple(entry) for entry in self.refill(self.capacity)]
+            heapq.heapify(self.heap)
+            self.members = {key for _, key in self.heap}
+        return heapq.nlargest(k, self.heap)
+
+class _Group:
+    """Aggregates for one antigen (or the whole library)"""
+    
+    def __init__(self, antigen, top_k, refill):
+        self.count = 0
+        self.moments = {component: _RunningMoments() for component in SCORE_COMPONENTS}
+        self.top = {
+            component: _TopK(top_k, refill and (lambda k, c=component: refill(antigen, c, k)))
+            for component in SCORE_COMPONENTS
+        }
+        self.h3_lengths = Counter()
+
+class DesignAggregates:
+    """Per-antigen and library-wide statistics kept current on every change
+    
+    Counts, mean/variance of each score component, a top-k heap per
+    component and the CDR-H3 length histogram are updated in O(1) per
+    inserted or deleted design (O(k) when a top-k entry is deleted), so
+    reads never rescan the library. Keys identify designs for deletion;
+    refill(antigen, component, k) must return the best (value, key) pairs
+    of a group and is only needed when designs are deleted.
+    """
+    
+    def __init__(self, top_k=10, refill=None):
+        self.top_k = top_k
+        self.refill = refill
+        self.clear()
+    
+    def clear(self):
+        """Forget every design"""
+        self._library = _Group(None, self.top_k, self.refill)
+        self._groups = {}
+    
+    def _apply(self, design, key, sign):
+        antigen = design.get('antigen_name', '')
+        key = design.get('design_id') if key is None else key
+        group = self._groups.get(antigen)
+        if group is None:
+            if sign < 0:
+                return
+            group = self._groups[antigen] = _Group(antigen, self.top_k, self.refill)
+        
+        h3_length = _h3_length(design)
+        for target in (self._library, group):
+            target.count += sign
+            for component in SCORE_COMPONENTS:
+                value = _score(design, component)
+                if value is None:
+                    continue
+                if sign > 0:
+                    target.moments[component].add(value)
+                    target.top[component].add(key, value)
+                else:
+                    target.moments[component].remove(value)
+                    target.top[component].remove(key, value)
+            if h3_length is not None:
+                target.h3_lengths[h3_length] += sign
+                if target.h3_lengths[h3_length] <= 0:
+                    del target.h3_lengths[h3_length]
+        
+        if group.count <= 0:
+            del self._groups[antigen]
+    
+    def add(self, design, key=None):
+        """Fold in one design (key defaults to its design_id)"""
+        self._apply(design, key, 1)
+    
+    def remove(self, design, key=None):
+        """Take back a design previously added with the same key"""
+        self._apply(design, key, -1)
+    
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    
+    def _group(self, antigen):
+        if antigen is None:
+            return self._library
+        return self._groups.get(antigen) or _Group(antigen, self.top_k, None)
+    
+    @property
+    def antigens(self):
+        """Antigens with at least one design, in first-seen order"""
+        return list(self._groups)
+    
+    def count(self, antigen=None):
+        """Number of designs"""
+        return self._group(antigen).count
+    
+    def mean(self, component='overall', antigen=None):
+        """Mean of a score component (nan when empty)"""
+        moments = self._group(antigen).moments[component]
+        return moments.mean if moments.count else math.nan
+    
+    def variance(self, component='overall', antigen=None):
+        """Population variance of a score component (nan when empty)"""
+        return self._group(antigen).moments[component].variance
+    
+    def best(self, component='overall', antigen=None):
+        """Highest value of a score component (nan when empty)"""
+        items = self._group(antigen).top[component].items(1)
+        return items[0][0] if items else math.nan
+    
+    def top(self, k=None, component='overall', antigen=None):
+        """Up to k (at most top_k) best (value, key) pairs, best first"""
+        return self._group(antigen).top[component].items(self.top_k if k is None else k)
+    
+    def h3_length_stats(self, antigen=None):
+        """Count, mean, min and max CDR-H3 length"""
+        lengths = self._group(antigen).h3_lengths
+        total = sum(lengths.values())
+        if not total:
+            return {'count': 0, 'mean': math.nan, 'min': None, 'max': None}
+        return {
+            'count': total,
+            'mean': sum(length * n for length, n in lengths.items()) / total,
+            'min': min(lengths),
+            'max': max(lengths)
+        }
@@ -0,0 +1,205 @@
+# abgenesis/backup.py - Single-pass, disk-spooled multi-format ZIP backups
+import csv
+import io
+import json
+import shutil
+import tempfile
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from zipfile import ZIP_DEFLATED, ZipFile, ZipInfo
+
+from abgenesis.aggregates import DesignAggregates
+from abgenesis.export import CSV_COLUMNS, design_csv_row, design_fasta_record, export_metadata
+
+BACKUP_MEMBERS = {
+    'json': 'abgenesis_all_designs.json',
+    'csv': 'abgenesis_all_designs.csv',
+    'fasta': 'abgenesis_all_designs.fasta'
+}
+
+SUMMARY_MEMBER = 'SUMMARY.txt'
+
+# Members this large are written with ZIP64 headers (zipfile's own threshold)
+ZIP64_LIMIT = zipfile.ZIP64_LIMIT
+
+# ============================================================================
+# INCREMENTAL SUMMARY
+# ============================================================================
+
+class BackupSummary:
+    """SUMMARY.txt statistics, read from design aggregates"""
+    
+    def __init__(self, aggregates=None):
+        self.aggregates = aggregates if aggregates is not None else DesignAggregates()
+    
+    @property
+    def count(self):
+        return self.aggregates.count()
+    
+    def add(self, design):
+        """Fold one design into the running statistics"""
+        self.aggregates.add(design)
+    
+    def mean(self, key):
+        """Mean of a score component (nan when empty)"""
+        return self.aggregates.mean(key)
+    
+    def render(self, exported=None):
+        """Render the SUMMARY.txt report"""
+        exported = exported or datetime.now()
+        best = self.aggregates.best('overall')
+        h3_mean = self.aggregates.h3_length_stats()['mean']
+        
+        return f"""
+        AbGenesis 2.0 - Complete Export
+        ================================
+        
+        Export Date: {exported.strftime('%Y-%m-%d %H:%M:%S')}
+        Total Designs: {self.count}
+        Antigens: {', '.join(self.aggregates.antigens)}
+        
+        Design Statistics:
+        -----------------
+        Average Overall Score: {self.mean('overall'):.3f}
+        Best Overall Score: {best:.3f}
+        Average Physics Score: {self.mean('physics'):.3f}
+        Average Epitope Score: {self.mean('epitope'):.3f}
+        Average Developability Score: {self.mean('developability'):.3f}
+        
+        CDR Length Statistics:
+        ----------------------
+        Average CDR-H3 Length: {h3_mean:.1f}
+        """
+
+# ============================================================================
+# PARALLEL DEFLATE MEMBERS
+# ============================================================================
+
+class _DeflateMember:
+    """One ZIP member deflated chunk by chunk into its own spooled file
+    
+    Chunks are compressed on a worker thread (zlib releases the GIL); a new
+    chunk waits for the previous one so the deflate stream stays in order.
+    """
+    
+    def __init__(self, name, level, spool_size):
+        self.name = name
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        self.spool = tempfile.SpooledTemporaryFile(max_size=spool_size)
+        self.crc = 0
+        self.size = 0
+        self.compressed_size = 0
+        self.future = None
+    
+    def _compress(self, data):
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+        self.spool.write(self.compressor.compress(data))
+    
+    def feed(self, executor, text):
+        """Queue a text chunk for compression"""
+        data = text.encode('utf-8')
+        if self.future is not None:
+            self.future.result()
+        self.future = executor.submit(self._compress, data)
+    
+    def finish(self):
+        """Flush the deflate stream once the last chunk is compressed"""
+        if self.future is not None:
+            self.future.result()
+        self.spool.write(self.compressor.flush())
+        self.compressed_size = self.spool.tell()
+    
+    def copy_to(self, archive, moment):
+        """Append the already-deflated member to an open ZipFile and drop the spool"""
+        info = ZipInfo(self.name, moment.timetuple()[:6])
+        info.compress_type = ZIP_DEFLATED
+        info.external_attr = 0o600 << 16
+        info.CRC = self.crc
+        info.file_size = self.size
+        info.compress_size = self.compressed_size
+        
+        # zipfile has no call for precompressed data, so write the local
+        # header and data ourselves and let it emit the central directory
+        archive.fp.seek(archive.start_dir)
+        info.header_offset = archive.start_dir
+        archive.fp.write(info.FileHeader(zip64=max(self.size, self.compressed_size) >= ZIP64_LIMIT))
+        self.spool.seek(0)
+        shutil.copyfileobj(self.spool, archive.fp, 1 << 20)
+        self.spool.close()
+        archive.filelist.append(info)
+        archive.NameToInfo[info.filename] = info
+        archive.start_dir = archive.fp.tell()
+
+# ============================================================================
+# BACKUP WRITER
+# ============================================================================
+
+def write_backup(designs, target=None, level=6, chunk_size=1 << 18, spool_size=16 << 20, aggregates=None):
+    """Write JSON, CSV, FASTA and SUMMARY members in one pass over designs
+    
+    Each member is deflated on its own worker thread into its own
+    SpooledTemporaryFile while the next chunk is serialized, and the
+    summary is accumulated in the same pass unless the caller already
+    maintains aggregates for these designs. The compressed members are
+    then written into the archive in order. Returns the rewound target (a
+    SpooledTemporaryFile unless one is given) and the BackupSummary.
+    """
+    if target is None:
+        target = tempfile.SpooledTemporaryFile(max_size=spool_size)
+    
+    moment = datetime.now()
+    summary = BackupSummary(aggregates)
+    accumulate = aggregates is None
+    members = {key: _DeflateMember(name, level, spool_size) for key, name in BACKUP_MEMBERS.items()}
+    
+    csv_buffer = io.StringIO()
+    csv_writer = csv.writer(csv_buffer, lineterminator='\n')
+    csv_writer.writerow(CSV_COLUMNS)
+    
+    pending = {
+        'json': ['{"metadata": ' + json.dumps(export_metadata(len(designs) if hasattr(designs, '__len__') else None)) + ', "designs": ['],
+        'csv': [],
+        'fasta': []
+    }
+    pending_size = 0
+    separator = '\n'
+    
+    with ThreadPoolExecutor(max_workers=len(members)) as executor:
+        for design in designs:
+            if accumulate:
+                summary.add(design)
+            
+            json_text = separator + json.dumps(design)
+            separator = ',\n'
+            csv_writer.writerow(design_csv_row(design))
+            fasta_text = design_fasta_record(design)
+            
+            pending['json'].append(json_text)
+            pending['fasta'].append(fasta_text)
+            pending_size += len(json_text) + len(fasta_text)
+            
+            if pending_size >= chunk_size:
+                pending['csv'].append(csv_buffer.getvalue())
+                csv_buffer.seek(0)
+                csv_buffer.truncate()
+                for key, member in members.items():
+                    member.feed(executor, ''.join(pending[key]))
+                    pending[key] = []
+                pending_size = 0
+        
+        pending['json'].append('\n]}\n')
+        pending['csv'].append(csv_buffer.getvalue())
+        for key, member in members.items():
+            member.feed(executor, ''.join(pending[key]))
+        for member in members.values():
+            member.finish()
+    
+    with ZipFile(target, 'w', ZIP_DEFLATED, compresslevel=level) as archive:
+        for member in members.values():
+            member.copy_to(archive, moment)
+        archive.writestr(SUMMARY_MEMBER, summary.render(moment))
+    target.seek(0)
+    return target, summary
@@ -0,0 +1,341 @@
+# abgenesis/benchmark.py - Engine micro-benchmarks with regression tracking
+#
+# Usage:
+#   python -m abgenesis.benchmark --sizes 10,1000,100000 --output baseline.json
+#   python -m abgenesis.benchmark --sizes 10,1000,100000 --compare baseline.json
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from abgenesis import __version__
+from abgenesis.backup import write_backup
+from abgenesis.cache import LRUCache
+from abgenesis.engine import AntibodyDesignEngine
+from abgenesis.export import COMPRESSIONS, EXPORT_FORMATS, write_export
+from abgenesis.store import DesignStore
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+# Per-design stages, timed call by call
+DESIGN_STAGES = ['cdrs', 'assembly', 'scoring', 'analysis']
+
+# Metrics checked by --compare: name -> +1 if larger is worse, -1 if smaller is worse
+COMPARED_METRICS = {
+    'per_sec': -1,
+    'p95_us': 1,
+    'peak_bytes': 1
+}
+
+# Sizes below this are reported but too noisy to compare
+MIN_COMPARE_SIZE = 100
+
+
+class _NullSink:
+    """Binary file object that only counts what is written"""
+    
+    def __init__(self):
+        self.size = 0
+    
+    def write(self, data):
+        self.size += len(data)
+        return len(data)
+
+
+def export_targets():
+    """(stage name, fmt, compression) for every export format and compression"""
+    targets = []
+    for fmt in sorted(EXPORT_FORMATS):
+        for compression in [None] + sorted(COMPRESSIONS):
+            name = f"export_{fmt}" + (f"_{compression}" if compression else '')
+            targets.append((name, fmt, compression))
+    return targets
+
+
+def latency_summary(samples_ns):
+    """Throughput and latency percentiles from per-call times in nanoseconds"""
+    samples = np.asarray(samples_ns, dtype=np.float64) / 1000.0
+    seconds = samples.sum() / 1e6
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]) if len(samples) else (0.0, 0.0, 0.0)
+    return {
+        'count': len(samples),
+        'seconds': round(seconds, 6),
+        'per_sec': round(len(samples) / seconds, 1) if seconds > 0 else 0.0,
+        'mean_us': round(float(samples.mean()), 3) if len(samples) else 0.0,
+        'p50_us': round(float(p50), 3),
+        'p95_us': round(float(p95), 3),
+        'p99_us': round(float(p99), 3)
+    }
+
+
+def throughput_summary(count, seconds):
+    """Throughput of a bulk step over count designs"""
+    return {
+        'count': count,
+        'seconds': round(seconds, 6),
+        'per_sec': round(count / seconds, 1) if seconds > 0 else 0.0
+    }
+
+
+def measure_peak(func, *args):
+    """Run func(*args) under tracemalloc; returns (result, peak bytes allocated)"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        result = func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak - baseline
+
+
+# ============================================================================
+# STAGES
+# ============================================================================
+
+def time_design_stages(engine, antigen_name, params, n, seed):
+    """Per-call latencies of CDR generation, assembly, scoring and analysis"""
+    rng = np.random.default_rng(seed)
+    samples = {stage: np.empty(n, dtype=np.int64) for stage in DESIGN_STAGES}
+    clock = time.perf_counter_ns
+    
+    for i in range(n):
+        t0 = clock()
+        cdrs = engine._generate_cdrs(params, rng)
+        t1 = clock()
+        heavy_chain = engine._assemble_heavy_chain(cdrs)
+        light_chain = engine._assemble_light_chain(cdrs)
+        t2 = clock()
+        engine._calculate_scores(heavy_chain, light_chain, antigen_name, params, rng)
+        t3 = clock()
+        engine._physics_analysis(heavy_chain, light_chain, rng)
+        engine._developability_analysis(heavy_chain + light_chain, rng)
+        engine._epitope_compatibility(cdrs, antigen_name, rng)
+        t4 = clock()
+        
+        samples['cdrs'][i] = t1 - t0
+        samples['assembly'][i] = t2 - t1
+        samples['scoring'][i] = t3 - t2
+        samples['analysis'][i] = t4 - t3
+    
+    return {stage: latency_summary(samples[stage]) for stage in DESIGN_STAGES}
+
+
+def build_library(engine, antigen_name, params, n, seed):
+    """End-to-end batch generation into a DesignStore"""
+    store = DesignStore()
+    store.extend(engine.generate_batch(antigen_name, params, n, rng=np.random.default_rng(seed)))
+    return store
+
+
+def run_export(store, fmt, compression):
+    """Stream one export of the whole library; returns bytes written"""
+    return write_export(store, _NullSink(), fmt, compression)
+
+
+def run_backup(store):
+    """Write the zip backup of the whole library; returns its size in bytes"""
+    target, _ = write_backup(store, aggregates=store.stats)
+    try:
+        target.seek(0, os.SEEK_END)
+        return target.tell()
+    finally:
+        target.close()
+
+
+def benchmark_size(antigen_name, params, n, seed, memory=True, log=None):
+    """All stage results for one library size"""
+    # A fresh score cache per size keeps results independent of run order
+    engine = AntibodyDesignEngine(score_cache=LRUCache())
+    results = {}
+    
+    def note(message):
+        if log is not None:
+            log(f"[{n}] {message}")
+    
+    note("design stages")
+    results.update(time_design_stages(engine, antigen_name, params, n, seed))
+    
+    note("library build")
+    engine.score_cache.clear()
+    start = time.perf_counter()
+    store = build_library(engine, antigen_name, params, n, seed)
+    results['design'] = throughput_summary(n, time.perf_counter() - start)
+    
+    bulk_steps = [(name, run_export, (store, fmt, compression)) for name, fmt, compression in export_targets()]
+    bulk_steps.append(('backup', run_backup, (store,)))
+    for name, func, args in bulk_steps:
+        note(name)
+        start = time.perf_counter()
+        output_bytes = func(*args)
+        results[name] = throughput_summary(len(store), time.perf_counter() - start)
+        results[name]['output_bytes'] = output_bytes
+    
+    # tracemalloc slows allocation-heavy code, so peaks come from a second pass
+    if memory:
+        note("memory")
+        engine.score_cache.clear()
+        _, results['design']['peak_bytes'] = measure_peak(build_library, engine, antigen_name, params, n, seed)
+        for name, func, args in bulk_steps:
+            _, results[name]['peak_bytes'] = measure_peak(func, *args)
+    
+    return results
+
+
+def run_suite(sizes, antigen_name='HER2', params=None, seed=0, memory=True, log=None):
+    """Benchmark every stage at every size; returns the JSON-ready report"""
+    params = params or {'cdr_length_sampling': 'natural', 'epitope_weight': 0.3}
+    return {
+        'metadata': {
+            'created': datetime.now().isoformat(),
+            'version': __version__,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'antigen': antigen_name,
+            'params': params,
+            'seed': seed
+        },
+        'results': {
+            str(n): benchmark_size(antigen_name, params, n, seed, memory, log)
+            for n in sizes
+        }
+    }
+
+
+# ============================================================================
+# REPORTING
+# ============================================================================
+
+def compare_reports(current, baseline, threshold=0.15):
+    """Metrics that got worse than baseline by more than threshold (relative)"""
+    regressions = []
+    for size, stages in current['results'].items():
+        if int(size) < MIN_COMPARE_SIZE:
+            continue
+        for stage, metrics in stages.items():
+            before_metrics = baseline.get('results', {}).get(size, {}).get(stage)
+            if not before_metrics:
+                continue
+            for metric, direction in COMPARED_METRICS.items():
+                before, after = before_metrics.get(metric), metrics.get(metric)
+                if not before or after is None:
+                    continue
+                change = (after - before) / before
+                if change * direction > threshold:
+                    regressions.append({
+                        'size': int(size),
+                        'stage': stage,
+                        'metric': metric,
+                        'baseline': before,
+                        'current': after,
+                        'change': round(change, 4)
+                    })
+    return regressions
+
+
+def format_report(report):
+    """Plain-text table of a report"""
+    lines = []
+    header = f"{'size':>8}  {'stage':<24}{'per_sec':>12}{'p50_us':>10}{'p95_us':>10}{'p99_us':>10}{'peak_MB':>10}"
+    lines.append(header)
+    lines.append('-' * len(header))
+    for size, stages in report['results'].items():
+        for stage, metrics in stages.items():
+            peak = metrics.get('peak_bytes')
+            lines.append(
+                f"{size:>8}  {stage:<24}{metrics['per_sec']:>12,.0f}"
+                + ''.join(
+                    f"{metrics[key]:>10.1f}" if key in metrics else f"{'-':>10}"
+                    for key in ('p50_us', 'p95_us', 'p99_us')
+                )
+                + (f"{peak / 1e6:>10.2f}" if peak is not None else f"{'-':>10}")
+            )
+    return '\n'.join(lines)
+
+
+def format_regressions(regressions):
+    """Plain-text list of regressions"""
+    return '\n'.join(
+        f"REGRESSION {r['stage']} @ {r['size']}: {r['metric']} "
+        f"{r['baseline']} -> {r['current']} ({r['change']:+.1%})"
+        for r in regressions
+    )
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def parse_sizes(text):
+    """Comma-separated library sizes, e.g. 10,1000,1e6"""
+    try:
+        sizes = [int(float(part)) for part in text.split(',') if part.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid sizes: {text}")
+    if not sizes or min(sizes) < 1:
+        raise argparse.ArgumentTypeError("sizes must be positive integers")
+    return sizes
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        prog='python -m abgenesis.benchmark',
+        description='Benchmark AbGenesis 2.0 design stages and exports, and check for regressions.'
+    )
+    parser.add_argument(
+        '--sizes', type=parse_sizes, default=DEFAULT_SIZES,
+        help='Comma-separated library sizes (default: 10,100,1000,10000; up to 1e6)'
+    )
+    parser.add_argument('--antigen', default='HER2', help='Target antigen name')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for all generated designs')
+    parser.add_argument('--output', default=None, help='Write the results to this JSON baseline file')
+    parser.add_argument('--compare', default=None, help='Baseline JSON file to check the results against')
+    parser.add_argument(
+        '--threshold', type=float, default=0.15,
+        help='Relative change counted as a regression (default 0.15)'
+    )
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc peak memory pass')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmark suite; exits 1 when --compare finds regressions"""
+    args = parse_args(argv)
+    
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    
+    report = run_suite(
+        args.sizes, args.antigen, seed=args.seed, memory=not args.no_memory,
+        log=lambda message: print(message, file=sys.stderr)
+    )
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote baseline to {args.output}", file=sys.stderr)
+    
+    print(format_report(report))
+    
+    if baseline is not None:
+        regressions = compare_reports(report, baseline, args.threshold)
+        if regressions:
+            print(format_regressions(regressions))
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
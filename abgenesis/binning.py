@@ -0,0 +1,30 @@
+# abgenesis/binning.py - Histograms, 2-D density bins and downsampling for large plots
+import numpy as np
+
+def downsample(n, budget, seed=0):
+    """Sorted indices of at most budget of n points (all of them when n <= budget)
+    
+    Seeded, so the same library plots the same points on every rerun.
+    """
+    if n <= budget:
+        return np.arange(n)
+    return np.sort(np.random.default_rng(seed).choice(n, budget, replace=False))
+
+def histogram(values, bins=40):
+    """(bin centers, bin widths, counts) of the finite values"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return np.empty(0), np.empty(0), np.empty(0, dtype=np.int64)
+    counts, edges = np.histogram(values, bins=bins)
+    return (edges[:-1] + edges[1:]) / 2, np.diff(edges), counts
+
+def density_2d(x, y, bins=60):
+    """(x bin centers, y bin centers, counts[y, x]) of the points where both are finite"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = np.isfinite(x) & np.isfinite(y)
+    if not keep.any():
+        return np.empty(0), np.empty(0), np.empty((0, 0), dtype=np.int64)
+    counts, x_edges, y_edges = np.histogram2d(x[keep], y[keep], bins=bins)
+    return (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2, counts.T.astype(np.int64)
@@ -0,0 +1,59 @@
+# abgenesis/cache.py - Bounded LRU cache for deterministic score terms
+import threading
+from collections import OrderedDict
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with hit/miss counters
+    
+    When disabled, every lookup computes its value and nothing is stored
+    or counted.
+    """
+    
+    def __init__(self, maxsize=65536, enabled=True):
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def get_or_compute(self, key, compute, *args):
+        """Cached value for key, computing compute(*args) on a miss"""
+        if not self.enabled:
+            return compute(*args)
+        
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        
+        value = compute(*args)
+        with self._lock:
+            self._entries[key] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+    
+    def clear(self):
+        """Drop all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self):
+        """Hits, misses, hit rate and occupancy"""
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries),
+            'maxsize': self.maxsize
+        }
@@ -0,0 +1,204 @@
+# abgenesis/export.py - Streaming design export (JSON, JSON Lines, CSV, FASTA)
+import bz2
+import csv
+import io
+import json
+import lzma
+import tempfile
+import zlib
+from datetime import datetime
+
+# ============================================================================
+# PER-DESIGN SERIALIZERS
+# ============================================================================
+
+CSV_COLUMNS = [
+    'design_id',
+    'antigen',
+    'heavy_chain',
+    'light_chain',
+    'overall_score',
+    'physics_score',
+    'epitope_score',
+    'developability_score'
+]
+
+def design_csv_row(design):
+    """Flatten a design into a CSV row"""
+    return [
+        design['design_id'],
+        design['antigen_name'],
+        design['heavy_chain'],
+        design['light_chain'],
+        design['scores']['overall'],
+        design['scores']['physics'],
+        design['scores']['epitope'],
+        design['scores']['developability']
+    ]
+
+def design_fasta_record(design):
+    """Format a design as heavy and light FASTA records"""
+    return (
+        f">{design['design_id']}_heavy | {design['antigen_name']}\n"
+        f"{design['heavy_chain']}\n"
+        f">{design['design_id']}_light | {design['antigen_name']}\n"
+        f"{design['light_chain']}\n"
+    )
+
+def export_metadata(count=None):
+    """Metadata header shared by JSON exports"""
+    metadata = {
+        'exported': datetime.now().isoformat(),
+        'version': '2.1.0'
+    }
+    if count is not None:
+        metadata['count'] = count
+    return metadata
+
+# ============================================================================
+# TEXT CHUNK GENERATORS
+# ============================================================================
+
+def iter_jsonl(designs):
+    """Yield one JSON line per design"""
+    for design in designs:
+        yield json.dumps(design) + '\n'
+
+def iter_json(designs, metadata=None):
+    """Yield a {'metadata': ..., 'designs': [...]} document one design at a time"""
+    if metadata is None:
+        metadata = export_metadata(len(designs) if hasattr(designs, '__len__') else None)
+    
+    yield '{"metadata": ' + json.dumps(metadata) + ', "designs": ['
+    separator = '\n'
+    for design in designs:
+        yield separator + json.dumps(design)
+        separator = ',\n'
+    yield '\n]}\n'
+
+def iter_csv(designs):
+    """Yield a CSV header followed by one row per design"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    
+    writer.writerow(CSV_COLUMNS)
+    for design in designs:
+        writer.writerow(design_csv_row(design))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    
+    # Header only when there were no designs
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def iter_fasta(designs):
+    """Yield heavy and light FASTA records per design"""
+    for design in designs:
+        yield design_fasta_record(design)
+
+EXPORT_FORMATS = {
+    'json': {'extension': '.json', 'mime': 'application/json', 'writer': iter_json},
+    'jsonl': {'extension': '.jsonl', 'mime': 'application/x-ndjson', 'writer': iter_jsonl},
+    'csv': {'extension': '.csv', 'mime': 'text/csv', 'writer': iter_csv},
+    'fasta': {'extension': '.fasta', 'mime': 'text/plain', 'writer': iter_fasta}
+}
+
+# ============================================================================
+# COMPRESSION AND BYTE STREAMS
+# ============================================================================
+
+COMPRESSIONS = {
+    'gzip': {
+        'extension': '.gz',
+        'mime': 'application/gzip',
+        # wbits=31 selects gzip framing
+        'compressor': lambda: zlib.compressobj(6, zlib.DEFLATED, 31)
+    },
+    'bz2': {'extension': '.bz2', 'mime': 'application/x-bzip2', 'compressor': bz2.BZ2Compressor},
+    'lzma': {'extension': '.xz', 'mime': 'application/x-xz', 'compressor': lzma.LZMACompressor}
+}
+
+def _check_export(fmt, compression):
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if compression not in (None, 'none') and compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression}")
+
+def iter_export(designs, fmt='jsonl', compression=None, chunk_size=1 << 16):
+    """Yield encoded (and optionally compressed) export chunks
+    
+    Text from the per-design generators is buffered up to chunk_size
+    characters before encoding, so memory use does not grow with the
+    number of designs.
+    """
+    _check_export(fmt, compression)
+    compressor = COMPRESSIONS[compression]['compressor']() if compression in COMPRESSIONS else None
+    
+    def emit(text):
+        data = text.encode('utf-8')
+        return compressor.compress(data) if compressor is not None else data
+    
+    pending = []
+    pending_size = 0
+    for text in EXPORT_FORMATS[fmt]['writer'](designs):
+        pending.append(text)
+        pending_size += len(text)
+        if pending_size >= chunk_size:
+            chunk = emit(''.join(pending))
+            pending = []
+            pending_size = 0
+            if chunk:
+                yield chunk
+    
+    chunk = emit(''.join(pending))
+    if compressor is not None:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+def write_export(designs, target, fmt='jsonl', compression=None):
+    """Stream an export to a path or binary file object; returns bytes written"""
+    if isinstance(target, (str, bytes)) or hasattr(target, '__fspath__'):
+        with open(target, 'wb') as f:
+            return write_export(designs, f, fmt, compression)
+    
+    written = 0
+    for chunk in iter_export(designs, fmt, compression):
+        target.write(chunk)
+        written += len(chunk)
+    return written
+
+def spool_export(designs, fmt='jsonl', compression=None, max_size=8 << 20):
+    """Stream an export into a rewound SpooledTemporaryFile"""
+    spool = tempfile.SpooledTemporaryFile(max_size=max_size)
+    write_export(designs, spool, fmt, compression)
+    spool.seek(0)
+    return spool
+
+def export_filename(base, fmt, compression=None):
+    """File name with the format and compression extensions"""
+    name = base + EXPORT_FORMATS[fmt]['extension']
+    if compression in COMPRESSIONS:
+        name += COMPRESSIONS[compression]['extension']
+    return name
+
+def export_mime(fmt, compression=None):
+    """MIME type for an export"""
+    if compression in COMPRESSIONS:
+        return COMPRESSIONS[compression]['mime']
+    return EXPORT_FORMATS[fmt]['mime']
+
+def guess_export_options(path):
+    """Infer (fmt, compression) from a file name such as designs.csv.gz"""
+    compression = None
+    for name, info in COMPRESSIONS.items():
+        if path.endswith(info['extension']):
+            compression = name
+            path = path[:-len(info['extension'])]
+            break
+    
+    for name, info in EXPORT_FORMATS.items():
+        if path.endswith(info['extension']):
+            return name, compression
+    return 'jsonl', compression
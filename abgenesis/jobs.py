@@ -0,0 +1,223 @@
+# abgenesis/jobs.py - Background design jobs with progress, partial results and cancellation
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+ACTIVE_STATES = ('queued', 'running')
+
+class JobCancelled(Exception):
+    """Raised inside a job function once the job has been asked to stop"""
+
+class Job:
+    """A submitted run: state, progress and the results produced so far
+    
+    The job function reports through update() and add_results() and calls
+    check_cancelled() between steps; readers on other threads only see
+    copies taken under the job's lock. Results are held only until their
+    reader drains them, so a finished job does not pin its designs.
+    """
+    
+    def __init__(self, label, owner=None):
+        self.id = uuid.uuid4().hex[:8]
+        self.label = label
+        self.owner = owner
+        self.state = 'queued'
+        self.done = 0
+        self.total = None
+        self.message = ''
+        self.error = None
+        self.created = datetime.now()
+        self.started = None
+        self.finished = None
+        self.future = None
+        self._published = 0
+        self._results = []
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+    
+    # ------------------------------------------------------------------
+    # Job side
+    # ------------------------------------------------------------------
+    
+    def update(self, done=None, total=None, message=None):
+        """Report progress"""
+        with self._lock:
+            if done is not None:
+                self.done = done
+            if total is not None:
+                self.total = total
+            if message is not None:
+                self.message = message
+    
+    def add_results(self, items):
+        """Publish results as they are produced"""
+        with self._lock:
+            self._results.extend(items)
+            self._published += len(items)
+    
+    def check_cancelled(self):
+        """Raise JobCancelled if cancel() was called"""
+        if self._cancel.is_set():
+            raise JobCancelled()
+    
+    # ------------------------------------------------------------------
+    # Reader side
+    # ------------------------------------------------------------------
+    
+    @property
+    def active(self):
+        return self.state in ACTIVE_STATES
+    
+    @property
+    def progress(self):
+        """Fraction done in [0, 1] (0 until a total is known)"""
+        with self._lock:
+            return min(1.0, self.done / self.total) if self.total else 0.0
+    
+    @property
+    def result_count(self):
+        """Results published so far, drained or not"""
+        with self._lock:
+            return self._published
+    
+    def results(self):
+        """Published results not drained yet"""
+        with self._lock:
+            return list(self._results)
+    
+    def drain_results(self):
+        """Take every published result not drained yet; the job stops holding them"""
+        with self._lock:
+            results, self._results = self._results, []
+        return results
+    
+    def cancel(self):
+        """Ask the job to stop at its next check (a queued job never starts)"""
+        self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            self.state = 'cancelled'
+            self.finished = datetime.now()
+
+class JobRunner:
+    """Thread pool that runs jobs and remembers the most recent ones
+    
+    Jobs outlive the script run (and browser session) that submitted them;
+    finished jobs beyond keep are forgotten oldest first.
+    """
+    
+    def __init__(self, max_workers=2, keep=50):
+        self.keep = keep
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='design-job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, label, func, *args, owner=None, **kwargs):
+        """Run func(job, *args, **kwargs) in the background; returns the Job"""
+        job = Job(label, owner)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+    
+    def _run(self, job, func, args, kwargs):
+        if job._cancel.is_set():
+            job.state = 'cancelled'
+            job.finished = datetime.now()
+            return
+        job.state = 'running'
+        job.started = datetime.now()
+        try:
+            func(job, *args, **kwargs)
+            job.state = 'completed'
+        except JobCancelled:
+            job.state = 'cancelled'
+        except Exception as error:
+            job.error = str(error)
+            job.state = 'failed'
+        finally:
+            job.finished = datetime.now()
+    
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if not job.active]
+        for job in finished[:max(0, len(self._jobs) - self.keep)]:
+            del self._jobs[job.id]
+    
+    def get(self, job_id):
+        """The job with this ID, or None once forgotten"""
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def jobs(self, owner=None):
+        """Known jobs, newest first, optionally only one owner's"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job for job in reversed(jobs) if owner is None or job.owner == owner]
+    
+    def shutdown(self, wait=True):
+        """Cancel every job and stop the pool"""
+        for job in self.jobs():
+            job.cancel()
+        self._executor.shutdown(wait=wait)
+
+# ============================================================================
+# DESIGN RUNS
+# ============================================================================
+
+# Generation modes a design job can run
+DESIGN_RUN_MODES = ['optimized', 'ensemble', 'batch']
+
+def design_run(job, engine, antigen_name, params, n, mode='batch', diversity=0.5,
+               chunk_size=500, skip=None, sink=None):
+    """Job function generating designs with one of the engine's modes
+    
+    'batch' samples in chunks of chunk_size and is the mode for large
+    runs: each chunk is published, passed to sink (e.g. a repository's
+    add_many) and followed by a cancellation check, so a cancelled run
+    keeps what it already made. 'optimized' reports and checks once per
+    GA generation. Each job uses its own random stream. Returns the designs.
+    """
+    if mode not in DESIGN_RUN_MODES:
+        raise ValueError(f"Unknown design run mode: {mode}")
+    rng = np.random.default_rng()
+    
+    def publish(designs):
+        if sink is not None:
+            sink(designs)
+        job.add_results(designs)
+    
+    if mode == 'batch':
+        made = []
+        job.update(done=0, total=n, message='Sampling designs')
+        for start in range(0, n, chunk_size):
+            job.check_cancelled()
+            designs = engine.generate_batch(antigen_name, params, min(chunk_size, n - start), rng=rng, skip=skip)
+            publish(designs)
+            made.extend(designs)
+            job.update(done=min(n, start + chunk_size), message=f"{len(made)} new designs")
+        return made
+    
+    if mode == 'optimized':
+        def progress(generation, generations, best_fitness):
+            job.check_cancelled()
+            job.update(
+                done=generation, total=generations,
+                message=f"Generation {generation}/{generations} · best expected score {best_fitness:.3f}"
+            )
+        
+        designs = engine.optimize_designs(antigen_name, params, n, rng=rng, skip=skip, progress=progress)
+    else:
+        job.update(done=0, total=1, message='Selecting a diverse ensemble')
+        designs = engine.generate_ensemble(antigen_name, params, n, diversity=diversity, rng=rng, skip=skip)
+        job.check_cancelled()
+        job.update(done=1)
+    
+    publish(designs)
+    if mode == 'ensemble' and len(designs) < n:
+        job.update(message=f"{len(designs)} of {n} candidates meet the {diversity:.2f} diversity threshold")
+    else:
+        job.update(message=f"{len(designs)} new designs")
+    return designs
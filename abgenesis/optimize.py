@@ -0,0 +1,386 @@
+# abgenesis/optimize.py - CDR sequence optimizers
+import numpy as np
+
+from abgenesis.scoring import sequence_scores
+
+CDR_TYPES = ['H1', 'H2', 'H3', 'L1', 'L2', 'L3']
+
+# Chain layout: framework regions and CDR loops in sequence order
+CHAIN_LAYOUT = [
+    'heavy_fr1', 'H1', 'heavy_fr2', 'H2', 'heavy_fr3', 'H3', 'heavy_fr4',
+    'light_fr1', 'L1', 'light_fr2', 'L2', 'light_fr3', 'L3', 'light_fr4'
+]
+
+# Optimization level -> (population size, generations)
+OPTIMIZATION_BUDGETS = {
+    'fast': (32, 10),
+    'balanced': (96, 30),
+    'thorough': (256, 80),
+    'exhaustive': (1024, 300)
+}
+
+# ============================================================================
+# ENCODED CDR POPULATIONS
+# ============================================================================
+
+class CDRPopulation:
+    """CDR sets as one padded residue-code matrix and length vector per loop"""
+    
+    def __init__(self, loops, lengths):
+        self.loops = loops
+        self.lengths = lengths
+    
+    @classmethod
+    def from_cdr_sets(cls, engine, cdr_sets):
+        """Encode a list of CDR dicts"""
+        loops, lengths = {}, {}
+        for cdr_type in CDR_TYPES:
+            loops[cdr_type], lengths[cdr_type] = engine.encode_sequences([cdrs[cdr_type] for cdrs in cdr_sets])
+        return cls(loops, lengths)
+    
+    def __len__(self):
+        return len(self.lengths[CDR_TYPES[0]])
+    
+    def take(self, rows):
+        """Population of the given rows"""
+        return CDRPopulation(
+            {cdr_type: loop[rows] for cdr_type, loop in self.loops.items()},
+            {cdr_type: length[rows] for cdr_type, length in self.lengths.items()}
+        )
+    
+    def joined(self):
+        """All loops side by side as one (n, total width) code matrix"""
+        return np.concatenate([self.loops[cdr_type] for cdr_type in CDR_TYPES], axis=1)
+    
+    def keys(self):
+        """Hashable per-row keys (identical CDR sets share a key)"""
+        return [row.tobytes() for row in self.joined()]
+    
+    def cdr_sets(self, engine, rows=None):
+        """Decode rows back into CDR dicts"""
+        alphabet = np.frombuffer((engine.amino_acids + 'X').encode('ascii'), dtype=np.uint8)
+        rows = range(len(self)) if rows is None else rows
+        decoded = {
+            cdr_type: alphabet[self.loops[cdr_type]].view(f'S{self.loops[cdr_type].shape[1]}').ravel()
+            for cdr_type in CDR_TYPES if self.loops[cdr_type].shape[1]
+        }
+        return [
+            {
+                cdr_type: decoded[cdr_type][row][:self.lengths[cdr_type][row]].decode('ascii')
+                if cdr_type in decoded else ''
+                for cdr_type in CDR_TYPES
+            }
+            for row in rows
+        ]
+    
+    def assemble(self, engine):
+        """Encoded heavy + light chains for every row, as encode_sequences returns"""
+        n = len(self)
+        blocks, masks = [], []
+        for region in CHAIN_LAYOUT:
+            if region in self.loops:
+                block = self.loops[region]
+                masks.append(np.arange(block.shape[1]) < self.lengths[region][:, None])
+            else:
+                block = np.broadcast_to(engine.encode_sequence(engine.frameworks[region]), (n, len(engine.frameworks[region])))
+                masks.append(np.ones(block.shape, dtype=bool))
+            blocks.append(block)
+        
+        wide = np.concatenate(blocks, axis=1)
+        mask = np.concatenate(masks, axis=1)
+        lengths = mask.sum(axis=1)
+        
+        # Scatter the kept residues of each row to the front of that row
+        encoded = np.full((n, int(lengths.max()) if n else 0), engine.pad_code, dtype=np.uint8)
+        rows, _ = np.nonzero(mask)
+        columns = (np.cumsum(mask, axis=1) - 1)[mask]
+        encoded[rows, columns] = wide[mask]
+        return encoded, lengths
+
+def population_fitness(engine, population, weights):
+    """Expected overall score of each row, ignoring the stochastic terms
+    
+    The epitope score and the random physics component do not depend on
+    the sequence, so ranking by the weighted deterministic terms ranks by
+    expected overall score.
+    """
+    physics, developability = engine.sequence_terms_batch(*population.assemble(engine))
+    return weights['physics'] * np.minimum(physics, 1.0) + weights['developability'] * developability
+
+def select_diverse(population, pad_code, k, min_distance=0.0, fitness=None):
+    """Greedy max-min selection of up to k rows at least min_distance apart
+    
+    Distance is the fraction of aligned CDR positions that differ, where a
+    residue against loop padding counts as different and padding against
+    padding is ignored. Starts from the fittest row (or row 0), then keeps
+    adding the row farthest from everything selected so far, with fitness
+    only breaking ties, until k rows are chosen or the farthest row is
+    closer than min_distance. Returns the selected row indices.
+    """
+    codes = np.ascontiguousarray(population.joined())
+    n = len(codes)
+    if n == 0 or k <= 0:
+        return np.empty(0, dtype=np.int64)
+    
+    residue = codes != pad_code
+    
+    def distances(row):
+        compared = residue | residue[row]
+        differing = (codes != codes[row]) & compared
+        return differing.sum(axis=1) / np.maximum(compared.sum(axis=1), 1)
+    
+    # Fitness in [0, 1e-9) can only reorder rows at equal distance
+    tie_break = np.zeros(n)
+    if fitness is not None:
+        spread = np.ptp(fitness)
+        tie_break = (fitness - fitness.min()) / spread * 1e-9 if spread > 0 else tie_break
+    
+    first = int(np.argmax(fitness)) if fitness is not None else 0
+    selected = [first]
+    nearest = distances(first)
+    nearest[first] = -np.inf
+    
+    while len(selected) < k:
+        candidate = int(np.argmax(nearest + tie_break))
+        if nearest[candidate] < min_distance:
+            break
+        selected.append(candidate)
+        nearest = np.minimum(nearest, distances(candidate))
+        nearest[candidate] = -np.inf
+    
+    return np.array(selected, dtype=np.int64)
+
+# ============================================================================
+# GENETIC ALGORITHM
+# ============================================================================
+
+class GeneticOptimizer:
+    """Genetic algorithm over CDR sets
+    
+    Each generation is scored as one vectorized batch. The best rows
+    survive unchanged (elitism); children take each CDR loop whole from
+    one of two tournament-selected parents and then receive point
+    mutations within their loop lengths.
+    """
+    
+    def __init__(self, engine, params, rng=None, population_size=96, generations=30,
+                 elite_fraction=0.1, mutation_rate=0.04, tournament_size=3):
+        self.engine = engine
+        self.params = params
+        self.rng = rng if rng is not None else engine.rng
+        self.population_size = max(2, population_size)
+        self.generations = generations
+        self.elite_count = max(1, int(round(elite_fraction * self.population_size)))
+        self.mutation_rate = mutation_rate
+        self.tournament_size = tournament_size
+        self.weights = engine._score_weights(params)
+    
+    @classmethod
+    def for_level(cls, engine, params, rng=None, level=None):
+        """Optimizer sized by an optimization level ('fast' ... 'exhaustive')"""
+        level = (level or params.get('optimization_level') or 'balanced').lower()
+        population_size, generations = OPTIMIZATION_BUDGETS.get(level, OPTIMIZATION_BUDGETS['balanced'])
+        return cls(engine, params, rng, population_size=population_size, generations=generations)
+    
+    def _select(self, fitness, count):
+        """Tournament selection: indices of count winners"""
+        entrants = self.rng.integers(0, len(fitness), (count, self.tournament_size))
+        return entrants[np.arange(count), np.argmax(fitness[entrants], axis=1)]
+    
+    def _breed(self, population, fitness, count):
+        """Children by loop-wise crossover and point mutation"""
+        first = self._select(fitness, count)
+        second = self._select(fitness, count)
+        from_first = self.rng.random((count, len(CDR_TYPES))) < 0.5
+        
+        loops, lengths = {}, {}
+        for index, cdr_type in enumerate(CDR_TYPES):
+            pick = from_first[:, index]
+            loop = np.where(pick[:, None], population.loops[cdr_type][first], population.loops[cdr_type][second])
+            length = np.where(pick, population.lengths[cdr_type][first], population.lengths[cdr_type][second])
+            
+            # Point mutations, only inside each child's loop
+            mutate = (self.rng.random(loop.shape) < self.mutation_rate) & (np.arange(loop.shape[1]) < length[:, None])
+            loop[mutate] = self.rng.integers(0, self.engine.pad_code, int(mutate.sum()), dtype=np.uint8)
+            
+            loops[cdr_type], lengths[cdr_type] = loop, length
+        return CDRPopulation(loops, lengths)
+    
+    def run(self, keep=1, progress=None):
+        """Evolve a population and return the best keep distinct CDR sets
+        
+        Returns (cdr_sets, fitness) sorted best first. progress, if given,
+        is called as progress(generation, generations, best_fitness).
+        """
+        initial = self.engine._generate_cdrs_batch(self.params, self.population_size, self.rng)
+        population = CDRPopulation.from_cdr_sets(self.engine, initial)
+        fitness = population_fitness(self.engine, population, self.weights)
+        
+        # Best distinct CDR sets seen in any generation
+        archive = {}
+        
+        def record(population, fitness):
+            best = np.argsort(fitness)[::-1][:keep]
+            for row, key in zip(best.tolist(), population.take(best).keys()):
+                if key not in archive:
+                    archive[key] = (float(fitness[row]), population.take([row]))
+            if len(archive) > 4 * keep:
+                for key, _ in sorted(archive.items(), key=lambda item: item[1][0])[:len(archive) - keep]:
+                    del archive[key]
+        
+        record(population, fitness)
+        for generation in range(self.generations):
+            elite = np.argsort(fitness)[::-1][:self.elite_count]
+            children = self._breed(population, fitness, self.population_size - len(elite))
+            
+            population = CDRPopulation(
+                {t: np.concatenate([population.loops[t][elite], children.loops[t]]) for t in CDR_TYPES},
+                {t: np.concatenate([population.lengths[t][elite], children.lengths[t]]) for t in CDR_TYPES}
+            )
+            fitness = np.concatenate([fitness[elite], population_fitness(self.engine, children, self.weights)])
+            record(population, fitness)
+            
+            if progress is not None:
+                progress(generation + 1, self.generations, float(fitness.max()))
+        
+        ranked = sorted(archive.values(), key=lambda entry: entry[0], reverse=True)[:keep]
+        return (
+            [member.cdr_sets(self.engine)[0] for _, member in ranked],
+            [score for score, _ in ranked]
+        )
+
+# ============================================================================
+# SIMULATED ANNEALING
+# ============================================================================
+
+class AnnealingSampler:
+    """Metropolis sampler over CDR residues with a cooling schedule
+    
+    Keeps running sums of hydrophobicity, charge, cysteine and proline
+    counts and aggregation motif hits for the assembled chains, so a
+    point mutation is scored in O(1) plus one check per motif window that
+    uses the old or new residue at the mutated position, instead of
+    reassembling and rescanning both chains.
+    """
+    
+    def __init__(self, engine, params, rng=None, t_start=0.02, t_end=1e-4, chunk_size=8192):
+        self.engine = engine
+        self.params = params
+        self.rng = rng if rng is not None else engine.rng
+        self.t_start = t_start
+        self.t_end = t_end
+        self.chunk_size = chunk_size
+        self.weights = engine._score_weights(params)
+        
+        # Windows to check per residue code: (motif codes, offset of that code)
+        self.motifs = [tuple(engine.encode_sequence(motif).tolist()) for motif in engine.aggregation_motifs]
+        self.motif_offsets = [[] for _ in range(engine.pad_code + 1)]
+        for motif in self.motifs:
+            for offset, code in enumerate(motif):
+                self.motif_offsets[code].append((motif, offset))
+    
+    def _layout(self, cdrs):
+        """Full heavy + light code list and the (start, length) of each CDR"""
+        codes, spans = [], {}
+        for region in CHAIN_LAYOUT:
+            sequence = cdrs[region] if region in cdrs else self.engine.frameworks[region]
+            if region in cdrs:
+                spans[region] = (len(codes), len(sequence))
+            codes.extend(self.engine.encode_sequence(sequence).tolist())
+        return codes, spans
+    
+    def _motif_hit(self, codes, start, motif):
+        if start < 0 or start + len(motif) > len(codes):
+            return False
+        for offset, code in enumerate(motif):
+            if codes[start + offset] != code:
+                return False
+        return True
+    
+    def run(self, cdrs, steps=100000):
+        """Anneal from a CDR dict; returns (best cdrs, best fitness, accepted moves)"""
+        engine = self.engine
+        codes, spans = self._layout(cdrs)
+        n = len(codes)
+        positions = [start + i for start, length in spans.values() for i in range(length)]
+        if not positions or not n:
+            return dict(cdrs), float('nan'), 0
+        
+        hydrophobicity = engine.property_table[:, 0].tolist()
+        charge = engine.property_table[:, 1].tolist()
+        cys_code = int(engine.aa_codes[ord('C')])
+        pro_code = int(engine.aa_codes[ord('P')])
+        w_physics = self.weights['physics']
+        w_developability = self.weights['developability']
+        
+        # Running sums
+        hydro_sum = sum(hydrophobicity[code] for code in codes)
+        charge_sum = sum(charge[code] for code in codes)
+        cys_count = codes.count(cys_code)
+        pro_count = codes.count(pro_code)
+        motif_hits = sum(
+            self._motif_hit(codes, start, motif)
+            for motif in self.motifs for start in range(n - len(motif) + 1)
+        )
+        
+        def fitness(hydro_sum, charge_sum, cys_count, pro_count, motif_hits):
+            physics, developability = sequence_scores(
+                (hydro_sum / n + 4.5) / 9.0, charge_sum, n, cys_count, pro_count / n, motif_hits
+            )
+            return w_physics * min(physics, 1.0) + w_developability * developability
+        
+        current = fitness(hydro_sum, charge_sum, cys_count, pro_count, motif_hits)
+        best, best_codes = current, list(codes)
+        accepted = 0
+        motif_offsets = self.motif_offsets
+        motif_hit = self._motif_hit
+        cooling = np.log(self.t_end / self.t_start) / max(steps, 1)
+        
+        for chunk_start in range(0, steps, self.chunk_size):
+            count = min(self.chunk_size, steps - chunk_start)
+            picks = self.rng.integers(0, len(positions), count).tolist()
+            residues = self.rng.integers(0, engine.pad_code, count).tolist()
+            thresholds = np.log(self.rng.random(count)) * (
+                self.t_start * np.exp(cooling * np.arange(chunk_start, chunk_start + count))
+            )
+            
+            for pick, new, threshold in zip(picks, residues, thresholds.tolist()):
+                position = positions[pick]
+                old = codes[position]
+                if new == old:
+                    continue
+                
+                # Incremental update of every running sum
+                lost = 0
+                for motif, offset in motif_offsets[old]:
+                    lost += motif_hit(codes, position - offset, motif)
+                codes[position] = new
+                gained = 0
+                for motif, offset in motif_offsets[new]:
+                    gained += motif_hit(codes, position - offset, motif)
+                
+                proposal = (
+                    hydro_sum + hydrophobicity[new] - hydrophobicity[old],
+                    charge_sum + charge[new] - charge[old],
+                    cys_count + (new == cys_code) - (old == cys_code),
+                    pro_count + (new == pro_code) - (old == pro_code),
+                    motif_hits + gained - lost
+                )
+                score = fitness(*proposal)
+                
+                # Metropolis: accept when delta >= T * log(u)
+                if score - current >= threshold:
+                    hydro_sum, charge_sum, cys_count, pro_count, motif_hits = proposal
+                    current = score
+                    accepted += 1
+                    if current > best:
+                        best, best_codes = current, list(codes)
+                else:
+                    codes[position] = old
+        
+        alphabet = engine.amino_acids + 'X'
+        refined = {
+            cdr_type: ''.join(alphabet[code] for code in best_codes[start:start + length])
+            for cdr_type, (start, length) in spans.items()
+        }
+        return refined, best, accepted
@@ -0,0 +1,110 @@
+# abgenesis/pareto.py - Multi-objective (Pareto) ranking of designs
+from bisect import bisect_left
+
+import numpy as np
+
+PARETO_OBJECTIVES = ['physics', 'epitope', 'developability']
+
+def non_dominated_sort(values):
+    """Pareto front index of every row (0 = non-dominated), all objectives maximized
+    
+    values is an (n, 2) or (n, 3) array. Identical rows share a front.
+    Rows are swept in descending lexicographic order, so every dominator
+    of a row is visited before it. Each front keeps only its 2-D staircase
+    over the last two objectives, and a row's front is found by binary
+    search over fronts (a row dominated by front f is also dominated by
+    front f - 1). Runs in O(n log n log f) for f fronts instead of the
+    O(n^2) of pairwise dominance checks.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim != 2 or values.shape[1] not in (2, 3):
+        raise ValueError("non_dominated_sort expects an (n, 2) or (n, 3) array")
+    if values.shape[1] == 2:
+        values = np.column_stack([values, np.zeros(len(values))])
+    if not len(values):
+        return np.empty(0, dtype=np.int64)
+    
+    unique, inverse = np.unique(values, axis=0, return_inverse=True)
+    order = np.lexsort((-unique[:, 2], -unique[:, 1], -unique[:, 0]))
+    
+    # Per front: staircase x (ascending) with y (descending)
+    fronts_x, fronts_y = [], []
+    ranks = np.empty(len(unique), dtype=np.int64)
+    
+    for row, x, y in zip(order.tolist(), unique[order, 1].tolist(), unique[order, 2].tolist()):
+        low, high = 0, len(fronts_x)
+        while low < high:
+            middle = (low + high) // 2
+            xs = fronts_x[middle]
+            i = bisect_left(xs, x)
+            if i < len(xs) and fronts_y[middle][i] >= y:
+                low = middle + 1
+            else:
+                high = middle
+        ranks[row] = low
+        
+        if low == len(fronts_x):
+            fronts_x.append([x])
+            fronts_y.append([y])
+            continue
+        
+        # Insert into the front's staircase, dropping points it now covers
+        xs, ys = fronts_x[low], fronts_y[low]
+        i = bisect_left(xs, x)
+        end = i + 1 if i < len(xs) and xs[i] == x else i
+        start = i
+        while start > 0 and ys[start - 1] <= y:
+            start -= 1
+        xs[start:end] = [x]
+        ys[start:end] = [y]
+    
+    return ranks[inverse.ravel()]
+
+def crowding_distance(values, ranks):
+    """NSGA-II crowding distance of every row within its front
+    
+    Boundary rows of each objective get inf; larger means more isolated.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n, m = values.shape
+    distance = np.zeros(n)
+    if not n:
+        return distance
+    
+    for column in range(m):
+        order = np.lexsort((values[:, column], ranks))
+        sorted_values = values[order, column]
+        sorted_ranks = ranks[order]
+        
+        first = np.ones(n, dtype=bool)
+        first[1:] = sorted_ranks[1:] != sorted_ranks[:-1]
+        last = np.ones(n, dtype=bool)
+        last[:-1] = sorted_ranks[1:] != sorted_ranks[:-1]
+        
+        # Objective span of each row's front
+        front_ids = np.cumsum(first) - 1
+        span = (sorted_values[last] - sorted_values[first])[front_ids]
+        
+        gap = np.zeros(n)
+        interior = ~(first | last)
+        gap[interior] = sorted_values[2:][interior[1:-1]] - sorted_values[:-2][interior[1:-1]]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            gap = np.where(span > 0, gap / span, 0.0)
+        gap[first | last] = np.inf
+        
+        distance[order] += gap
+    return distance
+
+def pareto_rank(store, objectives=PARETO_OBJECTIVES):
+    """(front index, crowding distance) arrays for every row of a DesignStore
+    
+    Missing scores count as 0.
+    """
+    values = np.nan_to_num(np.column_stack([store.column(name) for name in objectives]), nan=0.0)
+    ranks = non_dominated_sort(values)
+    return ranks, crowding_distance(values, ranks)
+
+def front_rows(ranks, crowding, front):
+    """Rows on one front, most isolated first"""
+    rows = np.flatnonzero(ranks == front)
+    return rows[np.argsort(-crowding[rows], kind='stable')]
@@ -0,0 +1,372 @@
+# abgenesis/push.py - Batched, asynchronous design commits to GitHub (or a local stub)
+#
+# Usage (stub server for testing):
+#   python -m abgenesis.push --port 8765
+#   ABGENESIS_GITHUB_API=http://127.0.0.1:8765 streamlit run streamlit_app.py
+import argparse
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# How a run's designs are laid out in its commit
+PUSH_LAYOUTS = {
+    'files': 'One JSON file per design',
+    'jsonl': 'One JSONL file per run'
+}
+
+def commit_files(designs, layout='files', directory='designs'):
+    """{path: text} of every file in the commit for a run's designs"""
+    if layout not in PUSH_LAYOUTS:
+        raise ValueError(f"Unknown push layout: {layout}")
+    designs = list(designs)
+    
+    if layout == 'files':
+        return {
+            f"{directory}/{design.get('antigen_name', 'unknown')}/{design['design_id']}.json":
+                json.dumps(design, indent=2, default=str) + '\n'
+            for design in designs
+        }
+    
+    # Name the run file by its content so re-pushing a run overwrites it
+    text = ''.join(json.dumps(design, default=str) + '\n' for design in designs)
+    digest = hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+    return {f"{directory}/runs/{datetime.now():%Y%m%d_%H%M%S}_{digest}.jsonl": text}
+
+def git_blob_sha(content):
+    """Git object ID of a blob with this content"""
+    data = content.encode('utf-8')
+    return hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+
+# ============================================================================
+# TRANSPORTS
+# ============================================================================
+
+class SimulatedTransport:
+    """In-process stand-in for the GitHub API with one round trip per commit"""
+    
+    def __init__(self, latency=0.5):
+        self.latency = latency
+    
+    def commit(self, repo, files, message, branch='main'):
+        """Pretend to commit files; returns a commit SHA"""
+        time.sleep(self.latency)
+        tree = json.dumps(sorted((path, git_blob_sha(text)) for path, text in files.items()))
+        return hashlib.sha1(f"{repo}\0{branch}\0{message}\0{tree}".encode('utf-8')).hexdigest()
+
+class GitHubTransport:
+    """Git Data API client that writes any number of files as one commit
+    
+    Blobs are uploaded concurrently (at most blob_workers at a time), then
+    a single tree, commit and branch update are made on top of the
+    branch head. Works against api.github.com or StubGitHubServer.
+    """
+    
+    def __init__(self, base_url='https://api.github.com', token=None, blob_workers=4, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.blob_workers = blob_workers
+        self.timeout = timeout
+    
+    def _request(self, method, path, payload=None):
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method)
+        request.add_header('Accept', 'application/vnd.github+json')
+        if data is not None:
+            request.add_header('Content-Type', 'application/json')
+        if self.token:
+            request.add_header('Authorization', f'Bearer {self.token}')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read() or b'null')
+        except urllib.error.HTTPError as error:
+            raise RuntimeError(f"{method} {path} failed with HTTP {error.code}") from error
+    
+    def commit(self, repo, files, message, branch='main'):
+        """Commit files on top of branch; returns the new commit SHA"""
+        git = f"/repos/{repo}/git"
+        head = self._request('GET', f"{git}/ref/heads/{branch}")['object']['sha']
+        base_tree = self._request('GET', f"{git}/commits/{head}")['tree']['sha']
+        
+        paths = list(files)
+        with ThreadPoolExecutor(max_workers=self.blob_workers) as executor:
+            blob_shas = list(executor.map(
+                lambda path: self._request('POST', f"{git}/blobs", {'content': files[path], 'encoding': 'utf-8'})['sha'],
+                paths
+            ))
+        
+        tree = self._request('POST', f"{git}/trees", {
+            'base_tree': base_tree,
+            'tree': [
+                {'path': path, 'mode': '100644', 'type': 'blob', 'sha': sha}
+                for path, sha in zip(paths, blob_shas)
+            ]
+        })['sha']
+        commit = self._request('POST', f"{git}/commits", {
+            'message': message,
+            'tree': tree,
+            'parents': [head]
+        })['sha']
+        self._request('PATCH', f"{git}/refs/heads/{branch}", {'sha': commit})
+        return commit
+
+# ============================================================================
+# BACKGROUND PUSHER
+# ============================================================================
+
+class DesignPusher:
+    """Pushes each run's designs as one commit on background threads
+    
+    At most max_workers commits are in flight; later pushes queue behind
+    them. Commits to the same branch are serialized, since each one is
+    built on the branch head. push() returns immediately with a Future,
+    and the optional callback receives the result dict on the worker
+    thread.
+    """
+    
+    def __init__(self, transport, max_workers=2):
+        self.transport = transport
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='design-push')
+        self._branch_locks = {}
+        self._lock = threading.Lock()
+    
+    def _branch_lock(self, repo, branch):
+        with self._lock:
+            return self._branch_locks.setdefault((repo, branch), threading.Lock())
+    
+    def push(self, repo, designs, message, branch='main', layout='files', callback=None):
+        """Queue one commit of designs; returns a Future of the result dict"""
+        designs = list(designs)
+        future = self._executor.submit(self._push, repo, designs, message, branch, layout)
+        if callback is not None:
+            future.add_done_callback(lambda done: callback(done.result()))
+        return future
+    
+    def _push(self, repo, designs, message, branch, layout):
+        start = time.perf_counter()
+        result = {
+            'repo': repo,
+            'branch': branch,
+            'designs': len(designs),
+            'files': 0,
+            'commit': None,
+            'error': None
+        }
+        try:
+            files = commit_files(designs, layout)
+            result['files'] = len(files)
+            with self._branch_lock(repo, branch):
+                result['commit'] = self.transport.commit(repo, files, message, branch)
+        except Exception as error:
+            result['error'] = str(error)
+        result['seconds'] = time.perf_counter() - start
+        return result
+    
+    def shutdown(self, wait=True):
+        """Stop accepting pushes, optionally waiting for queued ones"""
+        self._executor.shutdown(wait=wait)
+
+# ============================================================================
+# LOCAL STUB SERVER
+# ============================================================================
+
+_ROUTE = re.compile(r'^/repos/(?P<repo>[^/]+/[^/]+)/git/(?P<kind>refs?/heads|blobs|trees|commits)(?:/(?P<name>.+))?$')
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+    
+    def _reply(self, status, body=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _handle(self, method):
+        match = _ROUTE.match(self.path)
+        if match is None:
+            return self._reply(404, {'message': 'Not Found'})
+        length = int(self.headers.get('Content-Length') or 0)
+        payload = json.loads(self.rfile.read(length)) if length else None
+        if self.server.stub.latency:
+            time.sleep(self.server.stub.latency)
+        status, body = self.server.stub.handle(method, match['repo'], match['kind'], match['name'], payload)
+        self._reply(status, body)
+    
+    def do_GET(self):
+        self._handle('GET')
+    
+    def do_POST(self):
+        self._handle('POST')
+    
+    def do_PATCH(self):
+        self._handle('PATCH')
+
+class StubGitHubServer:
+    """In-memory HTTP server for the Git Data API calls GitHubTransport makes
+    
+    Repositories are created on first use with an empty root commit on
+    main. latency adds a delay to every request to mimic the network.
+    """
+    
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0):
+        self.latency = latency
+        self.repos = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _StubHandler)
+        self._server.stub = self
+        self._thread = None
+    
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self):
+        """Serve on a daemon thread; returns the base URL"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+    
+    def serve_forever(self):
+        """Serve on the calling thread until interrupted"""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+    
+    def stop(self):
+        """Shut down a server started with start()"""
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def _repo(self, name):
+        repo = self.repos.get(name)
+        if repo is None:
+            root_tree = self._object_sha('tree', {})
+            root = self._object_sha('commit', [root_tree, [], 'Initial commit'])
+            repo = self.repos[name] = {
+                'refs': {'main': root},
+                'commits': {root: {'tree': root_tree, 'parents': [], 'message': 'Initial commit'}},
+                'trees': {root_tree: {}},
+                'blobs': {}
+            }
+        return repo
+    
+    @staticmethod
+    def _object_sha(kind, content):
+        return hashlib.sha1(f"{kind}\0{json.dumps(content, sort_keys=True)}".encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def _descends(state, sha, ancestor):
+        pending = [sha]
+        while pending:
+            sha = pending.pop()
+            if sha == ancestor:
+                return True
+            pending.extend(state['commits'][sha]['parents'])
+        return False
+    
+    def files(self, repo, branch='main'):
+        """{path: text} at the head of a branch"""
+        with self._lock:
+            state = self._repo(repo)
+            tree = state['trees'][state['commits'][state['refs'][branch]]['tree']]
+            return {path: state['blobs'][sha] for path, sha in tree.items()}
+    
+    def log(self, repo, branch='main'):
+        """Commit messages on a branch, newest first"""
+        with self._lock:
+            state = self._repo(repo)
+            messages = []
+            sha = state['refs'].get(branch)
+            while sha:
+                commit = state['commits'][sha]
+                messages.append(commit['message'])
+                sha = commit['parents'][0] if commit['parents'] else None
+            return messages
+    
+    def handle(self, method, repo, kind, name, payload):
+        """(status, body) for one API call"""
+        with self._lock:
+            state = self._repo(repo)
+            
+            if kind in ('ref/heads', 'refs/heads'):
+                if method == 'PATCH':
+                    if payload['sha'] not in state['commits']:
+                        return 422, {'message': 'Object does not exist'}
+                    if name in state['refs'] and not self._descends(state, payload['sha'], state['refs'][name]):
+                        return 422, {'message': 'Update is not a fast forward'}
+                    state['refs'][name] = payload['sha']
+                if name not in state['refs']:
+                    return 404, {'message': 'Not Found'}
+                return 200, {'ref': f"refs/heads/{name}", 'object': {'sha': state['refs'][name], 'type': 'commit'}}
+            
+            if kind == 'blobs' and method == 'POST':
+                sha = git_blob_sha(payload['content'])
+                state['blobs'][sha] = payload['content']
+                return 201, {'sha': sha}
+            
+            if kind == 'trees' and method == 'POST':
+                entries = dict(state['trees'].get(payload.get('base_tree'), {}))
+                for entry in payload['tree']:
+                    if entry['sha'] not in state['blobs']:
+                        return 422, {'message': f"Blob {entry['sha']} does not exist"}
+                    entries[entry['path']] = entry['sha']
+                sha = self._object_sha('tree', entries)
+                state['trees'][sha] = entries
+                return 201, {'sha': sha}
+            
+            if kind == 'commits' and method == 'POST':
+                if payload['tree'] not in state['trees']:
+                    return 422, {'message': 'Tree does not exist'}
+                sha = self._object_sha('commit', [payload['tree'], payload['parents'], payload['message']])
+                state['commits'][sha] = {
+                    'tree': payload['tree'],
+                    'parents': payload['parents'],
+                    'message': payload['message']
+                }
+                return 201, {'sha': sha}
+            
+            if kind == 'commits' and method == 'GET' and name in state['commits']:
+                commit = state['commits'][name]
+                return 200, {'sha': name, 'tree': {'sha': commit['tree']}, 'message': commit['message']}
+            
+            return 404, {'message': 'Not Found'}
+
+def main(argv=None):
+    """Run the stub server until interrupted"""
+    parser = argparse.ArgumentParser(
+        prog='python -m abgenesis.push',
+        description='Serve an in-memory stand-in for the GitHub Git Data API.'
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--latency', type=float, default=0.0, help='Delay added to every request (seconds)')
+    args = parser.parse_args(argv)
+    
+    server = StubGitHubServer(args.host, args.port, args.latency)
+    print(f"Stub GitHub API listening on {server.url}", file=sys.stderr)
+    server.serve_forever()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
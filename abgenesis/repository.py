@@ -0,0 +1,197 @@
+# abgenesis/repository.py - Persistent SQLite design repository
+import json
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS designs (
+    design_id TEXT PRIMARY KEY,
+    antigen_name TEXT NOT NULL,
+    created TEXT NOT NULL,
+    overall REAL,
+    physics REAL,
+    epitope REAL,
+    developability REAL,
+    h3_length INTEGER,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_designs_antigen_created ON designs (antigen_name, created);
+CREATE INDEX IF NOT EXISTS idx_designs_created ON designs (created);
+CREATE INDEX IF NOT EXISTS idx_designs_overall ON designs (overall);
+CREATE INDEX IF NOT EXISTS idx_designs_antigen_overall ON designs (antigen_name, overall);
+"""
+
+# Sort keys accepted by page(); rowid breaks ties in insertion order
+ORDERINGS = {
+    'created': 'created {direction}, rowid {direction}',
+    'overall': 'overall {direction}, rowid {direction}'
+}
+
+def _design_row(design):
+    scores = design.get('scores', {})
+    return (
+        design['design_id'],
+        design['antigen_name'],
+        design.get('metadata', {}).get('created', ''),
+        scores.get('overall'),
+        scores.get('physics'),
+        scores.get('epitope'),
+        scores.get('developability'),
+        len(design.get('cdrs', {}).get('H3', '')),
+        json.dumps(design)
+    )
+
+class DesignRepository:
+    """SQLite-backed design library with paged queries
+    
+    Uses WAL mode so readers in other sessions are not blocked by bulk
+    inserts. One connection is shared across threads behind a lock.
+    """
+    
+    def __init__(self, path='abgenesis_designs.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+    
+    def close(self):
+        """Close the underlying connection"""
+        with self._lock:
+            self._conn.close()
+    
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    
+    def add(self, design):
+        """Insert one design unless its ID is already stored"""
+        return self.add_many([design])
+    
+    def add_many(self, designs, batch_size=1000):
+        """Insert designs whose IDs are not yet stored, one transaction per batch
+        
+        Returns the number of rows actually inserted.
+        """
+        written = 0
+        batch = []
+        for design in designs:
+            batch.append(_design_row(design))
+            if len(batch) >= batch_size:
+                written += self._insert(batch)
+                batch = []
+        if batch:
+            written += self._insert(batch)
+        return written
+    
+    def _insert(self, rows):
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                'INSERT OR IGNORE INTO designs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows
+            )
+        return cursor.rowcount
+    
+    def delete(self, design_ids):
+        """Delete designs by ID; returns the number removed"""
+        with self._lock, self._conn:
+            cursor = self._conn.executemany(
+                'DELETE FROM designs WHERE design_id = ?', [(design_id,) for design_id in design_ids]
+            )
+        return cursor.rowcount
+    
+    def clear(self):
+        """Delete every design"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM designs')
+    
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    
+    def _fetch(self, sql, args=()):
+        with self._lock:
+            return self._conn.execute(sql, args).fetchall()
+    
+    def __contains__(self, design_id):
+        return bool(self._fetch('SELECT 1 FROM designs WHERE design_id = ?', (design_id,)))
+    
+    def count(self, antigen=None):
+        """Number of designs, optionally for one antigen"""
+        if antigen is None:
+            return self._fetch('SELECT COUNT(*) FROM designs')[0][0]
+        return self._fetch('SELECT COUNT(*) FROM designs WHERE antigen_name = ?', (antigen,))[0][0]
+    
+    def antigens(self):
+        """Distinct antigens in the library"""
+        return [row[0] for row in self._fetch('SELECT DISTINCT antigen_name FROM designs ORDER BY antigen_name')]
+    
+    def get(self, design_id):
+        """One design by ID (None if absent)"""
+        rows = self._fetch('SELECT payload FROM designs WHERE design_id = ?', (design_id,))
+        return json.loads(rows[0][0]) if rows else None
+    
+    def page(self, limit=50, offset=0, antigen=None, order_by='created', descending=True):
+        """One page of designs, sorted by creation time or overall score"""
+        if order_by not in ORDERINGS:
+            raise ValueError(f"Unknown ordering: {order_by}")
+        
+        where, args = ('WHERE antigen_name = ?', [antigen]) if antigen is not None else ('', [])
+        order = ORDERINGS[order_by].format(direction='DESC' if descending else 'ASC')
+        rows = self._fetch(
+            f'SELECT payload FROM designs {where} ORDER BY {order} LIMIT ? OFFSET ?',
+            args + [limit, offset]
+        )
+        return [json.loads(row[0]) for row in rows]
+    
+    def recent(self, limit=10, antigen=None):
+        """Most recently created designs, newest first"""
+        return self.page(limit, antigen=antigen, order_by='created')
+    
+    def top(self, limit=50, antigen=None):
+        """Best designs by overall score"""
+        return self.page(limit, antigen=antigen, order_by='overall')
+    
+    def iter_designs(self, antigen=None, page_size=1000):
+        """Stream designs oldest first, paging by (created, rowid) keyset"""
+        last = None
+        while True:
+            clauses, args = [], []
+            if antigen is not None:
+                clauses.append('antigen_name = ?')
+                args.append(antigen)
+            if last is not None:
+                clauses.append('(created, rowid) > (?, ?)')
+                args.extend(last)
+            where = 'WHERE ' + ' AND '.join(clauses) if clauses else ''
+            rows = self._fetch(
+                f'SELECT created, rowid, payload FROM designs {where} ORDER BY created, rowid LIMIT ?',
+                args + [page_size]
+            )
+            for row in rows:
+                yield json.loads(row[2])
+            if len(rows) < page_size:
+                return
+            last = rows[-1][:2]
+    
+    def query(self, antigen=None, page_size=1000):
+        """Lazy, sized view over matching designs for streaming exports"""
+        return DesignQuery(self, antigen, page_size)
+
+class DesignQuery:
+    """Sized iterable over a repository query, loaded page by page"""
+    
+    def __init__(self, repository, antigen=None, page_size=1000):
+        self.repository = repository
+        self.antigen = antigen
+        self.page_size = page_size
+    
+    def __len__(self):
+        return self.repository.count(self.antigen)
+    
+    def __bool__(self):
+        return len(self) > 0
+    
+    def __iter__(self):
+        return self.repository.iter_designs(self.antigen, self.page_size)
@@ -0,0 +1,34 @@
+# abgenesis/scoring.py - Sequence-dependent physics and developability score terms
+import numpy as np
+
+def sequence_scores(hydrophobicity, net_charge, length, cys_count, pro_content, motif_count):
+    """(physics base, developability) of a chain from its sequence terms
+    
+    hydrophobicity is the mean residue hydrophobicity normalized to [0, 1],
+    pro_content the proline fraction and motif_count the number of
+    aggregation motif hits. Takes scalars or equal-length arrays; the
+    scalar, batch and annealing scorers all go through here.
+    """
+    # Builtin min/max are far cheaper than numpy ufuncs on single numbers
+    minimum, maximum = (np.minimum, np.maximum) if isinstance(hydrophobicity, np.ndarray) else (min, max)
+    
+    physics = (
+        0.5 +
+        # Hydrophobicity balance
+        0.2 * (1.0 - abs(hydrophobicity - 0.5)) +
+        # Charge balance
+        0.15 * (1.0 - minimum(1.0, abs(net_charge) / 5)) +
+        # Length appropriate
+        0.15 * (1.0 - minimum(1.0, abs(length - 220) / 100))
+    )
+    
+    developability = (
+        0.6
+        # Aggregation propensity
+        - 0.1 * minimum(2, motif_count)
+        # Cysteine count: 2-6 suits disulfide bonds, more is too many
+        + 0.1 * ((cys_count >= 2) & (cys_count <= 6)) - 0.1 * (cys_count > 6)
+        # Proline content (stability)
+        + 0.1 * ((pro_content >= 0.04) & (pro_content <= 0.08))
+    )
+    return physics, minimum(1.0, maximum(0.0, developability))
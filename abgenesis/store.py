@@ -0,0 +1,474 @@
+# abgenesis/store.py - Columnar in-memory design store
+import hashlib
+import json
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from abgenesis.aggregates import DesignAggregates
+from abgenesis.engine import DESIGN_ID_PREFIX
+
+CDR_TYPES = ['H1', 'H2', 'H3', 'L1', 'L2', 'L3']
+
+# Sequence parts kept in the byte side table, in storage order
+SEQUENCE_PARTS = ['heavy_chain', 'light_chain'] + CDR_TYPES
+
+# Numeric columns: name -> (design section, key, dtype)
+NUMERIC_COLUMNS = {
+    'overall': ('scores', 'overall', np.float64),
+    'physics': ('scores', 'physics', np.float64),
+    'epitope': ('scores', 'epitope', np.float64),
+    'developability': ('scores', 'developability', np.float64),
+    'binding_energy': ('physics_analysis', 'binding_energy', np.float64),
+    'interface_area': ('physics_analysis', 'interface_area', np.float64),
+    'hydrogen_bonds': ('physics_analysis', 'hydrogen_bonds', np.int32),
+    'shape_complementarity': ('physics_analysis', 'shape_complementarity', np.float64),
+    'electrostatic_complementarity': ('physics_analysis', 'electrostatic_complementarity', np.float64),
+    'solubility': ('developability', 'solubility', np.float64),
+    'aggregation_score': ('developability', 'aggregation_score', np.float64),
+    'thermal_stability': ('developability', 'thermal_stability', np.float64),
+    'expression_titer': ('developability', 'expression_titer', np.float64),
+    'immunogenicity_risk': ('developability', 'immunogenicity_risk', np.float64),
+    'paratope_residues': ('epitope_compatibility', 'paratope_residues', np.int32),
+    'complementarity_score': ('epitope_compatibility', 'complementarity_score', np.float64),
+    'predicted_affinity': ('epitope_compatibility', 'predicted_affinity', np.float64),
+    'epitope_coverage': ('epitope_compatibility', 'epitope_coverage', np.float64)
+}
+
+# Exact key layout of an engine design, used to decide if a design can be
+# stored columnar and to rebuild it in the same key order
+_SECTION_KEYS = {
+    section: [key for sec, key, _ in NUMERIC_COLUMNS.values() if sec == section]
+    for section in ['scores', 'physics_analysis', 'developability', 'epitope_compatibility']
+}
+_DESIGN_KEYS = [
+    'design_id', 'antigen_name', 'heavy_chain', 'light_chain', 'cdrs', 'scores',
+    'metadata', 'physics_analysis', 'developability', 'epitope_compatibility'
+]
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_MISSING_SEED = np.iinfo(np.uint64).max
+
+class _GrowableArray:
+    """NumPy array with amortized O(1) appends"""
+    
+    def __init__(self, dtype, tail=(), capacity=64):
+        self.data = np.empty((capacity,) + tail, dtype=dtype)
+        self.size = 0
+    
+    def append(self, value):
+        if self.size == len(self.data):
+            grown = np.empty((2 * len(self.data),) + self.data.shape[1:], dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size] = value
+        self.size += 1
+    
+    def view(self):
+        return self.data[:self.size]
+
+class _Interner:
+    """Maps repeated JSON-serializable values to small integer codes"""
+    
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+    
+    def code(self, value):
+        key = json.dumps(value)
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes[key] = len(self.values)
+            self.values.append(key)
+        return code
+    
+    def value(self, code):
+        # Decode on every call so callers never share mutable state
+        return json.loads(self.values[code])
+
+class DesignStore:
+    """Columnar store for antibody designs
+    
+    Scores, physics, developability and epitope metrics live in contiguous
+    NumPy columns, sequences in one ASCII byte buffer, and repeated values
+    (antigens, params, weights, versions) are interned. Iterating or
+    indexing the store materializes ordinary design dicts on request, so it
+    can stand in for the old list of dicts. Designs that do not match the
+    engine layout are kept verbatim alongside the columns. Summary
+    statistics are kept current in `stats` as designs are added.
+    
+    `version` goes up with every change and never goes back, and
+    `fingerprint` is a running hash of the design IDs in order, so
+    `cache_key` identifies the contents without touching the designs.
+    """
+    
+    def __init__(self, designs=None):
+        self.version = 0
+        self.clear()
+        if designs:
+            self.extend(designs)
+    
+    def clear(self):
+        """Remove all designs"""
+        self.version += 1
+        self._digest = hashlib.blake2b(digest_size=16)
+        self.stats = DesignAggregates(refill=self._top_rows)
+        self._ids = []
+        self._id_to_row = {}
+        self._sorted_ids = []
+        self._antigens = []
+        self._antigen_codes = {}
+        self._antigen_rows = {}
+        self._antigen_column = _GrowableArray(np.int32)
+        self._numeric = {name: _GrowableArray(dtype) for name, (_, _, dtype) in NUMERIC_COLUMNS.items()}
+        self._sequences = bytearray()
+        self._seq_starts = _GrowableArray(np.int64)
+        self._seq_lengths = _GrowableArray(np.int32, (len(SEQUENCE_PARTS),))
+        self._created = _GrowableArray(np.int64)
+        self._seeds = _GrowableArray(np.uint64)
+        self._params = _Interner()
+        self._weights = _Interner()
+        self._versions = _Interner()
+        self._meta_codes = _GrowableArray(np.int32, (3,))
+        self._verbatim = {}
+    
+    # ------------------------------------------------------------------
+    # List-compatible interface
+    # ------------------------------------------------------------------
+    
+    def __len__(self):
+        return len(self._ids)
+    
+    def __bool__(self):
+        return bool(self._ids)
+    
+    def __contains__(self, design_id):
+        return design_id in self._id_to_row
+    
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self.design(row)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.design(row) for row in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('design index out of range')
+        return self.design(index)
+    
+    def append(self, design):
+        """Add one design; a design ID already stored keeps its row"""
+        design_id = design.get('design_id', '')
+        if design_id in self._id_to_row:
+            return self._id_to_row[design_id]
+        
+        row = len(self._ids)
+        antigen = design.get('antigen_name', '')
+        
+        # Index columns
+        self.version += 1
+        self._digest.update(str(design_id).encode('utf-8', 'replace') + b'\n')
+        self._ids.append(design_id)
+        self._id_to_row[design_id] = row
+        code = self._antigen_codes.get(antigen)
+        if code is None:
+            code = self._antigen_codes[antigen] = len(self._antigens)
+            self._antigens.append(antigen)
+            self._antigen_rows[antigen] = _GrowableArray(np.int64)
+        self._antigen_column.append(code)
+        self._antigen_rows[antigen].append(row)
+        
+        # Numeric columns (NaN/0 where a value is missing or not numeric)
+        for name, (section, key, dtype) in NUMERIC_COLUMNS.items():
+            value = design.get(section, {}).get(key)
+            try:
+                value = dtype(value)
+            except (TypeError, ValueError, OverflowError):
+                value = np.nan if dtype == np.float64 else 0
+            self._numeric[name].append(value)
+        
+        # Sequence side table
+        cdrs = design.get('cdrs', {})
+        parts = [design.get('heavy_chain', ''), design.get('light_chain', '')] + [cdrs.get(t, '') for t in CDR_TYPES]
+        parts = [part if isinstance(part, str) else '' for part in parts]
+        self._seq_starts.append(len(self._sequences))
+        self._seq_lengths.append([len(part) for part in parts])
+        self._sequences += ''.join(parts).encode('ascii', 'replace')
+        
+        # Interned metadata, or the whole design when it does not fit the layout
+        metadata = design.get('metadata', {})
+        seed = metadata.get('seed')
+        try:
+            created = (datetime.fromisoformat(metadata['created']) - _EPOCH) // _MICROSECOND
+            meta_codes = [
+                self._params.code(metadata['params']),
+                self._weights.code(design['scores']['weights']),
+                self._versions.code(metadata['version'])
+            ]
+            columnar = self._fits_layout(design, created)
+        except (KeyError, TypeError, ValueError, OverflowError):
+            created, meta_codes, columnar = 0, [-1, -1, -1], False
+        
+        self._created.append(created)
+        self._meta_codes.append(meta_codes)
+        self._seeds.append(seed if columnar and seed is not None else _MISSING_SEED)
+        if not columnar:
+            self._verbatim[row] = design
+        self.stats.add(design, key=row)
+        return row
+    
+    def extend(self, designs):
+        """Add many designs; returns how many were new"""
+        before = len(self)
+        for design in designs:
+            self.append(design)
+        return len(self) - before
+    
+    # ------------------------------------------------------------------
+    # Indexes and columns
+    # ------------------------------------------------------------------
+    
+    @property
+    def fingerprint(self):
+        """Hash of the design IDs in insertion order"""
+        return self._digest.hexdigest()
+    
+    @property
+    def cache_key(self):
+        """(version, fingerprint): O(1) key for results derived from the store"""
+        return self.version, self.fingerprint
+    
+    @property
+    def design_ids(self):
+        """Design IDs in insertion order"""
+        return self._ids
+    
+    @property
+    def antigens(self):
+        """Antigens in first-seen order"""
+        return list(self._antigens)
+    
+    def row_of(self, design_id):
+        """Row index of a design ID (None if absent)"""
+        return self._id_to_row.get(design_id)
+    
+    def rows_for_antigen(self, antigen):
+        """Rows of all designs for an antigen, in insertion order"""
+        rows = self._antigen_rows.get(antigen)
+        return rows.view() if rows is not None else np.empty(0, dtype=np.int64)
+    
+    def query_rows(self, antigen=None, order_by=None, descending=True):
+        """Rows for an antigen (or all), ordered by a column or 'created'
+        
+        Rows keep insertion order without order_by and among ties; missing
+        values sort last either way.
+        """
+        rows = np.arange(len(self)) if antigen is None else self.rows_for_antigen(antigen)
+        if order_by is None:
+            return rows[::-1] if descending else rows
+        values = self._created.view()[rows] if order_by == 'created' else self.column(order_by)[rows]
+        return rows[np.argsort(-values if descending else values, kind='stable')]
+    
+    def search_ids(self, text, limit=20):
+        """Up to limit design IDs starting with text, in ID order
+        
+        A bare hash fragment such as '3fa2' also matches content IDs
+        ('ABG2_3fa2...'). Uses a sorted ID index rebuilt only after the
+        store grows, so lookups are O(log n + limit).
+        """
+        if len(self._sorted_ids) != len(self._ids):
+            self._sorted_ids = sorted(self._ids)
+        
+        text = text.strip()
+        prefixes = [text] if '_' in text else [text, f"{DESIGN_ID_PREFIX}_{text.lower()}"]
+        matches = []
+        for prefix in prefixes:
+            index = bisect_left(self._sorted_ids, prefix)
+            while index < len(self._sorted_ids) and len(matches) < limit:
+                design_id = self._sorted_ids[index]
+                if not design_id.startswith(prefix):
+                    break
+                if design_id not in matches:
+                    matches.append(design_id)
+                index += 1
+        return matches
+    
+    def column(self, name):
+        """A numeric column, or '<part>_length' for a sequence part"""
+        if name in self._numeric:
+            return self._numeric[name].view()
+        if name.endswith('_length') and name[:-len('_length')] in SEQUENCE_PARTS:
+            return self._seq_lengths.view()[:, SEQUENCE_PARTS.index(name[:-len('_length')])]
+        raise KeyError(name)
+    
+    def _top_rows(self, antigen, component, k):
+        """Best (value, row) pairs of a score column, for stats refills"""
+        rows = np.arange(len(self)) if antigen is None else self.rows_for_antigen(antigen)
+        values = self.column(component)[rows]
+        keep = ~np.isnan(values)
+        rows, values = rows[keep], values[keep]
+        if len(rows) > k:
+            best = np.argpartition(values, -k)[-k:]
+            rows, values = rows[best], values[best]
+        return list(zip(values.tolist(), rows.tolist()))
+    
+    def sequence(self, row, part):
+        """One sequence part ('heavy_chain', 'light_chain' or a CDR) of a row"""
+        index = SEQUENCE_PARTS.index(part)
+        lengths = self._seq_lengths.data[row]
+        start = int(self._seq_starts.data[row]) + int(lengths[:index].sum())
+        return self._sequences[start:start + int(lengths[index])].decode('ascii')
+    
+    def frame(self, columns, rows=None, index_label='Design'):
+        """DataFrame of (label, column name) pairs indexed by design ID"""
+        import pandas as pd
+        
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows, dtype=np.int64)
+        data = {label: self.column(name)[rows] for label, name in columns}
+        index = pd.Index([self._ids[row] for row in rows.tolist()], name=index_label)
+        return pd.DataFrame(data, index=index)
+    
+    def subset(self, rows, token=None):
+        """Lazy sequence of the designs at the given rows (see DesignView)"""
+        return DesignView(self, rows, token)
+    
+    def nbytes(self):
+        """Approximate memory held by columns and the sequence table"""
+        arrays = list(self._numeric.values()) + [
+            self._antigen_column, self._seq_starts, self._seq_lengths,
+            self._created, self._seeds, self._meta_codes
+        ]
+        return len(self._sequences) + sum(array.data.nbytes for array in arrays)
+    
+    # ------------------------------------------------------------------
+    # Materialization
+    # ------------------------------------------------------------------
+    
+    def design(self, row):
+        """Materialize the design dict stored at a row"""
+        if row in self._verbatim:
+            return self._verbatim[row]
+        
+        parts = dict(zip(SEQUENCE_PARTS, self._split_sequences(row)))
+        params_code, weights_code, version_code = self._meta_codes.data[row].tolist()
+        
+        sections = {section: {} for section in _SECTION_KEYS}
+        for name, (section, key, dtype) in NUMERIC_COLUMNS.items():
+            value = self._numeric[name].data[row]
+            sections[section][key] = int(value) if dtype == np.int32 else float(value)
+        sections['scores']['weights'] = self._weights.value(weights_code)
+        
+        metadata = {
+            'created': (_EPOCH + int(self._created.data[row]) * _MICROSECOND).isoformat(),
+            'params': self._params.value(params_code),
+            'version': self._versions.value(version_code)
+        }
+        seed = self._seeds.data[row]
+        if seed != _MISSING_SEED:
+            metadata['seed'] = int(seed)
+        
+        return {
+            'design_id': self._ids[row],
+            'antigen_name': self._antigens[self._antigen_column.data[row]],
+            'heavy_chain': parts['heavy_chain'],
+            'light_chain': parts['light_chain'],
+            'cdrs': {cdr_type: parts[cdr_type] for cdr_type in CDR_TYPES},
+            'scores': sections['scores'],
+            'metadata': metadata,
+            'physics_analysis': sections['physics_analysis'],
+            'developability': sections['developability'],
+            'epitope_compatibility': sections['epitope_compatibility']
+        }
+    
+    def _split_sequences(self, row):
+        start = int(self._seq_starts.data[row])
+        parts = []
+        for length in self._seq_lengths.data[row].tolist():
+            parts.append(self._sequences[start:start + length].decode('ascii'))
+            start += length
+        return parts
+    
+    def _fits_layout(self, design, created):
+        """Whether a design can be rebuilt exactly from the columns"""
+        if list(design) != _DESIGN_KEYS or list(design['cdrs']) != CDR_TYPES:
+            return False
+        parts = [design['heavy_chain'], design['light_chain']] + list(design['cdrs'].values())
+        if not all(isinstance(part, str) and part.isascii() for part in parts):
+            return False
+        if list(design['scores']) != _SECTION_KEYS['scores'] + ['weights']:
+            return False
+        if list(design['metadata']) not in (['created', 'params', 'version'], ['created', 'params', 'version', 'seed']):
+            return False
+        
+        seed = design['metadata'].get('seed')
+        if seed is not None and not (isinstance(seed, int) and 0 <= seed < _MISSING_SEED):
+            return False
+        
+        for section in ['physics_analysis', 'developability', 'epitope_compatibility']:
+            if list(design[section]) != _SECTION_KEYS[section]:
+                return False
+        
+        for section, key, dtype in NUMERIC_COLUMNS.values():
+            value = design[section][key]
+            if isinstance(value, bool):
+                return False
+            if dtype == np.int32 and not isinstance(value, (int, np.integer)):
+                return False
+            if dtype == np.float64 and not isinstance(value, float):
+                return False
+        
+        # The timestamp must survive the microsecond round trip unchanged
+        return (_EPOCH + created * _MICROSECOND).isoformat() == design['metadata']['created']
+
+class DesignView:
+    """Read-only sequence of selected DesignStore rows
+    
+    token identifies the selection in cache keys; callers that track their
+    selection pass one (e.g. a digest taken when it changes), otherwise a
+    digest of the rows is taken once, on first use.
+    """
+    
+    def __init__(self, store, rows, token=None):
+        self.store = store
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.token = token
+    
+    def __len__(self):
+        return len(self.rows)
+    
+    def __bool__(self):
+        return len(self.rows) > 0
+    
+    def __iter__(self):
+        for row in self.rows.tolist():
+            yield self.store.design(row)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return DesignView(self.store, self.rows[index])
+        return self.store.design(int(self.rows[index]))
+    
+    @property
+    def design_ids(self):
+        """Design IDs of the selected rows"""
+        ids = self.store.design_ids
+        return [ids[row] for row in self.rows.tolist()]
+    
+    def column(self, name):
+        """A store column restricted to the selected rows"""
+        return self.store.column(name)[self.rows]
+    
+    @property
+    def cache_key(self):
+        """The store's cache key plus the selection token"""
+        if self.token is None:
+            self.token = hashlib.blake2b(self.rows.tobytes(), digest_size=16).hexdigest()
+        return self.store.cache_key + (self.token,)
+    
+    def frame(self, columns, index_label='Design'):
+        """DataFrame of the selected rows"""
+        return self.store.frame(columns, self.rows, index_label)
@@ -0,0 +1,101 @@
+# abgenesis/timing.py - Rolling per-stage latency histograms
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+class StageTimings:
+    """Recent durations of named stages, with lifetime counts and totals
+    
+    Each stage keeps its last window samples in a ring buffer, so summaries
+    and histograms describe recent behaviour at a fixed memory cost.
+    Recording is a lock and a deque append; disabled timings record nothing.
+    """
+    
+    def __init__(self, window=2048, enabled=True):
+        self.window = window
+        self.enabled = enabled
+        self._samples = {}
+        self._counts = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+    
+    def record(self, stage, seconds):
+        """Add one duration in seconds"""
+        if not self.enabled:
+            return
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+                self._counts[stage] = 0
+                self._totals[stage] = 0.0
+            samples.append(seconds)
+            self._counts[stage] += 1
+            self._totals[stage] += seconds
+    
+    @contextmanager
+    def time(self, stage):
+        """Record the wall time of a with block (also when it raises)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+    
+    def clear(self):
+        """Forget every sample"""
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._totals.clear()
+    
+    @property
+    def stages(self):
+        """Stage names in first-recorded order"""
+        with self._lock:
+            return list(self._samples)
+    
+    def _recent(self, stage):
+        with self._lock:
+            return np.fromiter(self._samples.get(stage, ()), dtype=np.float64)
+    
+    def summary(self):
+        """Per-stage lifetime count/total and recent mean/p50/p95/max in milliseconds"""
+        # One snapshot, so a concurrent clear() cannot remove a stage midway
+        with self._lock:
+            snapshot = [
+                (stage, np.fromiter(samples, dtype=np.float64), self._counts[stage], self._totals[stage])
+                for stage, samples in self._samples.items()
+            ]
+        
+        rows = []
+        for stage, recent, count, total in snapshot:
+            recent = recent * 1000.0
+            if not len(recent):
+                continue
+            p50, p95 = np.percentile(recent, [50, 95])
+            rows.append({
+                'stage': stage,
+                'count': count,
+                'total_s': round(total, 3),
+                'mean_ms': round(float(recent.mean()), 3),
+                'p50_ms': round(float(p50), 3),
+                'p95_ms': round(float(p95), 3),
+                'max_ms': round(float(recent.max()), 3)
+            })
+        return rows
+    
+    def histogram(self, stage, bins=20):
+        """(bin edges in ms, counts) of a stage's recent samples on a log scale"""
+        recent = self._recent(stage) * 1000.0
+        recent = recent[recent > 0]
+        if not len(recent):
+            return np.empty(0), np.empty(0, dtype=np.int64)
+        low, high = math.log10(recent.min()), math.log10(recent.max())
+        edges = np.logspace(low, high if high > low else low + 1, bins + 1)
+        counts, edges = np.histogram(recent, bins=edges)
+        return edges, counts
@@ -1,19 +1,21 @@
 # app.py - Complete AbGenesis 2.0 with GitHub Integration
 import streamlit as st
-import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
 import json
-import time
+import functools
 import hashlib
+import cProfile
+import pstats
+import marshal
 import base64
 import io
 import zipfile
 import tempfile
 import os
+import queue
+import uuid
+import threading
 from io import StringIO, BytesIO
 import requests
 from collections import defaultdict, Counter
@@ -21,18 +23,29 @@ import random
 import string
 from typing import Dict, List, Optional, Tuple, Any
 import warnings
+from abgenesis import AntibodyDesignEngine, DesignStore, LRUCache, StageTimings
+from abgenesis.activity import ActivityLog
+from abgenesis.export import spool_export, export_filename, export_mime
+from abgenesis.jobs import JobRunner, design_run
+from abgenesis.backup import write_backup
+from abgenesis.binning import density_2d, downsample, histogram
+from abgenesis.pareto import front_rows, pareto_rank
+from abgenesis.push import PUSH_LAYOUTS, DesignPusher, GitHubTransport, SimulatedTransport
+from abgenesis.repository import DesignRepository
 warnings.filterwarnings('ignore')
 
-# Set page config - FIRST COMMAND
-st.set_page_config(
-    page_title="AbGenesis 2.0 - AI Antibody Design",
-    page_icon="🧬",
-    layout="wide",
-    initial_sidebar_state="expanded",
-    menu_items={
-        'Get Help': 'https://github.com/yourusername/abgenesis',
-        'Report a bug': 'https://github.com/yourusername/abgenesis/issues',
-        'About': """
+# Set page config - FIRST COMMAND (called at the top of main())
+def configure_page():
+    """Set Streamlit page configuration"""
+    st.set_page_config(
+        page_title="AbGenesis 2.0 - AI Antibody Design",
+        page_icon="🧬",
+        layout="wide",
+        initial_sidebar_state="expanded",
+        menu_items={
+            'Get Help': 'https://github.com/yourusername/abgenesis',
+            'Report a bug': 'https://github.com/yourusername/abgenesis/issues',
+            'About': """
         ## AbGenesis 2.0 🧬
         
         AI-powered antibody design platform with:
@@ -43,11 +56,13 @@ st.set_page_config(
         
         Version 2.1.0 | MIT License
         """
-    }
-)
+        }
+    )
 
 # Custom CSS with GitHub dark theme
-st.markdown("""
+def inject_custom_css():
+    """Inject the GitHub dark theme CSS"""
+    st.markdown("""
 <style>
     /* GitHub Dark Theme */
     :root {
@@ -220,8 +235,7 @@ def init_session_state():
         'github_username': '',
         'github_repos': [],
         'current_repo': None,
-        'designs': [],
-        'design_counter': 0,
+        'designs': DesignStore(),
         'antigens': {},
         'physics_params': {
             'electrostatics': 0.25,
@@ -243,27 +257,42 @@ def init_session_state():
             'length_sampling': 'natural'
         },
         'export_format': 'json',
+        'export_compression': 'none',
         'theme': 'dark',
         'auto_save': True,
-        'recent_activity': [],
+        'plot_point_budget': DEFAULT_POINT_BUDGET,
+        'profile_next_run': False,
+        'push_results': queue.Queue(),
+        'job_ids': [],
+        'jobs_announced': set(),
+        'profile_result': None,
+        'session_id': uuid.uuid4().hex[:8],
         'benchmark_results': {}
     }
     
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
-
-# Initialize
-init_session_state()
+    
+    # Start each session with the most recent page of the persistent library
+    if 'library_loaded' not in st.session_state:
+        st.session_state.library_loaded = True
+        if not st.session_state.designs:
+            st.session_state.designs.extend(reversed(get_repository().recent(LIBRARY_PAGE_SIZE)))
 
 # ============================================================================
 # SIMULATED GITHUB INTEGRATION (No PyGithub dependency)
 # ============================================================================
 
 class SimulatedGitHub:
-    """Simulated GitHub integration for demo purposes"""
+    """Simulated GitHub integration for demo purposes
+    
+    One instance is shared by every session, so writes hold a lock and
+    readers get copies; what a user is connected to stays in their session.
+    """
     
     def __init__(self):
+        self._lock = threading.Lock()
         self.repositories = self._create_sample_repos()
         self.issues = self._create_sample_issues()
         self.pull_requests = self._create_sample_prs()
@@ -386,446 +415,453 @@ class SimulatedGitHub:
         if token and len(token) > 10:
             st.session_state.github_connected = True
             st.session_state.github_username = 'abgenesis-user'
-            st.session_state.github_repos = self.repositories
+            st.session_state.github_repos = self.get_repositories()
             return True, "✅ Authenticated with GitHub!"
         else:
             return False, "❌ Invalid token"
     
     def get_repositories(self):
         """Get user repositories"""
-        return self.repositories
+        with self._lock:
+            return list(self.repositories)
     
     def create_repository(self, name, description, private):
         """Create new repository"""
-        new_repo = {
-            'name': name,
-            'full_name': f'user/{name}',
-            'description': description,
-            'private': private,
-            'stars': 0,
-            'forks': 0,
-            'issues': 0,
-            'updated_at': datetime.now().isoformat(),
-            'designs': 0,
-            'collaborators': 1
-        }
-        self.repositories.append(new_repo)
-        st.session_state.github_repos = self.repositories
+        with self._lock:
+            if any(repo['name'] == name for repo in self.repositories):
+                return False, f"Repository {name} already exists"
+            new_repo = {
+                'name': name,
+                'full_name': f'user/{name}',
+                'description': description,
+                'private': private,
+                'stars': 0,
+                'forks': 0,
+                'issues': 0,
+                'updated_at': datetime.now().isoformat(),
+                'designs': 0,
+                'collaborators': 1
+            }
+            self.repositories.append(new_repo)
+        st.session_state.github_repos = self.get_repositories()
         return True, new_repo
     
-    def push_design(self, repo_name, design_data, commit_message):
-        """Push design to repository"""
-        # Simulate pushing to GitHub
-        time.sleep(0.5)  # Simulate API call
-        return True, f"✅ Design pushed to {repo_name}"
+    def full_name(self, repo_name):
+        """owner/name of a repository"""
+        return next(
+            (repo['full_name'] for repo in self.get_repositories() if repo['name'] == repo_name),
+            f'user/{repo_name}'
+        )
     
     def create_issue(self, repo_name, title, body, labels):
         """Create issue"""
-        new_issue = {
-            'number': len(self.issues) + 1,
-            'title': title,
-            'state': 'open',
-            'labels': labels,
-            'created_at': datetime.now().isoformat(),
-            'comments': 0
-        }
-        self.issues.append(new_issue)
+        with self._lock:
+            new_issue = {
+                'number': len(self.issues) + 1,
+                'title': title,
+                'state': 'open',
+                'labels': labels,
+                'created_at': datetime.now().isoformat(),
+                'comments': 0
+            }
+            self.issues.append(new_issue)
         return True, new_issue
     
     def get_issues(self, repo_name):
         """Get repository issues"""
-        return self.issues
+        with self._lock:
+            return list(self.issues)
+
+@st.cache_resource
+def get_github():
+    """Process-wide simulated GitHub, so created repos and issues persist"""
+    return SimulatedGitHub()
+
+github = get_github()
+
+@st.cache_resource
+def get_score_cache():
+    """Process-wide score cache, kept across reruns and sessions"""
+    return LRUCache()
+
+@st.cache_resource
+def get_stage_timings():
+    """Process-wide rolling stage timings, shown under Debug Information"""
+    return StageTimings()
+
+stage_timings = get_stage_timings()
+
+@st.cache_resource
+def get_design_pusher():
+    """Process-wide background pusher
+    
+    Commits go to the API at ABGENESIS_GITHUB_API when set (GitHub or
+    `python -m abgenesis.push` for a local stub), otherwise they are
+    simulated in process.
+    """
+    api_url = os.environ.get('ABGENESIS_GITHUB_API')
+    if api_url:
+        transport = GitHubTransport(api_url, token=os.environ.get('ABGENESIS_GITHUB_TOKEN'))
+    else:
+        transport = SimulatedTransport()
+    return DesignPusher(transport)
+
+@st.cache_resource
+def get_design_engine():
+    """Process-wide design engine, built once instead of on every rerun"""
+    return AntibodyDesignEngine(score_cache=get_score_cache(), timings=stage_timings)
 
-# Initialize simulated GitHub
-github = SimulatedGitHub()
+design_engine = get_design_engine()
 
 # ============================================================================
-# ANTIBODY DESIGN ENGINE
+# PERSISTENT DESIGN LIBRARY
 # ============================================================================
 
-class AntibodyDesignEngine:
-    """Core antibody design engine with physics modeling"""
-    
-    def __init__(self):
-        # Amino acid properties
-        self.aa_properties = {
-            'A': {'hydrophobicity': 1.8, 'charge': 0, 'polarity': 0},
-            'R': {'hydrophobicity': -4.5, 'charge': 1, 'polarity': 1},
-            'N': {'hydrophobicity': -3.5, 'charge': 0, 'polarity': 1},
-            'D': {'hydrophobicity': -3.5, 'charge': -1, 'polarity': 1},
-            'C': {'hydrophobicity': 2.5, 'charge': 0, 'polarity': 0},
-            'Q': {'hydrophobicity': -3.5, 'charge': 0, 'polarity': 1},
-            'E': {'hydrophobicity': -3.5, 'charge': -1, 'polarity': 1},
-            'G': {'hydrophobicity': -0.4, 'charge': 0, 'polarity': 0},
-            'H': {'hydrophobicity': -3.2, 'charge': 0.5, 'polarity': 1},
-            'I': {'hydrophobicity': 4.5, 'charge': 0, 'polarity': 0},
-            'L': {'hydrophobicity': 3.8, 'charge': 0, 'polarity': 0},
-            'K': {'hydrophobicity': -3.9, 'charge': 1, 'polarity': 1},
-            'M': {'hydrophobicity': 1.9, 'charge': 0, 'polarity': 0},
-            'F': {'hydrophobicity': 2.8, 'charge': 0, 'polarity': 0},
-            'P': {'hydrophobicity': -1.6, 'charge': 0, 'polarity': 0},
-            'S': {'hydrophobicity': -0.8, 'charge': 0, 'polarity': 1},
-            'T': {'hydrophobicity': -0.7, 'charge': 0, 'polarity': 1},
-            'W': {'hydrophobicity': -0.9, 'charge': 0, 'polarity': 0},
-            'Y': {'hydrophobicity': -1.3, 'charge': 0, 'polarity': 1},
-            'V': {'hydrophobicity': 4.2, 'charge': 0, 'polarity': 0}
-        }
-        
-        # CDR length distributions from SAbDab
-        self.cdr_lengths = {
-            'H1': {'mean': 10.2, 'std': 2.1, 'min': 5, 'max': 15},
-            'H2': {'mean': 16.5, 'std': 3.2, 'min': 9, 'max': 25},
-            'H3': {'mean': 12.8, 'std': 4.5, 'min': 3, 'max': 35},
-            'L1': {'mean': 11.5, 'std': 2.3, 'min': 7, 'max': 17},
-            'L2': {'mean': 7.0, 'std': 0.5, 'min': 5, 'max': 9},
-            'L3': {'mean': 9.2, 'std': 1.8, 'min': 5, 'max': 14}
-        }
-        
-        # Framework regions (humanized)
-        self.frameworks = {
-            'heavy_fr1': 'QVQLVQSGAEVKKPGASVKVSCKAS',
-            'heavy_fr2': 'WVRQAPGQGLEWMG',
-            'heavy_fr3': 'RVTMTKDTSISTAYMELSRLRSDDTAVYYCAR',
-            'heavy_fr4': 'WGQGTLVTVSS',
-            'light_fr1': 'DIQMTQSPSSLSASVGDRVTITC',
-            'light_fr2': 'WYQQKPGKAPKLLIY',
-            'light_fr3': 'GVPSRFSGSGSGTDFTLTISSLQPEDFATYYC',
-            'light_fr4': 'FGQGTKVEIK'
-        }
-        
-        # Known therapeutic antibodies for benchmarking
-        self.therapeutic_antibodies = {
-            'trastuzumab': {
-                'target': 'HER2',
-                'heavy': 'EVQLVESGGGLVQPGGSLRLSCAASGFNIKDTYIHWVRQAPGKGLEWVARIYPTNGYTRYADSVKGRFTISADTSKNTAYLQMNSLRAEDTAVYYCSRWGGDGFYAMDYWGQGTLVTVSS',
-                'light': 'DIQMTQSPSSLSASVGDRVTITCRASQDVNTAVAWYQQKPGKAPKLLIYSASFLYSGVPSRFSGSRSGTDFTLTISSLQPEDFATYYCQQHYTTPPTFGQGTKVEIK',
-                'affinity': 0.1,  # nM
-                'type': 'humanized IgG1'
-            },
-            'pembrolizumab': {
-                'target': 'PD-1',
-                'heavy': 'QVQLVQSGAEVKKPGSSVKVSCKASGGTFSSYAISWVRQAPGQGLEWMGGIIPIFGTANYAQKFQGRVTITADESTSTAYMELSSLRSEDTAVYYCARVRQFYGSSYWYFDVWGQGTLVTVSS',
-                'light': 'EIVLTQSPGTLSLSPGERATLSCRASQSVSSYLAWYQQKPGQAPRLLIYGASSRATGIPDRFSGSGSGTDFTLTISRLEPEDFAVYYCQQRSNWPLTFGQGTKVEIK',
-                'affinity': 0.03,
-                'type': 'humanized IgG4'
-            }
-        }
-    
-    def generate_antibody_design(self, antigen_name, params):
-        """Generate a complete antibody design"""
-        design_id = f"ABG2_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{st.session_state.design_counter}"
-        st.session_state.design_counter += 1
-        
-        # Generate CDRs
-        cdrs = self._generate_cdrs(params)
-        
-        # Assemble antibody
-        heavy_chain = self._assemble_heavy_chain(cdrs)
-        light_chain = self._assemble_light_chain(cdrs)
-        
-        # Calculate scores
-        scores = self._calculate_scores(heavy_chain, light_chain, antigen_name, params)
-        
-        # Create design object
-        design = {
-            'design_id': design_id,
-            'antigen_name': antigen_name,
-            'heavy_chain': heavy_chain,
-            'light_chain': light_chain,
-            'cdrs': cdrs,
-            'scores': scores,
-            'metadata': {
-                'created': datetime.now().isoformat(),
-                'params': params,
-                'version': '2.1.0'
-            },
-            'physics_analysis': self._physics_analysis(heavy_chain, light_chain),
-            'developability': self._developability_analysis(heavy_chain + light_chain),
-            'epitope_compatibility': self._epitope_compatibility(cdrs, antigen_name)
-        }
-        
-        return design
-    
-    def _generate_cdrs(self, params):
-        """Generate CDR sequences"""
-        cdrs = {}
-        
-        for cdr_type in ['H1', 'H2', 'H3', 'L1', 'L2', 'L3']:
-            # Get length based on distribution or params
-            if params.get('cdr_length_sampling') == 'natural':
-                length_info = self.cdr_lengths[cdr_type]
-                length = int(np.random.normal(length_info['mean'], length_info['std']))
-                length = max(length_info['min'], min(length_info['max'], length))
-            else:
-                length = params.get(f'{cdr_type}_length', 10)
-            
-            # Generate sequence
-            sequence = self._generate_cdr_sequence(cdr_type, length, params)
-            cdrs[cdr_type] = sequence
-        
-        return cdrs
-    
-    def _generate_cdr_sequence(self, cdr_type, length, params):
-        """Generate CDR sequence with appropriate biases"""
-        # CDR-specific amino acid preferences
-        preferences = {
-            'H1': 'GYTFTSYAMHASDNRK',
-            'H2': 'INPSGGSTYAQKFQGVW',
-            'H3': 'ARDGVYWSTNQHKP',
-            'L1': 'RASQDN',
-            'L2': 'AASSLQRT',
-            'L3': 'QQSYTNDPLF'
-        }
-        
-        # Generate sequence with bias
-        pref_set = preferences.get(cdr_type, 'ACDEFGHIKLMNPQRSTVWY')
-        sequence = []
-        
-        for i in range(length):
-            if i < len(pref_set) and np.random.random() < 0.7:
-                sequence.append(pref_set[i])
-            else:
-                # Include some random diversity
-                all_aas = 'ACDEFGHIKLMNPQRSTVWY'
-                if params.get('epitope_weight', 0) > 0.5 and np.random.random() < 0.3:
-                    # Add paratope residues for epitope targeting
-                    paratope_residues = 'YWRHDE'
-                    sequence.append(np.random.choice(list(paratope_residues)))
-                else:
-                    sequence.append(np.random.choice(list(all_aas)))
-        
-        return ''.join(sequence)
-    
-    def _assemble_heavy_chain(self, cdrs):
-        """Assemble heavy chain from CDRs and frameworks"""
-        return (
-            self.frameworks['heavy_fr1'] + cdrs['H1'] +
-            self.frameworks['heavy_fr2'] + cdrs['H2'] +
-            self.frameworks['heavy_fr3'] + cdrs['H3'] +
-            self.frameworks['heavy_fr4']
-        )
-    
-    def _assemble_light_chain(self, cdrs):
-        """Assemble light chain from CDRs and frameworks"""
-        return (
-            self.frameworks['light_fr1'] + cdrs['L1'] +
-            self.frameworks['light_fr2'] + cdrs['L2'] +
-            self.frameworks['light_fr3'] + cdrs['L3'] +
-            self.frameworks['light_fr4']
-        )
+# Designs loaded into a new session from the library
+LIBRARY_PAGE_SIZE = 100
+
+@st.cache_resource
+def get_repository():
+    """Process-wide SQLite design library"""
+    return DesignRepository(os.environ.get('ABGENESIS_DB', 'abgenesis_designs.db'))
+
+def save_designs(designs):
+    """Add new designs to the session and library; returns how many were new"""
+    store = st.session_state.designs
+    new = []
+    with stage_timings.time('save_designs'):
+        for design in designs:
+            if design.get('design_id') not in store:
+                store.append(design)
+                new.append(design)
+        get_repository().add_many(new)
+    return len(new)
+
+# ============================================================================
+# ACTIVITY LOG
+# ============================================================================
+
+# Activity timeline series: label -> (activity kind, color)
+TIMELINE_SERIES = {
+    'Commits': ('commit', '#58a6ff'),
+    'Designs': ('design', '#238636'),
+    'Issues': ('issue', '#da3633')
+}
+
+@st.cache_resource
+def get_activity_log():
+    """Process-wide activity log, appended to ABGENESIS_ACTIVITY_LOG on disk"""
+    return ActivityLog(os.environ.get('ABGENESIS_ACTIVITY_LOG', 'abgenesis_activity.jsonl'))
+
+def log_activity(kind, message, count=1):
+    """Record an event of this session on the activity log"""
+    get_activity_log().record(kind, message, count, owner=st.session_state.session_id)
+
+def recent_activity(limit):
+    """Messages of this session's latest events, oldest first"""
+    return [event['message'] for event in reversed(get_activity_log().recent(limit, owner=st.session_state.session_id))]
+
+def push_callback(results, owner):
+    """Completion callback for background pushes, run on the push thread
     
-    def _calculate_scores(self, heavy_chain, light_chain, antigen_name, params):
-        """Calculate design scores"""
-        full_sequence = heavy_chain + light_chain
-        
-        # Physics score
-        physics_score = self._calculate_physics_score(full_sequence)
-        
-        # Epitope compatibility score
-        epitope_score = 0.7 + np.random.random() * 0.3  # Simulated
-        
-        # Developability score
-        developability_score = self._calculate_developability_score(full_sequence)
-        
-        # Overall score (weighted combination)
-        weights = params.get('score_weights', {
-            'physics': 0.4,
-            'epitope': 0.3,
-            'developability': 0.3
-        })
-        
-        overall_score = (
-            physics_score * weights['physics'] +
-            epitope_score * weights['epitope'] +
-            developability_score * weights['developability']
-        )
-        
-        return {
-            'overall': round(overall_score, 3),
-            'physics': round(physics_score, 3),
-            'epitope': round(epitope_score, 3),
-            'developability': round(developability_score, 3),
-            'weights': weights
-        }
+    Session state cannot be touched from there, so results go onto the
+    session's queue and are announced on its next run. The push is logged
+    for owner right away; failed pushes add nothing to the commit count.
+    """
+    activity = get_activity_log()
     
-    def _calculate_physics_score(self, sequence):
-        """Calculate physics-based score"""
-        # Simplified physics scoring
-        score = 0.5  # Base score
-        
-        # Hydrophobicity balance
-        hydrophobicity = self._calculate_hydrophobicity(sequence)
-        score += 0.2 * (1.0 - abs(hydrophobicity - 0.5))
-        
-        # Charge balance
-        charge = self._calculate_net_charge(sequence)
-        score += 0.15 * (1.0 - min(1.0, abs(charge) / 5))
-        
-        # Length appropriate
-        length_score = 1.0 - min(1.0, abs(len(sequence) - 220) / 100)
-        score += 0.15 * length_score
-        
-        # CDR properties
-        score += 0.1 * np.random.random()  # Random component
-        
-        return min(1.0, max(0.0, score))
-    
-    def _calculate_developability_score(self, sequence):
-        """Calculate developability score"""
-        score = 0.6  # Base score
-        
-        # Aggregation propensity
-        aggregation_motifs = ['LVFFA', 'GNNQQNY', 'NFGAIL']
-        motif_count = sum(sequence.count(motif) for motif in aggregation_motifs)
-        score -= 0.1 * min(2, motif_count)
-        
-        # Cysteine count (disulfide potential)
-        cys_count = sequence.count('C')
-        if 2 <= cys_count <= 6:
-            score += 0.1  # Good for disulfide bonds
-        elif cys_count > 6:
-            score -= 0.1  # Too many cysteines
-        
-        # Proline content (stability)
-        pro_content = sequence.count('P') / len(sequence)
-        if 0.04 <= pro_content <= 0.08:
-            score += 0.1  # Good proline content
-        
-        return min(1.0, max(0.0, score))
-    
-    def _physics_analysis(self, heavy_chain, light_chain):
-        """Perform physics analysis"""
-        return {
-            'binding_energy': round(-8 + np.random.random() * 4, 2),  # kcal/mol
-            'interface_area': round(1000 + np.random.random() * 500, 1),  # Å²
-            'hydrogen_bonds': int(8 + np.random.random() * 8),
-            'shape_complementarity': round(0.6 + np.random.random() * 0.3, 3),
-            'electrostatic_complementarity': round(0.5 + np.random.random() * 0.4, 3)
-        }
+    def on_pushed(result):
+        stage_timings.record('push_commit', result['seconds'])
+        if result['error']:
+            message = f"Push of {result['designs']} designs to {result['repo']} failed"
+        else:
+            message = f"Pushed {result['designs']} designs to {result['repo']}@{result['branch']}"
+        activity.record('commit', message, count=0 if result['error'] else 1, owner=owner)
+        results.put(result)
+    return on_pushed
+
+def report_push_results():
+    """Announce background pushes that finished since the last run"""
+    while True:
+        try:
+            result = st.session_state.push_results.get_nowait()
+        except queue.Empty:
+            break
+        
+        if result['error']:
+            message = f"❌ Push of {result['designs']} designs to {result['repo']} failed: {result['error']}"
+        else:
+            message = (
+                f"✅ Pushed {result['designs']} designs to {result['repo']}@{result['branch']} "
+                f"({result['commit'][:7]})"
+            )
+        st.toast(message)
+
+# ============================================================================
+# PARTIAL RERUNS
+# ============================================================================
+
+def fragment(run_every=None):
+    """Decorator making a page region rerun on its own
     
-    def _developability_analysis(self, sequence):
-        """Perform developability analysis"""
-        return {
-            'solubility': round(0.7 + np.random.random() * 0.3, 3),
-            'aggregation_score': round(0.1 + np.random.random() * 0.4, 3),
-            'thermal_stability': round(65 + np.random.random() * 15, 1),  # °C
-            'expression_titer': round(50 + np.random.random() * 50, 1),  # mg/L
-            'immunogenicity_risk': round(0.2 + np.random.random() * 0.3, 3)
-        }
+    Widget changes inside the region re-execute only that function, and
+    run_every also re-runs it on a timer. Each execution is timed under the
+    function's name. Needs st.fragment (Streamlit 1.37+).
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            with stage_timings.time(func.__name__):
+                return func(*args, **kwargs)
+        return st.fragment(run_every=run_every)(timed)
+    return decorate
+
+# ============================================================================
+# BACKGROUND JOBS
+# ============================================================================
+
+# Jobs shown in the sidebar per session
+JOBS_SHOWN = 5
+
+@st.cache_resource
+def get_job_runner():
+    """Process-wide job runner; jobs keep going across reruns and disconnects"""
+    return JobRunner()
+
+def run_design_job(job, repository, pusher, push, activity, **run):
+    """Design Studio job: generate into the library, then push as one commit
     
-    def _epitope_compatibility(self, cdrs, antigen_name):
-        """Calculate epitope compatibility"""
-        return {
-            'paratope_residues': sum(cdr.count('Y') + cdr.count('W') + cdr.count('R') for cdr in cdrs.values()),
-            'complementarity_score': round(0.6 + np.random.random() * 0.4, 3),
-            'predicted_affinity': round(1 + np.random.random() * 9, 2),  # nM
-            'epitope_coverage': round(0.5 + np.random.random() * 0.5, 3)
-        }
+    Designs are written to the library as they are made, so a run outlives
+    the session that started it; what it made is logged even if cancelled.
+    """
+    try:
+        designs = design_run(job, skip=repository, sink=repository.add_many, **run)
+    finally:
+        if job.result_count:
+            activity.record('design', f"Job {job.id} made {job.result_count} designs", count=job.result_count, owner=job.owner)
+    if push is not None and designs:
+        pusher.push(designs=designs, **push)
+
+def absorb_job_results(job):
+    """Move a job's new designs into the session; returns how many were new
     
-    def _calculate_hydrophobicity(self, sequence):
-        """Calculate average hydrophobicity"""
-        scores = [self.aa_properties.get(aa, {}).get('hydrophobicity', 0) for aa in sequence]
-        avg = np.mean(scores)
-        # Normalize to 0-1
-        return (avg + 4.5) / 9.0
+    Draining hands the designs over, so a finished job stops holding them.
+    """
+    store = st.session_state.designs
+    new = 0
+    for design in job.drain_results():
+        if design['design_id'] not in store:
+            store.append(design)
+            new += 1
+    return new
+
+def show_jobs():
+    """Progress, results and cancel buttons for this session's recent jobs"""
+    runner = get_job_runner()
+    jobs = [job for job in map(runner.get, st.session_state.job_ids[-JOBS_SHOWN:]) if job is not None]
+    active = any(job.active for job in jobs)
+    
+    @fragment(run_every=1.0 if active else None)
+    def job_panel():
+        finished_now = False
+        for job in reversed(jobs):
+            absorb_job_results(job)
+            
+            st.caption(f"**{job.id}** · {job.label}")
+            if job.active:
+                st.progress(job.progress, text=job.message or job.state.title())
+                if st.button("Cancel", key=f"cancel_job_{job.id}", use_container_width=True):
+                    job.cancel()
+            elif job.state == 'failed':
+                st.error(f"Failed: {job.error}")
+            else:
+                st.caption(f"{job.state.title()} · {job.message}")
+            
+            # Announce each finished job once
+            if not job.active and job.id not in st.session_state.jobs_announced:
+                st.session_state.jobs_announced.add(job.id)
+                log_activity('job', f"Job {job.id} {job.state}: {job.message or job.error}")
+                finished_now = active
+        
+        # Refresh the whole page so stats and lists include the new designs
+        if finished_now:
+            st.rerun()
     
-    def _calculate_net_charge(self, sequence, ph=7.4):
-        """Calculate net charge at given pH"""
-        charge = 0
-        for aa in sequence:
-            props = self.aa_properties.get(aa, {})
-            charge += props.get('charge', 0)
-        return charge
+    job_panel()
+
+# ============================================================================
+# TABLE COLUMNS (label, DesignStore column)
+# ============================================================================
+
+RECENT_DESIGN_COLUMNS = [
+    ('Heavy Length', 'heavy_chain_length'),
+    ('Light Length', 'light_chain_length'),
+    ('Overall Score', 'overall'),
+    ('Physics Score', 'physics'),
+    ('Epitope Score', 'epitope')
+]
+
+SCORE_COLUMNS = [
+    ('Overall', 'overall'),
+    ('Physics', 'physics'),
+    ('Epitope', 'epitope'),
+    ('Developability', 'developability')
+]
+
+PHYSICS_COLUMNS = [
+    ('Binding Energy (kcal/mol)', 'binding_energy'),
+    ('Interface Area (Å²)', 'interface_area'),
+    ('H-Bonds', 'hydrogen_bonds'),
+    ('Shape Complementarity', 'shape_complementarity'),
+    ('Electrostatic Complementarity', 'electrostatic_complementarity')
+]
+
+DEVELOPABILITY_COLUMNS = [
+    ('Solubility Score', 'solubility'),
+    ('Aggregation Risk', 'aggregation_score'),
+    ('Thermal Stability (°C)', 'thermal_stability'),
+    ('Expression Titer (mg/L)', 'expression_titer'),
+    ('Immunogenicity Risk', 'immunogenicity_risk')
+]
 
-# Initialize design engine
-design_engine = AntibodyDesignEngine()
+PICKER_COLUMNS = SCORE_COLUMNS + [('H3 Length', 'H3_length')]
+
+# Analyze page sort options (label -> DesignStore.query_rows order_by)
+PICKER_ORDERINGS = {
+    'Created': 'created',
+    'Overall Score': 'overall',
+    'Physics Score': 'physics',
+    'Epitope Score': 'epitope',
+    'Developability Score': 'developability'
+}
+
+# ID search hits offered at once
+PICKER_MATCHES = 20
+
+# Comparison plot panels: (label, column, color)
+COMPARISON_SCORES = [
+    ('Overall', 'overall', '#58a6ff'),
+    ('Physics', 'physics', '#238636'),
+    ('Epitope', 'epitope', '#8957e5'),
+    ('Developability', 'developability', '#da3633')
+]
+
+# Selections larger than this are plotted as distributions, not per design
+COMPARISON_BAR_LIMIT = 50
+
+# Bins of score histograms and 2-D density maps in large-library plots
+HISTOGRAM_BINS = 40
+DENSITY_BINS = 60
+
+# Default most points a scatter plot sends to the browser (Settings)
+DEFAULT_POINT_BUDGET = 2000
 
 # ============================================================================
 # VISUALIZATION FUNCTIONS
 # ============================================================================
 
-def create_design_comparison_plot(designs):
-    """Create comparison plot for multiple designs"""
+@st.cache_data(max_entries=32, show_spinner=False)
+def create_design_comparison_plot(cache_key, _designs):
+    """Create comparison plot for multiple designs
+    
+    Up to COMPARISON_BAR_LIMIT designs get one bar each; larger selections
+    show score distributions binned with NumPy, so the figure stays the same
+    size. Cached on the designs' cache_key, so a lookup never hashes them.
+    """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    
+    designs = _designs
     if len(designs) < 2:
         return None
     
-    # Extract scores
-    design_ids = [d['design_id'] for d in designs]
-    overall_scores = [d['scores']['overall'] for d in designs]
-    physics_scores = [d['scores']['physics'] for d in designs]
-    epitope_scores = [d['scores']['epitope'] for d in designs]
-    developability_scores = [d['scores']['developability'] for d in designs]
+    large = len(designs) > COMPARISON_BAR_LIMIT
+    suffix = 'Distribution' if large else 'Scores'
     
     # Create figure
     fig = make_subplots(
         rows=2, cols=2,
-        subplot_titles=('Overall Scores', 'Physics Scores', 
-                       'Epitope Scores', 'Developability Scores'),
+        subplot_titles=[f"{label} {suffix}" for label, _, _ in COMPARISON_SCORES],
         vertical_spacing=0.15,
         horizontal_spacing=0.15
     )
     
-    # Overall scores
-    fig.add_trace(
-        go.Bar(
-            x=design_ids,
-            y=overall_scores,
-            name='Overall',
-            marker_color='#58a6ff'
-        ),
-        row=1, col=1
-    )
-    
-    # Physics scores
-    fig.add_trace(
-        go.Bar(
-            x=design_ids,
-            y=physics_scores,
-            name='Physics',
-            marker_color='#238636'
-        ),
-        row=1, col=2
-    )
-    
-    # Epitope scores
-    fig.add_trace(
-        go.Bar(
-            x=design_ids,
-            y=epitope_scores,
-            name='Epitope',
-            marker_color='#8957e5'
-        ),
-        row=2, col=1
-    )
-    
-    # Developability scores
-    fig.add_trace(
-        go.Bar(
-            x=design_ids,
-            y=developability_scores,
-            name='Developability',
-            marker_color='#da3633'
-        ),
-        row=2, col=2
-    )
+    for i, (label, column, color) in enumerate(COMPARISON_SCORES):
+        row, col = i // 2 + 1, i % 2 + 1
+        values = designs.column(column)
+        if large:
+            centers, widths, counts = histogram(values, HISTOGRAM_BINS)
+            trace = go.Bar(x=centers, y=counts, width=widths, name=label, marker_color=color)
+            fig.update_xaxes(range=[0, 1], row=row, col=col)
+        else:
+            trace = go.Bar(x=designs.design_ids, y=values, name=label, marker_color=color)
+            fig.update_yaxes(range=[0, 1], row=row, col=col)
+        fig.add_trace(trace, row=row, col=col)
     
     # Update layout
     fig.update_layout(
         height=600,
         showlegend=False,
+        bargap=0 if large else None,
         plot_bgcolor='rgba(0,0,0,0)',
         paper_bgcolor='rgba(0,0,0,0)',
         font_color='#c9d1d9'
     )
     
-    # Update axes
-    for i in range(1, 5):
-        fig.update_yaxes(range=[0, 1], row=(i-1)//2 + 1, col=(i-1)%2 + 1)
+    return fig
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def create_developability_plot(cache_key, _designs, point_budget):
+    """Aggregation risk against solubility for a large selection
     
+    One WebGL trace of at most point_budget designs, colored by expression
+    titer; above the budget the points sit on a 2-D density map of the
+    whole selection, binned with NumPy.
+    """
+    import plotly.graph_objects as go
+    
+    designs = _designs
+    aggregation = designs.column('aggregation_score')
+    solubility = designs.column('solubility')
+    
+    fig = go.Figure()
+    if len(designs) > point_budget:
+        x_centers, y_centers, counts = density_2d(aggregation, solubility, DENSITY_BINS)
+        fig.add_trace(go.Heatmap(
+            x=x_centers, y=y_centers, z=np.where(counts > 0, counts, np.nan),
+            colorscale='Greys', showscale=False, name='Designs',
+            hovertemplate='Aggregation %{x:.2f}<br>Solubility %{y:.2f}<br>%{z} designs<extra></extra>'
+        ))
+    
+    rows = downsample(len(designs), point_budget)
+    ids = designs.design_ids
+    fig.add_trace(go.Scattergl(
+        x=aggregation[rows],
+        y=solubility[rows],
+        mode='markers',
+        text=[ids[row] for row in rows.tolist()],
+        marker=dict(
+            size=4,
+            color=designs.column('expression_titer')[rows],
+            colorscale='Viridis',
+            colorbar=dict(title='Titer (mg/L)')
+        ),
+        hovertemplate='%{text}<br>Aggregation %{x:.3f}<br>Solubility %{y:.3f}<extra></extra>'
+    ))
+    fig.update_layout(
+        title='Developability Analysis',
+        xaxis_title='Aggregation Risk',
+        yaxis_title='Solubility Score',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='#c9d1d9'
+    )
     return fig
 
 def create_physics_radar_chart(design):
     """Create radar chart for physics analysis"""
+    import plotly.graph_objects as go
+    
     categories = ['Binding Energy', 'Interface Area', 'H-Bonds', 'Shape Comp.', 'Electrostatic']
     
     # Normalize values
@@ -868,25 +904,21 @@ def create_physics_radar_chart(design):
     
     return fig
 
-def create_github_activity_timeline():
-    """Create GitHub activity timeline"""
-    dates = pd.date_range(end=datetime.now(), periods=30, freq='D')
+def create_github_activity_timeline(days=30):
+    """Daily commits, designs and issues from the activity log's per-day counters
     
-    data = {
-        'Date': dates,
-        'Commits': np.random.randint(0, 10, 30),
-        'Designs': np.random.randint(0, 5, 30),
-        'Issues': np.random.randint(0, 3, 30)
-    }
+    Designs use the right-hand axis, since a single run can make thousands.
+    """
+    import plotly.graph_objects as go
     
-    df = pd.DataFrame(data)
+    dates, counts = get_activity_log().daily_counts([kind for kind, _ in TIMELINE_SERIES.values()], days)
     
-    fig = px.line(df, x='Date', y=['Commits', 'Designs', 'Issues'],
-                  color_discrete_map={
-                      'Commits': '#58a6ff',
-                      'Designs': '#238636',
-                      'Issues': '#da3633'
-                  })
+    fig = go.Figure()
+    for label, (kind, color) in TIMELINE_SERIES.items():
+        fig.add_trace(go.Scatter(
+            x=dates, y=counts[kind], name=label, mode='lines+markers',
+            line=dict(color=color), yaxis='y2' if kind == 'design' else 'y'
+        ))
     
     fig.update_layout(
         title='GitHub Activity Timeline',
@@ -895,7 +927,8 @@ def create_github_activity_timeline():
         plot_bgcolor='rgba(0,0,0,0)',
         paper_bgcolor='rgba(0,0,0,0)',
         font_color='#c9d1d9',
-        legend_title_text='Activity Type'
+        legend_title_text='Activity Type',
+        yaxis2=dict(title='Designs', overlaying='y', side='right', showgrid=False)
     )
     
     fig.update_xaxes(gridcolor='#30363d')
@@ -975,18 +1008,31 @@ def show_sidebar():
         
         st.markdown("---")
         
+        # Background jobs (before the stats, which include their designs)
+        if st.session_state.job_ids:
+            st.markdown("### ⏳ Jobs")
+            show_jobs()
+            st.markdown("---")
+        
         # Quick Stats
         st.markdown("### 📈 Quick Stats")
         col1, col2 = st.columns(2)
+        stats = st.session_state.designs.stats
         with col1:
-            st.metric("Designs", len(st.session_state.designs))
+            st.metric("Designs", stats.count())
         with col2:
             st.metric("Repos", len(st.session_state.github_repos))
+        if stats.count():
+            st.caption(
+                f"Best {stats.best():.2f} · Mean {stats.mean():.2f} ± {stats.variance() ** 0.5:.2f} · "
+                f"Antigens {len(stats.antigens)}"
+            )
         
         # Recent Activity
-        if st.session_state.recent_activity:
+        activities = recent_activity(3)
+        if activities:
             st.markdown("### 📝 Recent")
-            for activity in st.session_state.recent_activity[-3:]:
+            for activity in activities:
                 st.caption(f"• {activity}")
         
         st.markdown("---")
@@ -994,8 +1040,8 @@ def show_sidebar():
         # Quick Actions
         st.markdown("### ⚡ Quick Actions")
         if st.button("🔄 Clear Designs", use_container_width=True):
-            st.session_state.designs = []
-            st.session_state.recent_activity.append("Cleared all designs")
+            st.session_state.designs.clear()
+            log_activity('library', "Cleared all designs")
             st.rerun()
         
         if st.button("💾 Export All", use_container_width=True):
@@ -1009,17 +1055,18 @@ def show_dashboard():
     
     # Metrics Row
     col1, col2, col3, col4 = st.columns(4)
+    stats = st.session_state.designs.stats
     
     with col1:
         st.markdown("""
         <div class="metric-card">
             <div class="metric-value">{}</div>
-            <div class="metric-label">Total Designs</div>
+            <div class="metric-label">Designs in Session</div>
         </div>
-        """.format(len(st.session_state.designs)), unsafe_allow_html=True)
+        """.format(stats.count()), unsafe_allow_html=True)
     
     with col2:
-        best_score = max([d['scores']['overall'] for d in st.session_state.designs]) if st.session_state.designs else 0
+        best_score = stats.best() if stats.count() else 0
         st.markdown("""
         <div class="metric-card">
             <div class="metric-value">{:.2f}</div>
@@ -1046,10 +1093,11 @@ def show_dashboard():
     
     # Recent Designs
     st.markdown("### 🧬 Recent Designs")
+    st.caption("Newest in the shared library, from every session")
     
-    if st.session_state.designs:
-        recent_designs = st.session_state.designs[-5:]  # Last 5 designs
-        
+    recent_designs = get_repository().recent(5)[::-1]  # Last 5 designs
+    
+    if recent_designs:
         for design in recent_designs:
             with st.container():
                 col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
@@ -1102,16 +1150,27 @@ def show_dashboard():
             }
             
             with st.spinner("Designing antibodies..."):
-                for i in range(num_designs):
-                    design = design_engine.generate_antibody_design(antigen, params)
-                    st.session_state.designs.append(design)
-                    st.session_state.recent_activity.append(
-                        f"Created design {design['design_id']} for {antigen}"
-                    )
+                designs = design_engine.generate_batch(antigen, params, num_designs, skip=st.session_state.designs)
+                save_designs(designs)
+                if designs:
+                    log_activity('design', f"Created {len(designs)} designs for {antigen}", count=len(designs))
                 
-                st.success(f"✅ Generated {num_designs} antibody designs!")
+                st.success(f"✅ Generated {len(designs)} antibody designs!")
+                if len(designs) < num_designs:
+                    st.info(f"Skipped {num_designs - len(designs)} duplicate designs")
                 st.rerun()
 
+@fragment()
+def show_physics_settings():
+    """Physics weight sliders; they only rerun themselves"""
+    st.markdown("#### Physics Settings")
+    for param, value in st.session_state.physics_params.items():
+        st.session_state.physics_params[param] = st.slider(
+            param.replace('_', ' ').title(),
+            0.0, 1.0, value, 0.05,
+            key=f"physics_{param}"
+        )
+
 def show_design_studio():
     """Show antibody design studio"""
     st.markdown("## 🎯 Antibody Design Studio")
@@ -1131,16 +1190,23 @@ def show_design_studio():
                 custom_antigen = st.text_input("Custom Antigen Name", "Custom_Antigen")
                 antigen_seq = st.text_area("Antigen Sequence (optional)", height=100)
             
-            num_designs = st.slider("Number of Designs", 1, 10, 3)
+            generation_mode = st.radio(
+                "Generation Mode",
+                ["Optimized", "Diverse Ensemble", "High-Throughput"],
+                horizontal=True,
+                help=(
+                    "Diverse Ensemble uses Ensemble Size and Sequence Diversity from Settings > CDR Settings; "
+                    "High-Throughput samples large libraries without optimization"
+                )
+            )
+            
+            if generation_mode == "High-Throughput":
+                num_designs = st.number_input("Number of Designs", 100, 100000, 10000, step=1000)
+            else:
+                num_designs = st.slider("Number of Designs", 1, 10, 3)
         
         with col2:
-            st.markdown("#### Physics Settings")
-            for param, value in st.session_state.physics_params.items():
-                st.session_state.physics_params[param] = st.slider(
-                    param.replace('_', ' ').title(),
-                    0.0, 1.0, value, 0.05,
-                    key=f"physics_{param}"
-                )
+            show_physics_settings()
         
         with col3:
             st.markdown("#### Advanced Settings")
@@ -1183,6 +1249,7 @@ def show_design_studio():
             with col2:
                 branch = st.text_input("Branch", "main")
                 tags = st.text_input("Tags (comma separated)", "therapeutic,optimized")
+                push_layout = st.selectbox("Push Layout", list(PUSH_LAYOUTS), format_func=PUSH_LAYOUTS.get)
                 
                 auto_push = st.checkbox("Auto-push to GitHub", value=True)
         else:
@@ -1191,79 +1258,61 @@ def show_design_studio():
     # Run Design Button
     st.markdown("---")
     if st.button("🚀 Run Antibody Design", type="primary", use_container_width=True):
-        with st.spinner("Designing antibodies... This may take a moment."):
-            # Progress bar
-            progress_bar = st.progress(0)
-            
-            # Prepare parameters
-            params = {
-                'cdr_length_sampling': 'natural' if cdr_sampling == "Natural Distribution" else 'fixed',
-                'score_weights': st.session_state.physics_params,
-                'epitope_weight': st.session_state.epitope_params['weight'] if use_epitope else 0,
-                'optimization_level': optimization.lower()
+        # Prepare parameters
+        params = {
+            'cdr_length_sampling': 'natural' if cdr_sampling == "Natural Distribution" else 'fixed',
+            'score_weights': st.session_state.physics_params,
+            'epitope_weight': st.session_state.epitope_params['weight'] if use_epitope else 0,
+            'optimization_level': optimization.lower()
+        }
+        
+        # Diverse Ensemble sizes come from Settings > CDR Settings
+        mode, count = {
+            "Optimized": ('optimized', num_designs),
+            "Diverse Ensemble": ('ensemble', st.session_state.cdr_params['ensemble_size']),
+            "High-Throughput": ('batch', num_designs)
+        }[generation_mode]
+        
+        # Push the run to GitHub as one commit once it finishes
+        push = None
+        if st.session_state.github_connected and auto_push and selected_repo:
+            push = {
+                'repo': github.full_name(selected_repo),
+                'message': commit_message,
+                'branch': branch or 'main',
+                'layout': push_layout,
+                'callback': push_callback(st.session_state.push_results, st.session_state.session_id)
             }
-            
-            # Generate designs
-            designs = []
-            for i in range(num_designs):
-                # Update progress
-                progress = int((i + 1) / num_designs * 100)
-                progress_bar.progress(progress)
-                
-                # Generate design
-                design = design_engine.generate_antibody_design(antigen, params)
-                designs.append(design)
-                
-                # Small delay for realism
-                time.sleep(0.1)
-            
-            # Add to session state
-            st.session_state.designs.extend(designs)
-            
-            # Save to GitHub if connected
-            if st.session_state.github_connected and auto_push and selected_repo:
-                for design in designs:
-                    success, message = github.push_design(
-                        selected_repo,
-                        design,
-                        commit_message
-                    )
-                    if success:
-                        st.session_state.recent_activity.append(message)
-            
-            # Add to recent activity
-            st.session_state.recent_activity.append(
-                f"Created {len(designs)} designs for {antigen}"
-            )
-            
-            progress_bar.empty()
-            st.success(f"✅ Successfully generated {len(designs)} antibody designs!")
-            
-            # Show results immediately
-            st.rerun()
+        
+        # Generate in the background; the Jobs panel tracks progress
+        job = get_job_runner().submit(
+            f"{count} {generation_mode.lower()} designs for {antigen}",
+            run_design_job, get_repository(), get_design_pusher(), push, get_activity_log(),
+            owner=st.session_state.session_id, engine=design_engine, antigen_name=antigen, params=params, n=count,
+            mode=mode, diversity=st.session_state.cdr_params['diversity']
+        )
+        st.session_state.job_ids.append(job.id)
+        log_activity('job', f"Started job {job.id}: {job.label}")
+        st.success(f"🚀 Started job {job.id} — follow its progress under Jobs in the sidebar")
     
-    # Show recent designs if any
-    if st.session_state.designs:
+    # Recent designs for the current antigen from the library
+    show_recent_designs(antigen)
+
+@fragment()
+def show_recent_designs(antigen):
+    """Latest library designs for an antigen with export buttons"""
+    recent_designs = get_repository().recent(10, antigen=antigen)  # Last 10 designs
+    
+    if recent_designs:
         st.markdown("### 📋 Recent Designs")
         
-        # Filter designs for current antigen
-        antigen_designs = [d for d in st.session_state.designs if d['antigen_name'] == antigen]
+        # Everything for this antigen, streamed page by page on export
+        antigen_designs = get_repository().query(antigen)
         
         if antigen_designs:
             # Show as DataFrame
-            df_data = []
-            for design in antigen_designs[-10:]:  # Last 10 designs
-                df_data.append({
-                    'ID': design['design_id'],
-                    'Heavy Length': len(design['heavy_chain']),
-                    'Light Length': len(design['light_chain']),
-                    'Overall Score': design['scores']['overall'],
-                    'Physics Score': design['scores']['physics'],
-                    'Epitope Score': design['scores']['epitope']
-                })
-            
-            df = pd.DataFrame(df_data)
-            st.dataframe(df, use_container_width=True)
+            df = DesignStore(reversed(recent_designs)).frame(RECENT_DESIGN_COLUMNS, index_label='ID')
+            st.dataframe(df.reset_index(), use_container_width=True)
             
             # Download options
             st.markdown("#### 📥 Export Options")
@@ -1281,8 +1330,113 @@ def show_design_studio():
                 if st.button("Export as FASTA", use_container_width=True):
                     export_fasta(antigen_designs)
 
+def paginate(total, key, page_sizes=(25, 50, 100, 250)):
+    """Rows-per-page and page widgets; returns the (start, stop) of the page"""
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        page_size = st.selectbox("Rows per page", page_sizes, key=f"{key}_page_size")
+    
+    pages = max(1, -(-total // page_size))
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    with col2:
+        page = st.number_input("Page", 1, pages, 1, key=f"{key}_page")
+    with col3:
+        st.caption(f"{total:,} designs · page {page} of {pages}")
+    
+    start = (page - 1) * page_size
+    return start, min(total, start + page_size)
+
+def set_selection(design_ids):
+    """Replace the Analyze selection and its digest
+    
+    The digest is taken only when the selection changes and serves as the
+    cache token of the selected designs. Returns the new selection.
+    """
+    st.session_state.analyze_selection = selection = list(design_ids)
+    st.session_state.selection_token = hashlib.blake2b(
+        '\n'.join(selection).encode('utf-8'), digest_size=16
+    ).hexdigest()
+    return selection
+
+def show_design_picker(store):
+    """Paged, sortable table and ID search for choosing designs to analyze
+    
+    Only the current page of rows and at most PICKER_MATCHES search hits
+    are sent to the browser; the selection lives in session state.
+    """
+    if 'analyze_selection' not in st.session_state:
+        set_selection(store.design_ids[:3])
+    selection = st.session_state.analyze_selection
+    st.session_state.setdefault('picker_version', 0)
+    kept = [design_id for design_id in selection if design_id in store]
+    if len(kept) != len(selection):
+        selection = set_selection(kept)
+    
+    with st.expander(f"🔎 Select designs ({len(selection)} selected)", expanded=not selection):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            antigen = st.selectbox("Antigen", ["All antigens"] + store.antigens, key='picker_antigen')
+        with col2:
+            sort_label = st.selectbox("Sort by", list(PICKER_ORDERINGS), key='picker_sort')
+        with col3:
+            descending = st.checkbox("Descending", value=True, key='picker_descending')
+        
+        rows = store.query_rows(
+            None if antigen == "All antigens" else antigen,
+            PICKER_ORDERINGS[sort_label],
+            descending
+        )
+        start, stop = paginate(len(rows), 'picker')
+        page_rows = rows[start:stop]
+        
+        df_page = store.frame(PICKER_COLUMNS, page_rows, index_label='ID').reset_index()
+        df_page.insert(0, 'Select', df_page['ID'].isin(selection))
+        edited = st.data_editor(
+            df_page,
+            disabled=[column for column in df_page.columns if column != 'Select'],
+            hide_index=True,
+            use_container_width=True,
+            # Remount after Add/Clear so stale checkbox edits are not reapplied
+            key=f"picker_table_{antigen}_{sort_label}_{descending}_{start}_{stop}_{st.session_state.picker_version}"
+        )
+        
+        # Apply this page's checkboxes, keeping selections made elsewhere
+        checked = dict(zip(edited['ID'], edited['Select']))
+        updated = [design_id for design_id in selection if checked.get(design_id, True)] + [
+            design_id for design_id, is_checked in checked.items() if is_checked and design_id not in selection
+        ]
+        if updated != selection:
+            selection = set_selection(updated)
+        
+        # Find designs by ID through the store's index
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            query = st.text_input("Find design by ID", placeholder="ABG2_3fa2… or a hash fragment", key='picker_query')
+        matches = store.search_ids(query, PICKER_MATCHES) if query.strip() else []
+        with col2:
+            match = st.selectbox("Matches", matches, disabled=not matches)
+        if st.button("➕ Add to Selection", disabled=not match or match in selection):
+            set_selection(selection + [match])
+            st.session_state.picker_version += 1
+            st.rerun()
+        
+        if selection and st.button("Clear Selection"):
+            set_selection([])
+            st.session_state.picker_version += 1
+            st.rerun()
+    
+    return list(selection)
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def design_frame(cache_key, _designs, columns):
+    """DataFrame of a store or view, cached on its cache_key"""
+    return _designs.frame(columns)
+
 def show_analyze_designs():
     """Show design analysis page"""
+    import plotly.express as px
+    
     st.markdown("## 📊 Design Analysis")
     
     if not st.session_state.designs:
@@ -1290,43 +1444,35 @@ def show_analyze_designs():
         return
     
     # Select designs to analyze
-    design_options = {d['design_id']: d for d in st.session_state.designs}
-    selected_ids = st.multiselect(
-        "Select designs to analyze",
-        options=list(design_options.keys()),
-        default=list(design_options.keys())[:min(3, len(design_options))]
-    )
+    store = st.session_state.designs
+    selected_ids = show_design_picker(store)
     
     if not selected_ids:
+        st.info("Select designs in the table above or find them by ID.")
         return
     
-    selected_designs = [design_options[id] for id in selected_ids]
+    selected_designs = store.subset(
+        [store.row_of(id) for id in selected_ids],
+        token=st.session_state.selection_token
+    )
     
     # Analysis Tabs
-    tab1, tab2, tab3, tab4 = st.tabs(["📈 Comparison", "⚛️ Physics", "🧪 Developability", "📋 Details"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(
+        ["📈 Comparison", "⚛️ Physics", "🧪 Developability", "📋 Details", "🏔️ Pareto"]
+    )
     
     with tab1:
         # Comparison
         st.markdown("### Design Comparison")
         
-        fig = create_design_comparison_plot(selected_designs)
+        fig = create_design_comparison_plot(selected_designs.cache_key, selected_designs)
         if fig:
             st.plotly_chart(fig, use_container_width=True)
         
         # Score matrix
         st.markdown("#### Score Matrix")
-        score_data = []
-        for design in selected_designs:
-            score_data.append({
-                'Design': design['design_id'],
-                'Overall': design['scores']['overall'],
-                'Physics': design['scores']['physics'],
-                'Epitope': design['scores']['epitope'],
-                'Developability': design['scores']['developability']
-            })
-        
-        df_scores = pd.DataFrame(score_data)
-        st.dataframe(df_scores.set_index('Design'), use_container_width=True)
+        df_scores = design_frame(selected_designs.cache_key, selected_designs, SCORE_COLUMNS)
+        st.dataframe(df_scores, use_container_width=True)
     
     with tab2:
         # Physics Analysis
@@ -1339,46 +1485,30 @@ def show_analyze_designs():
         
         # Physics metrics table
         st.markdown("#### Physics Metrics")
-        physics_data = []
-        for design in selected_designs:
-            physics_data.append({
-                'Design': design['design_id'],
-                'Binding Energy (kcal/mol)': design['physics_analysis']['binding_energy'],
-                'Interface Area (Å²)': design['physics_analysis']['interface_area'],
-                'H-Bonds': design['physics_analysis']['hydrogen_bonds'],
-                'Shape Complementarity': design['physics_analysis']['shape_complementarity'],
-                'Electrostatic Complementarity': design['physics_analysis']['electrostatic_complementarity']
-            })
-        
-        df_physics = pd.DataFrame(physics_data)
-        st.dataframe(df_physics.set_index('Design'), use_container_width=True)
+        df_physics = design_frame(selected_designs.cache_key, selected_designs, PHYSICS_COLUMNS)
+        st.dataframe(df_physics, use_container_width=True)
     
     with tab3:
         # Developability Analysis
         st.markdown("### 🧪 Developability Analysis")
         
         # Developability metrics
-        develop_data = []
-        for design in selected_designs:
-            develop_data.append({
-                'Design': design['design_id'],
-                'Solubility Score': design['developability']['solubility'],
-                'Aggregation Risk': design['developability']['aggregation_score'],
-                'Thermal Stability (°C)': design['developability']['thermal_stability'],
-                'Expression Titer (mg/L)': design['developability']['expression_titer'],
-                'Immunogenicity Risk': design['developability']['immunogenicity_risk']
-            })
-        
-        df_develop = pd.DataFrame(develop_data)
+        df_develop = design_frame(selected_designs.cache_key, selected_designs, DEVELOPABILITY_COLUMNS).reset_index()
         st.dataframe(df_develop.set_index('Design'), use_container_width=True)
         
         # Developability visualization
-        if len(selected_designs) > 1:
+        if len(selected_designs) > COMPARISON_BAR_LIMIT:
+            budget = st.session_state.plot_point_budget
+            fig = create_developability_plot(selected_designs.cache_key, selected_designs, budget)
+            if len(selected_designs) > budget:
+                st.caption(f"Showing {budget:,} of {len(selected_designs):,} designs over a density map of all of them")
+            st.plotly_chart(fig, use_container_width=True)
+        elif len(selected_designs) > 1:
             fig = px.scatter(
                 df_develop,
                 x='Aggregation Risk',
                 y='Solubility Score',
-                size='Expression Titer',
+                size='Expression Titer (mg/L)',
                 color='Design',
                 hover_name='Design',
                 title='Developability Analysis',
@@ -1392,50 +1522,164 @@ def show_analyze_designs():
             st.plotly_chart(fig, use_container_width=True)
     
     with tab4:
-        # Detailed view
-        st.markdown("### 📋 Design Details")
+        show_design_details(store, selected_ids)
+    
+    with tab5:
+        show_pareto_view(store)
+
+@fragment()
+def show_design_details(store, selected_ids):
+    """Sequences, CDRs, refinement and downloads of one selected design"""
+    # Detailed view
+    st.markdown("### 📋 Design Details")
+    
+    selected_design = st.selectbox(
+        "Select design for detailed view",
+        options=selected_ids
+    )
+    
+    if selected_design:
+        design = store.design(store.row_of(selected_design))
         
-        selected_design = st.selectbox(
-            "Select design for detailed view",
-            options=[d['design_id'] for d in selected_designs]
-        )
+        col1, col2 = st.columns(2)
         
-        if selected_design:
-            design = next(d for d in selected_designs if d['design_id'] == selected_design)
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.markdown("#### Sequences")
-                st.text_area("Heavy Chain", design['heavy_chain'], height=150)
-                st.text_area("Light Chain", design['light_chain'], height=150)
-            
-            with col2:
-                st.markdown("#### CDR Regions")
-                for cdr_type, sequence in design['cdrs'].items():
-                    st.text_input(f"{cdr_type} ({len(sequence)} AA)", sequence)
-            
-            # Metadata
-            with st.expander("Metadata"):
-                st.json(design['metadata'])
-            
-            # Download this design
-            st.markdown("---")
-            st.markdown("#### Download This Design")
-            
-            col_d1, col_d2, col_d3 = st.columns(3)
-            
-            with col_d1:
-                if st.button("📥 JSON", use_container_width=True):
-                    export_json([design], f"{design['design_id']}.json")
-            
-            with col_d2:
-                if st.button("📥 FASTA", use_container_width=True):
-                    export_fasta([design], f"{design['design_id']}.fasta")
+        with col1:
+            st.markdown("#### Sequences")
+            st.text_area("Heavy Chain", design['heavy_chain'], height=150)
+            st.text_area("Light Chain", design['light_chain'], height=150)
+        
+        with col2:
+            st.markdown("#### CDR Regions")
+            for cdr_type, sequence in design['cdrs'].items():
+                st.text_input(f"{cdr_type} ({len(sequence)} AA)", sequence)
+        
+        # Metadata
+        with st.expander("Metadata"):
+            st.json(design['metadata'])
+        
+        # Local refinement
+        with st.expander("🔥 Refine with Simulated Annealing"):
+            steps = st.select_slider(
+                "Proposal Steps",
+                options=[10_000, 100_000, 1_000_000, 5_000_000],
+                value=100_000,
+                format_func=lambda value: f"{value:,}"
+            )
             
-            with col_d3:
-                if st.button("📥 Report", use_container_width=True):
-                    export_design_report(design)
+            if st.button("Refine Design", use_container_width=True):
+                with st.spinner("Annealing CDR residues..."):
+                    refined = design_engine.refine_design(design, steps)
+                
+                # Annealing falls back to the original CDRs, and so its ID, when nothing improves
+                if refined['design_id'] == design['design_id']:
+                    st.info("No improvement found; the design is already a local optimum")
+                elif refined['design_id'] in store:
+                    st.info(f"The refined design {refined['design_id']} is already in the library")
+                else:
+                    save_designs([refined])
+                    log_activity('design', f"Refined {design['design_id']} into {refined['design_id']}")
+                    st.success(
+                        f"✅ Created {refined['design_id']} "
+                        f"(overall {design['scores']['overall']:.3f} → {refined['scores']['overall']:.3f})"
+                    )
+        
+        # Download this design
+        st.markdown("---")
+        st.markdown("#### Download This Design")
+        
+        col_d1, col_d2, col_d3 = st.columns(3)
+        
+        with col_d1:
+            if st.button("📥 JSON", use_container_width=True):
+                export_json([design], f"{design['design_id']}.json")
+        
+        with col_d2:
+            if st.button("📥 FASTA", use_container_width=True):
+                export_fasta([design], f"{design['design_id']}.fasta")
+        
+        with col_d3:
+            if st.button("📥 Report", use_container_width=True):
+                export_design_report(design)
+
+def get_pareto_ranks(store):
+    """Pareto fronts and crowding distances of the session library
+    
+    Reused until the store's cache key changes.
+    """
+    key = store.cache_key
+    cached = st.session_state.get('pareto_cache')
+    if cached is None or cached[0] != key:
+        cached = (key,) + pareto_rank(store)
+        st.session_state.pareto_cache = cached
+    return cached[1], cached[2]
+
+@fragment()
+def show_pareto_view(store):
+    """Pareto fronts over physics, epitope and developability"""
+    import plotly.express as px
+    
+    st.markdown("### 🏔️ Pareto Fronts")
+    st.caption("Designs no other design beats on physics, epitope and developability at once form front 1.")
+    
+    ranks, crowding = get_pareto_ranks(store)
+    front_count = int(ranks.max()) + 1
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Fronts", front_count)
+    with col2:
+        st.metric("Front 1 Designs", int((ranks == 0).sum()))
+    with col3:
+        # A slider needs min < max, so a single front is plotted as is
+        shown_fronts = 1
+        if front_count > 1:
+            shown_fronts = st.slider("Fronts to plot", 1, min(front_count, 20), min(front_count, 5))
+    
+    shown = np.flatnonzero(ranks < shown_fronts)
+    budget = st.session_state.plot_point_budget
+    if len(shown) > budget:
+        st.caption(f"Plotting {budget:,} of {len(shown):,} designs on these fronts")
+        shown = shown[downsample(len(shown), budget)]
+    fig = px.scatter_3d(
+        x=store.column('physics')[shown],
+        y=store.column('epitope')[shown],
+        z=store.column('developability')[shown],
+        color=(ranks[shown] + 1).astype(str),
+        hover_name=[store.design_ids[row] for row in shown.tolist()],
+        labels={'x': 'Physics', 'y': 'Epitope', 'z': 'Developability', 'color': 'Front'},
+        title='Pareto Fronts'
+    )
+    fig.update_traces(marker=dict(size=3))
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='#c9d1d9'
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # One front, most isolated (crowding distance) first, a page at a time
+    front = st.number_input("Front", 1, front_count, 1) - 1
+    rows = front_rows(ranks, crowding, front)
+    start, stop = paginate(len(rows), f"pareto_front_{front}")
+    df_front = store.frame(SCORE_COLUMNS, rows[start:stop])
+    df_front['Crowding'] = crowding[rows[start:stop]]
+    st.dataframe(df_front, use_container_width=True)
+    
+    st.markdown(f"#### 📥 Export Front {front + 1} ({len(rows)} designs)")
+    front_designs = store.subset(rows)
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        if st.button("Export Front as JSON", use_container_width=True):
+            export_json(front_designs, f"abgenesis_pareto_front_{front + 1}.json")
+    
+    with col2:
+        if st.button("Export Front as CSV", use_container_width=True):
+            export_csv(front_designs, f"abgenesis_pareto_front_{front + 1}.csv")
+    
+    with col3:
+        if st.button("Export Front as FASTA", use_container_width=True):
+            export_fasta(front_designs, f"abgenesis_pareto_front_{front + 1}.fasta")
 
 def show_github_repos():
     """Show GitHub repositories page"""
@@ -1468,7 +1712,7 @@ def show_github_repos():
                 
                 if success:
                     st.success(f"✅ Repository '{new_repo_name}' created!")
-                    st.session_state.recent_activity.append(f"Created repository {new_repo_name}")
+                    log_activity('repository', f"Created repository {new_repo_name}")
                     st.rerun()
                 else:
                     st.error(f"❌ Failed to create repository: {repo}")
@@ -1633,7 +1877,7 @@ def show_collaboration():
                     
                     if success:
                         st.success(f"✅ Issue #{issue['number']} created!")
-                        st.session_state.recent_activity.append(f"Created issue #{issue['number']}")
+                        log_activity('issue', f"Created issue #{issue['number']}")
                     else:
                         st.error(f"❌ Failed to create issue: {issue}")
         
@@ -1701,7 +1945,7 @@ def show_collaboration():
         # Create project
         if st.button("🎯 Create Antibody Design Project", use_container_width=True):
             st.success("Project board created with columns: Backlog → Design → Test → Optimize → Done")
-            st.session_state.recent_activity.append("Created antibody design project")
+            log_activity('repository', "Created antibody design project")
         
         # Sample project
         st.markdown("""
@@ -1796,10 +2040,11 @@ def show_settings():
         with col2:
             st.markdown("#### CDR Settings")
             st.session_state.cdr_params['ensemble_size'] = st.slider(
-                "Ensemble Size", 1, 100, 20
+                "Ensemble Size", 1, 100, st.session_state.cdr_params['ensemble_size']
             )
             st.session_state.cdr_params['diversity'] = st.slider(
-                "Sequence Diversity", 0.0, 1.0, 0.5, 0.05
+                "Sequence Diversity", 0.0, 1.0, st.session_state.cdr_params['diversity'], 0.05,
+                help="Minimum fraction of CDR positions that must differ between ensemble members"
             )
             st.session_state.cdr_params['length_sampling'] = st.selectbox(
                 "Length Sampling Method",
@@ -1812,6 +2057,11 @@ def show_settings():
             "Default Export Format",
             ["json", "csv", "fasta", "all"]
         )
+        st.session_state.export_compression = st.selectbox(
+            "Compression",
+            ["none", "gzip", "bz2", "lzma"],
+            help="Compress JSON, CSV and FASTA downloads while they are written"
+        )
         
         col1, col2 = st.columns(2)
         with col1:
@@ -1823,6 +2073,32 @@ def show_settings():
                 "Include Metadata", value=True
             )
         
+        # Persistent library
+        st.markdown("#### Library")
+        repository = get_repository()
+        st.caption(f"{repository.count()} designs stored in {repository.path}")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if st.button("📂 Load Recent 50", use_container_width=True):
+                st.session_state.designs = DesignStore(reversed(repository.recent(50)))
+                st.rerun()
+        with col2:
+            if st.button("🏆 Load Top 50", use_container_width=True):
+                st.session_state.designs = DesignStore(repository.top(50))
+                st.rerun()
+        with col3:
+            # The library is shared by every session, so deleting needs a confirmation
+            confirmed = st.checkbox(
+                f"Delete all {repository.count():,} designs for every session",
+                key='confirm_delete_library'
+            )
+            if st.button("🗑️ Delete Library", disabled=not confirmed, use_container_width=True):
+                repository.clear()
+                log_activity('library', "Deleted design library")
+                st.session_state.pop('confirm_delete_library', None)
+                st.rerun()
+        
         # Backup settings
         st.markdown("#### Backup")
         if st.button("💾 Backup All Designs", use_container_width=True):
@@ -1837,8 +2113,9 @@ def show_settings():
             )
             if uploaded_file:
                 designs = restore_backup(uploaded_file)
-                st.session_state.designs = designs
-                st.success(f"✅ Restored {len(designs)} designs")
+                st.session_state.designs = DesignStore()
+                restored = save_designs(designs)
+                st.success(f"✅ Restored {restored} designs")
     
     # Theme Settings
     st.markdown("### 🎨 Theme")
@@ -1847,7 +2124,33 @@ def show_settings():
     # Advanced Settings
     with st.expander("🔧 Advanced Settings"):
         st.markdown("#### Performance")
-        cache_enabled = st.checkbox("Enable Cache", value=True)
+        # The score cache is shared by every session and background job,
+        # so this is a server-wide switch rather than a session preference
+        cache_enabled = st.checkbox(
+            "Enable Score Cache (all sessions)",
+            value=design_engine.score_cache.enabled,
+            help="Reuse the deterministic physics and developability terms of sequences already scored. "
+                 "Applies to every session and running job on this server."
+        )
+        if cache_enabled != design_engine.score_cache.enabled:
+            design_engine.score_cache.enabled = cache_enabled
+        
+        cache_stats = design_engine.score_cache.stats()
+        st.caption(
+            f"Score cache: {cache_stats['size']:,}/{cache_stats['maxsize']:,} sequences · "
+            f"{cache_stats['hits']:,} hits · {cache_stats['misses']:,} misses · "
+            f"{cache_stats['hit_rate']:.0%} hit rate"
+        )
+        if st.button("Clear Score Cache"):
+            design_engine.score_cache.clear()
+            st.rerun()
+        
+        st.session_state.plot_point_budget = st.number_input(
+            "Plot Point Budget",
+            500, 100000, st.session_state.plot_point_budget, step=500,
+            help="Most designs a scatter plot draws; larger libraries are downsampled over a density map"
+        )
+        
         batch_size = st.slider("Batch Size", 1, 100, 10)
         
         st.markdown("#### Experimental Features")
@@ -1863,68 +2166,57 @@ def show_settings():
 # EXPORT FUNCTIONS
 # ============================================================================
 
-def export_json(designs, filename="abgenesis_designs.json"):
-    """Export designs as JSON"""
-    if not designs:
-        st.warning("No designs to export")
-        return
-    
-    data = {
-        'metadata': {
-            'exported': datetime.now().isoformat(),
-            'version': '2.1.0',
-            'count': len(designs)
-        },
-        'designs': designs
-    }
+# Downloads larger than this point to the streaming command line
+LARGE_DOWNLOAD = 100_000
+
+def download_export(designs, fmt, filename, label):
+    """Stream designs through the export pipeline into a download button
     
-    json_str = json.dumps(data, indent=2)
+    The export is built in a spooled file, but st.download_button only
+    takes bytes or plain file objects and keeps every download in memory
+    until it is served. Only the command line
+    (`python -m abgenesis --output ...`) streams end to end.
+    """
+    compression = st.session_state.get('export_compression', 'none')
+    spool = spool_export(designs, fmt, compression)
     
     st.download_button(
-        label="📥 Download JSON",
-        data=json_str,
-        file_name=filename,
-        mime="application/json",
+        label=label,
+        data=spool.read(),
+        file_name=export_filename(os.path.splitext(filename)[0], fmt, compression),
+        mime=export_mime(fmt, compression),
         use_container_width=True
     )
+    if len(designs) > LARGE_DOWNLOAD:
+        st.caption(
+            f"Browser downloads of {len(designs):,} designs are held in server memory; "
+            "generate very large runs with `python -m abgenesis --output ...` instead."
+        )
     
-    st.session_state.recent_activity.append(f"Exported {len(designs)} designs as JSON")
-    return json_str
+    spool.seek(0)
+    return spool
 
-def export_csv(designs):
-    """Export designs as CSV"""
+def export_json(designs, filename="abgenesis_designs.json"):
+    """Export designs as JSON"""
     if not designs:
         st.warning("No designs to export")
         return
     
-    # Flatten design data
-    rows = []
-    for design in designs:
-        row = {
-            'design_id': design['design_id'],
-            'antigen': design['antigen_name'],
-            'heavy_chain': design['heavy_chain'],
-            'light_chain': design['light_chain'],
-            'overall_score': design['scores']['overall'],
-            'physics_score': design['scores']['physics'],
-            'epitope_score': design['scores']['epitope'],
-            'developability_score': design['scores']['developability']
-        }
-        rows.append(row)
+    spool = download_export(designs, 'json', filename, "📥 Download JSON")
     
-    df = pd.DataFrame(rows)
-    csv = df.to_csv(index=False)
+    log_activity('export', f"Exported {len(designs)} designs as JSON")
+    return spool
+
+def export_csv(designs, filename="abgenesis_designs.csv"):
+    """Export designs as CSV"""
+    if not designs:
+        st.warning("No designs to export")
+        return
     
-    st.download_button(
-        label="📥 Download CSV",
-        data=csv,
-        file_name="abgenesis_designs.csv",
-        mime="text/csv",
-        use_container_width=True
-    )
+    spool = download_export(designs, 'csv', filename, "📥 Download CSV")
     
-    st.session_state.recent_activity.append(f"Exported {len(designs)} designs as CSV")
-    return csv
+    log_activity('export', f"Exported {len(designs)} designs as CSV")
+    return spool
 
 def export_fasta(designs, filename="abgenesis_designs.fasta"):
     """Export designs as FASTA"""
@@ -1932,25 +2224,10 @@ def export_fasta(designs, filename="abgenesis_designs.fasta"):
         st.warning("No designs to export")
         return
     
-    fasta_lines = []
-    for design in designs:
-        fasta_lines.append(f">{design['design_id']}_heavy | {design['antigen_name']}")
-        fasta_lines.append(design['heavy_chain'])
-        fasta_lines.append(f">{design['design_id']}_light | {design['antigen_name']}")
-        fasta_lines.append(design['light_chain'])
-    
-    fasta_str = "\n".join(fasta_lines)
+    spool = download_export(designs, 'fasta', filename, "📥 Download FASTA")
     
-    st.download_button(
-        label="📥 Download FASTA",
-        data=fasta_str,
-        file_name=filename,
-        mime="text/plain",
-        use_container_width=True
-    )
-    
-    st.session_state.recent_activity.append(f"Exported {len(designs)} designs as FASTA")
-    return fasta_str
+    log_activity('export', f"Exported {len(designs)} designs as FASTA")
+    return spool
 
 def export_design_report(design):
     """Export a comprehensive design report"""
@@ -2027,7 +2304,7 @@ def export_design_report(design):
         use_container_width=True
     )
     
-    st.session_state.recent_activity.append(f"Exported report for {design['design_id']}")
+    log_activity('export', f"Exported report for {design['design_id']}")
     return report
 
 def export_all_designs():
@@ -2036,86 +2313,20 @@ def export_all_designs():
         st.warning("No designs to export")
         return
     
-    # Create a zip file in memory
-    zip_buffer = BytesIO()
-    
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        # Add JSON export
-        json_data = json.dumps({
-            'metadata': {
-                'exported': datetime.now().isoformat(),
-                'version': '2.1.0',
-                'count': len(st.session_state.designs)
-            },
-            'designs': st.session_state.designs
-        }, indent=2)
-        zip_file.writestr('abgenesis_all_designs.json', json_data)
-        
-        # Add CSV export
-        rows = []
-        for design in st.session_state.designs:
-            row = {
-                'design_id': design['design_id'],
-                'antigen': design['antigen_name'],
-                'heavy_chain': design['heavy_chain'],
-                'light_chain': design['light_chain'],
-                'overall_score': design['scores']['overall'],
-                'physics_score': design['scores']['physics'],
-                'epitope_score': design['scores']['epitope'],
-                'developability_score': design['scores']['developability']
-            }
-            rows.append(row)
-        
-        df = pd.DataFrame(rows)
-        csv_data = df.to_csv(index=False)
-        zip_file.writestr('abgenesis_all_designs.csv', csv_data)
-        
-        # Add FASTA export
-        fasta_lines = []
-        for design in st.session_state.designs:
-            fasta_lines.append(f">{design['design_id']}_heavy | {design['antigen_name']}")
-            fasta_lines.append(design['heavy_chain'])
-            fasta_lines.append(f">{design['design_id']}_light | {design['antigen_name']}")
-            fasta_lines.append(design['light_chain'])
-        
-        fasta_data = "\n".join(fasta_lines)
-        zip_file.writestr('abgenesis_all_designs.fasta', fasta_data)
-        
-        # Add summary report
-        summary = f"""
-        AbGenesis 2.0 - Complete Export
-        ================================
-        
-        Export Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-        Total Designs: {len(st.session_state.designs)}
-        Antigens: {', '.join(set(d['antigen_name'] for d in st.session_state.designs))}
-        
-        Design Statistics:
-        -----------------
-        Average Overall Score: {np.mean([d['scores']['overall'] for d in st.session_state.designs]):.3f}
-        Best Overall Score: {max([d['scores']['overall'] for d in st.session_state.designs]):.3f}
-        Average Physics Score: {np.mean([d['scores']['physics'] for d in st.session_state.designs]):.3f}
-        Average Epitope Score: {np.mean([d['scores']['epitope'] for d in st.session_state.designs]):.3f}
-        Average Developability Score: {np.mean([d['scores']['developability'] for d in st.session_state.designs]):.3f}
-        
-        CDR Length Statistics:
-        ----------------------
-        Average CDR-H3 Length: {np.mean([len(d['cdrs']['H3']) for d in st.session_state.designs]):.1f}
-        """
-        zip_file.writestr('SUMMARY.txt', summary)
-    
-    zip_buffer.seek(0)
+    # One pass over the designs, spooled to disk for large libraries
+    zip_file, summary = write_backup(st.session_state.designs, aggregates=st.session_state.designs.stats)
     
     st.download_button(
         label="📥 Download All Designs (ZIP)",
-        data=zip_buffer,
+        data=zip_file.read(),
         file_name=f"abgenesis_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip",
         mime="application/zip",
         use_container_width=True
     )
     
-    st.session_state.recent_activity.append("Exported all designs as ZIP archive")
-    return zip_buffer
+    zip_file.seek(0)
+    log_activity('export', "Exported all designs as ZIP archive")
+    return zip_file
 
 def restore_backup(uploaded_file):
     """Restore designs from backup file"""
@@ -2144,6 +2355,9 @@ def restore_backup(uploaded_file):
 
 def run_benchmark():
     """Run benchmark against known therapeutic antibodies"""
+    import pandas as pd
+    import plotly.graph_objects as go
+    
     st.markdown("## 🏆 Benchmarking")
     
     therapeutic_antibodies = design_engine.therapeutic_antibodies
@@ -2243,37 +2457,148 @@ def calculate_similarity(design, therapeutic_antibody):
     
     return min(1.0, similarity)
 
+# ============================================================================
+# DEBUG INSTRUMENTATION
+# ============================================================================
+
+def render_timed(show_page):
+    """Call a show_* function, recording its render time under its name"""
+    with stage_timings.time(show_page.__name__):
+        return show_page()
+
+def start_profile():
+    """Profiler for this run if one was requested from the Debug panel"""
+    if not st.session_state.profile_next_run:
+        return None
+    st.session_state.profile_next_run = False
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+def finish_profile(profiler, started):
+    """Stop profiling and keep the report and raw stats in the session"""
+    profiler.disable()
+    report = StringIO()
+    stats = pstats.Stats(profiler, stream=report)
+    stats.sort_stats('cumulative').print_stats(40)
+    st.session_state.profile_result = {
+        'created': started.isoformat(timespec='seconds'),
+        'seconds': (datetime.now() - started).total_seconds(),
+        'report': report.getvalue(),
+        # Same format as Stats.dump_stats, loadable with pstats or snakeviz
+        'stats': marshal.dumps(stats.stats)
+    }
+
+def show_debug_information():
+    """Session details, stage timing histograms and the profiler"""
+    import pandas as pd
+    import plotly.graph_objects as go
+    
+    st.write("Session State Keys:", list(st.session_state.keys()))
+    st.write("Number of Designs:", len(st.session_state.designs))
+    st.write("GitHub Connected:", st.session_state.github_connected)
+    st.write("Recent Activity:", recent_activity(5))
+    
+    st.markdown("#### ⏱️ Stage Timings")
+    timing_rows = stage_timings.summary()
+    if timing_rows:
+        st.caption(f"Recent statistics over the last {stage_timings.window} calls of each stage")
+        st.dataframe(pd.DataFrame(timing_rows), use_container_width=True, hide_index=True)
+        
+        stage = st.selectbox("Latency Histogram", [row['stage'] for row in timing_rows], key='debug_timing_stage')
+        edges, counts = stage_timings.histogram(stage)
+        fig = go.Figure(go.Bar(
+            x=[f"{low:.3g}–{high:.3g}" for low, high in zip(edges[:-1], edges[1:])],
+            y=counts,
+            marker_color='#58a6ff'
+        ))
+        fig.update_layout(
+            xaxis_title='Duration (ms)',
+            yaxis_title='Calls',
+            height=300,
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font_color='#c9d1d9'
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        
+        if st.button("Reset Timings"):
+            stage_timings.clear()
+            st.rerun()
+    else:
+        st.caption("No stages timed yet")
+    
+    st.markdown("#### 🧪 Profiler")
+    if st.button("Profile Next Run", disabled=st.session_state.profile_next_run):
+        st.session_state.profile_next_run = True
+    if st.session_state.profile_next_run:
+        st.caption("The next run (your next interaction with the app) will be profiled")
+    
+    result = st.session_state.profile_result
+    if result:
+        st.caption(f"Profile of the run started {result['created']} ({result['seconds']:.2f}s)")
+        st.code(result['report'])
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                label="📥 Download Profile (.prof)",
+                data=result['stats'],
+                file_name=f"abgenesis_{result['created'].replace(':', '')}.prof",
+                mime="application/octet-stream",
+                use_container_width=True
+            )
+        with col2:
+            st.download_button(
+                label="📥 Download Report (.txt)",
+                data=result['report'],
+                file_name=f"abgenesis_{result['created'].replace(':', '')}_profile.txt",
+                mime="text/plain",
+                use_container_width=True
+            )
+
 # ============================================================================
 # MAIN APPLICATION
 # ============================================================================
 
 def main():
     """Main application function"""
-    
-    # Show header
-    show_header()
-    
-    # Show sidebar and get current page
-    page = show_sidebar()
-    
-    # Route to appropriate page
-    if page == "🏠 Dashboard":
-        show_dashboard()
-    
-    elif page == "🎯 Design Studio":
-        show_design_studio()
-    
-    elif page == "📊 Analyze Designs":
-        show_analyze_designs()
-    
-    elif page == "📚 GitHub Repos":
-        show_github_repos()
-    
-    elif page == "🤝 Collaborate":
-        show_collaboration()
-    
-    elif page == "⚙️ Settings":
-        show_settings()
+    configure_page()
+    inject_custom_css()
+    init_session_state()
+    report_push_results()
+    
+    # Profile this run if requested; kept even when a page reruns the script
+    started = datetime.now()
+    profiler = start_profile()
+    try:
+        # Show header
+        render_timed(show_header)
+        
+        # Show sidebar and get current page
+        page = render_timed(show_sidebar)
+        
+        # Route to appropriate page
+        if page == "🏠 Dashboard":
+            render_timed(show_dashboard)
+        
+        elif page == "🎯 Design Studio":
+            render_timed(show_design_studio)
+        
+        elif page == "📊 Analyze Designs":
+            render_timed(show_analyze_designs)
+        
+        elif page == "📚 GitHub Repos":
+            render_timed(show_github_repos)
+        
+        elif page == "🤝 Collaborate":
+            render_timed(show_collaboration)
+        
+        elif page == "⚙️ Settings":
+            render_timed(show_settings)
+    finally:
+        if profiler is not None:
+            finish_profile(profiler, started)
     
     # Footer
     st.markdown("---")
@@ -2306,10 +2631,7 @@ def main():
     
     # Debug information (hidden by default)
     with st.expander("🔍 Debug Information", expanded=False):
-        st.write("Session State Keys:", list(st.session_state.keys()))
-        st.write("Number of Designs:", len(st.session_state.designs))
-        st.write("GitHub Connected:", st.session_state.github_connected)
-        st.write("Recent Activity:", st.session_state.recent_activity[-5:] if st.session_state.recent_activity else [])
+        show_debug_information()
 
 # ============================================================================
 # RUN APPLICATION
@@ -2317,4 +2639,4 @@ def main():
 
 if __name__ == "__main__":
     main()
-              
+
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from abgenesis.engine import AntibodyDesignEngine
+
+PARAMS = {'cdr_length_sampling': 'natural', 'epitope_weight': 0.3}
+
+@pytest.fixture(scope='session')
+def engine():
+    return AntibodyDesignEngine()
+
+@pytest.fixture(scope='session')
+def designs(engine):
+    """Fifty seeded designs against two antigens"""
+    rng = np.random.default_rng(0)
+    return (
+        engine.generate_batch('HER2', PARAMS, 30, rng=rng)
+        + engine.generate_batch('PD-L1', PARAMS, 20, rng=rng)
+    )
@@ -0,0 +1,94 @@
+import json
+import threading
+from datetime import date, datetime
+
+import pytest
+
+from abgenesis.activity import ACTIVITY_KINDS, ActivityLog
+
+def event(time, kind, count=1, owner=None, message=''):
+    return {'time': time, 'kind': kind, 'message': message, 'count': count, 'owner': owner}
+
+def test_recent_is_newest_first_and_bounded():
+    log = ActivityLog(recent=3)
+    for n in range(5):
+        log.record('design', f"run {n}", owner='alice' if n % 2 else 'bob')
+    assert [e['message'] for e in log.recent()] == ['run 4', 'run 3', 'run 2']
+    assert [e['message'] for e in log.recent(limit=2)] == ['run 4', 'run 3']
+    assert [e['message'] for e in log.recent(owner='alice')] == ['run 3']
+
+def test_unknown_kind_is_rejected():
+    with pytest.raises(ValueError):
+        ActivityLog().record('deploy', 'Shipped')
+
+def test_daily_counts_sum_event_counts():
+    log = ActivityLog()
+    log.record('design', 'Generated 40', count=40)
+    log.record('design', 'Generated 2', count=2)
+    log.record('commit', 'Pushed')
+    dates, counts = log.daily_counts(days=7)
+    assert len(dates) == 7 and dates[-1] == date.today()
+    # Summed over the week, so a run across midnight still counts everything
+    assert sum(counts['design']) == 42 and sum(counts['commit']) == 1
+    assert sum(counts['issue']) == 0
+    assert set(counts) == set(ACTIVITY_KINDS)
+    assert list(log.daily_counts(['commit'], days=1)[1]) == ['commit']
+
+def test_segment_is_replayed_on_open(tmp_path):
+    path = tmp_path / 'activity.jsonl'
+    log = ActivityLog(str(path))
+    log.record('design', 'Generated 5', count=5, owner='alice')
+    log.record('export', 'Exported CSV')
+    log.close()
+    log.record('job', 'Kept in memory only')
+    
+    reopened = ActivityLog(str(path))
+    assert [e['message'] for e in reopened.recent()] == ['Exported CSV', 'Generated 5']
+    assert sum(reopened.daily_counts(['design'], days=2)[1]['design']) == 5
+    reopened.close()
+
+def test_replay_bins_events_by_day(tmp_path):
+    path = tmp_path / 'activity.jsonl'
+    lines = [
+        event('2026-03-01T09:00:00', 'design', 10),
+        event('2026-03-01T18:00:00', 'design', 5),
+        event('2026-03-03T12:00:00', 'issue')
+    ]
+    path.write_text(''.join(json.dumps(line) + '\n' for line in lines))
+    log = ActivityLog(str(path))
+    dates, counts = log.daily_counts(['design', 'issue'], days=4, end=date(2026, 3, 3))
+    assert dates[0] == date(2026, 2, 28)
+    assert counts == {'design': [0, 15, 0, 0], 'issue': [0, 0, 0, 1]}
+    log.close()
+
+def test_torn_and_garbage_lines_are_skipped(tmp_path):
+    path = tmp_path / 'activity.jsonl'
+    good = json.dumps(event('2026-03-01T09:00:00', 'design', 3))
+    path.write_text(good + '\nnot json\n{"kind": "design"}\n' + good[:20])
+    log = ActivityLog(str(path))
+    assert len(log.recent()) == 1
+    log.record('commit', 'After the tear')
+    log.close()
+    
+    # The torn line was terminated, so the new event replays intact
+    reopened = ActivityLog(str(path))
+    assert [e['message'] for e in reopened.recent()] == ['After the tear', '']
+    reopened.close()
+
+def test_concurrent_records_are_all_kept(tmp_path):
+    path = tmp_path / 'activity.jsonl'
+    log = ActivityLog(str(path), recent=1000)
+    
+    def worker(owner):
+        for n in range(100):
+            log.record('design', f"{owner} {n}", owner=owner)
+    
+    threads = [threading.Thread(target=worker, args=(owner,)) for owner in 'abcd']
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    log.close()
+    assert sum(log.daily_counts(['design'], days=2)[1]['design']) == 400
+    assert len(path.read_text().splitlines()) == 400
+    assert all(datetime.fromisoformat(json.loads(line)['time']) for line in path.read_text().splitlines())
@@ -0,0 +1,125 @@
+import math
+
+import numpy as np
+import pytest
+
+from abgenesis.aggregates import SCORE_COMPONENTS, DesignAggregates, _RunningMoments, _TopK
+
+class Library:
+    """Live designs by ID plus aggregates refilled from them"""
+    
+    def __init__(self, top_k=5):
+        self.live = {}
+        self.aggregates = DesignAggregates(top_k=top_k, refill=self.refill)
+    
+    def refill(self, antigen, component, k):
+        pairs = [
+            (design['scores'][component], key) for key, design in self.live.items()
+            if antigen is None or design['antigen_name'] == antigen
+        ]
+        return sorted(pairs, reverse=True)[:k]
+    
+    def add(self, design):
+        self.live[design['design_id']] = design
+        self.aggregates.add(design)
+    
+    def remove(self, design):
+        del self.live[design['design_id']]
+        self.aggregates.remove(design)
+
+def check_against_recompute(library):
+    aggregates = library.aggregates
+    for antigen in [None] + aggregates.antigens:
+        members = [
+            design for design in library.live.values()
+            if antigen is None or design['antigen_name'] == antigen
+        ]
+        assert aggregates.count(antigen) == len(members)
+        for component in SCORE_COMPONENTS:
+            values = np.array([design['scores'][component] for design in members])
+            assert aggregates.mean(component, antigen) == pytest.approx(values.mean(), abs=1e-9)
+            assert aggregates.variance(component, antigen) == pytest.approx(values.var(), abs=1e-9)
+            assert aggregates.best(component, antigen) == values.max()
+            expected = sorted(((design['scores'][component], design['design_id']) for design in members), reverse=True)
+            assert aggregates.top(None, component, antigen) == expected[:aggregates.top_k]
+        lengths = [len(design['cdrs']['H3']) for design in members]
+        stats = aggregates.h3_length_stats(antigen)
+        assert stats['count'] == len(lengths)
+        assert stats['mean'] == pytest.approx(np.mean(lengths))
+        assert (stats['min'], stats['max']) == (min(lengths), max(lengths))
+    assert sorted(aggregates.antigens) == sorted({design['antigen_name'] for design in library.live.values()})
+
+def test_matches_recompute_under_adds_and_removes(designs):
+    rng = np.random.default_rng(1)
+    library = Library(top_k=5)
+    for design in designs:
+        library.add(design)
+    check_against_recompute(library)
+    
+    for _ in range(4):
+        for row in rng.choice(len(designs), 8, replace=False):
+            design = designs[row]
+            if design['design_id'] in library.live:
+                library.remove(design)
+            else:
+                library.add(design)
+        check_against_recompute(library)
+
+def test_removing_the_best_designs_refills_top(designs):
+    library = Library(top_k=3)
+    for design in designs:
+        library.add(design)
+    for value, key in library.aggregates.top():
+        library.remove(library.live[key])
+    check_against_recompute(library)
+
+def test_removing_every_design_of_an_antigen_drops_it(designs):
+    library = Library()
+    for design in designs:
+        library.add(design)
+    for design in designs[30:]:
+        library.remove(design)
+    assert library.aggregates.antigens == ['HER2']
+    assert library.aggregates.count('PD-L1') == 0
+    assert math.isnan(library.aggregates.mean(antigen='PD-L1'))
+    check_against_recompute(library)
+
+def test_empty_and_missing_scores(designs):
+    aggregates = DesignAggregates()
+    assert aggregates.count() == 0
+    assert math.isnan(aggregates.best())
+    assert aggregates.top() == []
+    stats = aggregates.h3_length_stats()
+    assert (stats['count'], stats['min'], stats['max']) == (0, None, None)
+    aggregates.add({'design_id': 'bare', 'antigen_name': 'HER2', 'scores': {'overall': 'n/a'}})
+    aggregates.add(designs[0])
+    assert aggregates.count() == 2
+    assert aggregates.mean() == designs[0]['scores']['overall']
+    assert aggregates.h3_length_stats()['count'] == 1
+
+def test_running_moments_remove_matches_recompute():
+    rng = np.random.default_rng(2)
+    values = rng.normal(0.5, 0.2, 200)
+    moments = _RunningMoments()
+    for value in values:
+        moments.add(value)
+    for removed in range(1, 199):
+        moments.remove(values[removed - 1])
+        rest = values[removed:]
+        assert moments.count == len(rest)
+        assert moments.mean == pytest.approx(rest.mean(), abs=1e-9)
+        assert moments.variance == pytest.approx(rest.var(), abs=1e-9)
+    moments.remove(values[198])
+    moments.remove(values[199])
+    assert moments.count == 0
+    assert math.isnan(moments.variance)
+
+def test_top_k_without_refill_keeps_best_live_entries():
+    top = _TopK(3)
+    for key, value in enumerate([5, 1, 9, 7, 3]):
+        top.add(key, value)
+    assert top.items(3) == [(9, 2), (7, 3), (5, 0)]
+    top.remove(2, 9)
+    top.add(5, 4)
+    # Without a refill the heap cannot tell 4 from entries pushed out earlier
+    assert top.items(2) == [(7, 3), (5, 0)]
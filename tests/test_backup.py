@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+import threading
+import zipfile
+
+import pytest
+
+from abgenesis import backup
+from abgenesis.backup import BACKUP_MEMBERS, SUMMARY_MEMBER, write_backup
+
+def read_members(target):
+    with zipfile.ZipFile(target) as archive:
+        assert archive.testzip() is None
+        return {info.filename: (info, archive.read(info).decode('utf-8')) for info in archive.infolist()}
+
+def check_contents(members, designs):
+    assert set(members) == set(BACKUP_MEMBERS.values()) | {SUMMARY_MEMBER}
+    
+    exported = json.loads(members[BACKUP_MEMBERS['json']][1])
+    assert exported['designs'] == designs
+    
+    rows = list(csv.reader(io.StringIO(members[BACKUP_MEMBERS['csv']][1])))
+    assert len(rows) == len(designs) + 1
+    
+    fasta = members[BACKUP_MEMBERS['fasta']][1]
+    assert fasta.count('>') == 2 * len(designs)
+    assert f"Total Designs: {len(designs)}" in members[SUMMARY_MEMBER][1]
+
+@pytest.mark.parametrize('chunk_size', [1, 1 << 18])
+def test_round_trip(designs, chunk_size):
+    target, summary = write_backup(designs, chunk_size=chunk_size)
+    assert summary.count == len(designs)
+    members = read_members(target)
+    check_contents(members, designs)
+    assert all(info.compress_type == zipfile.ZIP_DEFLATED for info, _ in members.values())
+
+@pytest.mark.parametrize('level', [0, 1, 9])
+def test_levels_round_trip(designs, level):
+    target, _ = write_backup(designs, level=level, chunk_size=1024)
+    check_contents(read_members(target), designs)
+
+def test_members_deflate_on_worker_threads(designs, monkeypatch):
+    threads = set()
+    compress = backup._DeflateMember._compress
+    
+    def recording(self, data):
+        threads.add(threading.current_thread())
+        compress(self, data)
+    
+    monkeypatch.setattr(backup._DeflateMember, '_compress', recording)
+    target, _ = write_backup(designs, chunk_size=1024)
+    assert threads and threading.main_thread() not in threads
+    check_contents(read_members(target), designs)
+
+def test_spooled_to_disk(designs):
+    target, _ = write_backup(designs, spool_size=1024)
+    check_contents(read_members(target), designs)
+
+def test_forced_zip64(designs, monkeypatch):
+    monkeypatch.setattr(backup, 'ZIP64_LIMIT', 1)
+    target, _ = write_backup(designs)
+    
+    raw = target.read()
+    target.seek(0)
+    # Every data member carries a ZIP64 extra field (header ID 0x0001)
+    assert raw.count(b'\x01\x00\x10\x00') >= len(BACKUP_MEMBERS)
+    check_contents(read_members(target), designs)
+
+def test_empty(tmp_path):
+    with open(tmp_path / 'backup.zip', 'w+b') as target:
+        write_backup([], target)
+        members = read_members(target)
+    assert json.loads(members[BACKUP_MEMBERS['json']][1])['designs'] == []
@@ -0,0 +1,71 @@
+import argparse
+import copy
+import json
+
+import pytest
+
+from abgenesis.benchmark import (
+    DESIGN_STAGES, compare_reports, export_targets, format_regressions, format_report,
+    latency_summary, main, parse_sizes, run_suite
+)
+
+@pytest.fixture(scope='module')
+def report():
+    return run_suite([120], seed=1, memory=False)
+
+def test_latency_summary_percentiles():
+    summary = latency_summary([1000, 2000, 3000, 4000])
+    assert summary['count'] == 4
+    assert summary['seconds'] == 1e-5
+    assert summary['per_sec'] == 400000.0
+    assert summary['p50_us'] == 2.5
+    assert latency_summary([])['per_sec'] == 0.0
+
+def test_parse_sizes():
+    assert parse_sizes('10,1000,1e6') == [10, 1000, 1000000]
+    assert parse_sizes(' 5 , ') == [5]
+    for text in ('', '0,10', 'ten'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_sizes(text)
+
+def test_suite_covers_every_stage(report):
+    stages = report['results']['120']
+    expected = set(DESIGN_STAGES) | {'design', 'backup'} | {name for name, _, _ in export_targets()}
+    assert set(stages) == expected
+    assert stages['cdrs']['count'] == 120
+    assert all(stage['per_sec'] > 0 for stage in stages.values())
+    assert all(stages[name]['output_bytes'] > 0 for name, _, _ in export_targets())
+    assert 'peak_bytes' not in stages['design']
+    assert report['metadata']['seed'] == 1
+    json.dumps(report)
+    assert 'export_csv' in format_report(report)
+
+def test_memory_pass_records_peaks():
+    stages = run_suite([10], memory=True)['results']['10']
+    assert stages['design']['peak_bytes'] > 0
+    assert stages['backup']['peak_bytes'] > 0
+
+def test_compare_flags_only_worse_metrics(report):
+    assert compare_reports(report, report) == []
+    slower = copy.deepcopy(report)
+    slower['results']['120']['design']['per_sec'] *= 2
+    slower['results']['120']['scoring']['p95_us'] /= 2
+    slower['results']['120']['backup']['per_sec'] /= 2
+    regressions = compare_reports(report, slower)
+    assert {(r['stage'], r['metric']) for r in regressions} == {('design', 'per_sec'), ('scoring', 'p95_us')}
+    changes = {r['metric']: r['change'] for r in regressions}
+    assert changes == {'per_sec': -0.5, 'p95_us': 1.0}
+    assert 'REGRESSION design @ 120: per_sec' in format_regressions(regressions)
+
+def test_compare_ignores_small_sizes_and_missing_stages(report):
+    small = {'results': {'10': report['results']['120']}}
+    worse = {'results': {'10': {'design': {'per_sec': 1e12}}}}
+    assert compare_reports(small, worse) == []
+    assert compare_reports(report, {'results': {}}) == []
+
+def test_main_writes_and_compares_baseline(tmp_path, capsys):
+    baseline = tmp_path / 'baseline.json'
+    assert main(['--sizes', '10', '--no-memory', '--output', str(baseline)]) == 0
+    assert json.loads(baseline.read_text())['results']['10']
+    assert main(['--sizes', '10', '--no-memory', '--compare', str(baseline)]) == 0
+    assert 'No regressions' in capsys.readouterr().out
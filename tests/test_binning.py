@@ -0,0 +1,46 @@
+import numpy as np
+
+from abgenesis.binning import density_2d, downsample, histogram
+
+def test_downsample_keeps_small_inputs_whole():
+    assert downsample(5, 10).tolist() == [0, 1, 2, 3, 4]
+    assert downsample(0, 10).tolist() == []
+
+def test_downsample_is_seeded_sorted_and_unique():
+    rows = downsample(10000, 500, seed=3)
+    assert len(rows) == len(set(rows.tolist())) == 500
+    assert (np.diff(rows) > 0).all() and rows.max() < 10000
+    assert np.array_equal(rows, downsample(10000, 500, seed=3))
+    assert not np.array_equal(rows, downsample(10000, 500, seed=4))
+
+def test_histogram_counts_finite_values():
+    values = np.array([0.0, 0.1, 0.5, 1.0, np.nan, np.inf])
+    centers, widths, counts = histogram(values, bins=2)
+    assert centers.tolist() == [0.25, 0.75]
+    assert widths.tolist() == [0.5, 0.5]
+    assert counts.tolist() == [2, 2]
+
+def test_histogram_matches_numpy():
+    values = np.random.default_rng(0).normal(size=5000)
+    centers, widths, counts = histogram(values, bins=40)
+    expected, edges = np.histogram(values, bins=40)
+    assert np.array_equal(counts, expected)
+    assert np.allclose(centers - widths / 2, edges[:-1])
+    empty = histogram([np.nan])
+    assert [part.size for part in empty] == [0, 0, 0]
+
+def test_density_counts_points_where_both_are_finite():
+    rng = np.random.default_rng(1)
+    x, y = rng.random(3000), rng.random(3000) * 2
+    x[:10] = np.nan
+    y[5:20] = np.inf
+    x_centers, y_centers, counts = density_2d(x, y, bins=12)
+    assert counts.shape == (12, 12)
+    assert counts.sum() == 3000 - 20
+    expected, _, _ = np.histogram2d(x[20:], y[20:], bins=12)
+    assert np.array_equal(counts, expected.T)
+    assert y_centers.max() > 1.5 > x_centers.max()
+
+def test_density_of_no_points():
+    x_centers, y_centers, counts = density_2d([np.nan], [1.0])
+    assert x_centers.size == y_centers.size == 0 and counts.shape == (0, 0)
@@ -0,0 +1,66 @@
+import threading
+
+import numpy as np
+
+from abgenesis.cache import LRUCache
+from abgenesis.engine import AntibodyDesignEngine
+from conftest import PARAMS
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    calls = []
+    compute = lambda key: calls.append(key) or key * 10
+    assert cache.get_or_compute('a', compute, 1) == 10
+    assert cache.get_or_compute('b', compute, 2) == 20
+    assert cache.get_or_compute('a', compute, 1) == 10
+    cache.get_or_compute('c', compute, 3)
+    assert len(cache) == 2
+    cache.get_or_compute('a', compute, 1)
+    cache.get_or_compute('b', compute, 2)
+    assert calls == [1, 2, 3, 2]
+
+def test_stats_and_clear():
+    cache = LRUCache(maxsize=4)
+    for key in 'abab':
+        cache.get_or_compute(key, str.upper, key)
+    assert cache.stats() == {
+        'enabled': True, 'hits': 2, 'misses': 2, 'hit_rate': 0.5, 'size': 2, 'maxsize': 4
+    }
+    cache.clear()
+    assert cache.stats()['hits'] == cache.stats()['misses'] == cache.stats()['size'] == 0
+    assert cache.stats()['hit_rate'] == 0.0
+
+def test_disabled_cache_computes_every_time():
+    cache = LRUCache(enabled=False)
+    calls = []
+    for _ in range(3):
+        assert cache.get_or_compute('a', lambda: calls.append(1) or 'value') == 'value'
+    assert len(calls) == 3
+    assert cache.stats()['hits'] == cache.stats()['misses'] == len(cache) == 0
+
+def test_concurrent_lookups_stay_bounded():
+    cache = LRUCache(maxsize=50)
+    
+    def worker(offset):
+        for key in range(offset, offset + 500):
+            assert cache.get_or_compute(key % 80, abs, -(key % 80)) == key % 80
+    
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) <= 50
+    assert cache.hits + cache.misses == 8 * 500
+
+def test_cached_scores_match_uncached():
+    cached = AntibodyDesignEngine(score_cache=LRUCache(maxsize=8))
+    uncached = AntibodyDesignEngine(score_cache=LRUCache(enabled=False))
+    seeds = list(range(12))
+    first = [cached.generate_antibody_design('HER2', PARAMS, seed=seed)['scores'] for seed in seeds]
+    again = [cached.generate_antibody_design('HER2', PARAMS, seed=seed)['scores'] for seed in seeds[-4:]]
+    plain = [uncached.generate_antibody_design('HER2', PARAMS, seed=seed)['scores'] for seed in seeds]
+    assert again == first[-4:]
+    assert plain == first
+    assert cached.score_cache.hits == 4
+    assert len(cached.score_cache) == 8
@@ -0,0 +1,159 @@
+import threading
+
+import numpy as np
+import pytest
+
+from abgenesis.engine import AntibodyDesignEngine, design_id_for, spawn_design_seeds
+
+from conftest import PARAMS
+
+def test_design_id_is_content_derived(designs):
+    design = designs[0]
+    assert design['design_id'] == design_id_for(design['antigen_name'], design['heavy_chain'], design['light_chain'])
+    assert design_id_for('HER2', 'AAA', 'CCC') != design_id_for('PD-L1', 'AAA', 'CCC')
+
+def test_seeded_design_is_reproducible(engine):
+    first = engine.generate_antibody_design('HER2', PARAMS, seed=7)
+    second = AntibodyDesignEngine().generate_antibody_design('HER2', PARAMS, seed=7)
+    assert first['design_id'] == second['design_id']
+    assert first['scores'] == second['scores']
+
+def test_skip_returns_none_for_known_ids(engine):
+    design = engine.generate_antibody_design('HER2', PARAMS, seed=7)
+    assert engine.generate_antibody_design('HER2', PARAMS, seed=7, skip={design['design_id']}) is None
+
+def test_batch_drops_repeats_and_skipped(engine):
+    batch = engine.generate_batch('HER2', PARAMS, 200, rng=np.random.default_rng(0))
+    ids = [design['design_id'] for design in batch]
+    assert len(ids) == len(set(ids)) <= 200
+    
+    skip = set(ids[:50])
+    again = engine.generate_batch('HER2', PARAMS, 200, rng=np.random.default_rng(0), skip=skip)
+    assert not skip & {design['design_id'] for design in again}
+
+def test_parallel_is_independent_of_worker_count(engine):
+    serial = engine.generate_parallel('HER2', PARAMS, 300, seed=3, max_workers=1, shard_size=64)
+    pooled = engine.generate_parallel('HER2', PARAMS, 300, seed=3, max_workers=2, shard_size=64)
+    assert [d['design_id'] for d in serial] == [d['design_id'] for d in pooled]
+
+def test_spawned_seeds_are_stable():
+    assert spawn_design_seeds(1, 5) == spawn_design_seeds(1, 5)
+    assert len(set(spawn_design_seeds(1, 1000))) == 1000
+
+def test_ensemble_members_are_unique(engine):
+    ensemble = engine.generate_ensemble('HER2', PARAMS, 10, diversity=0.3, rng=np.random.default_rng(0))
+    assert 0 < len(ensemble) <= 10
+    assert len({design['design_id'] for design in ensemble}) == len(ensemble)
+
+def test_refine_without_steps_keeps_the_design(engine, designs):
+    refined = engine.refine_design(designs[0], steps=0, rng=np.random.default_rng(0))
+    assert refined['design_id'] == designs[0]['design_id']
+    assert engine.refine_design(designs[0], steps=0, skip={designs[0]['design_id']}) is None
+
+def test_default_rng_is_per_thread(engine):
+    streams = []
+    thread = threading.Thread(target=lambda: streams.append(engine.rng))
+    thread.start()
+    thread.join()
+    assert streams[0] is not engine.rng
+    assert engine.rng is engine.rng
+
+CDR_TYPES = ['H1', 'H2', 'H3', 'L1', 'L2', 'L3']
+
+def sample_cdrs(engine, params, n, seed):
+    """(batch, scalar) CDR sets drawn from independent seeded streams"""
+    batch = engine._generate_cdrs_batch(params, n, np.random.default_rng(seed))
+    rng = np.random.default_rng(seed + 1)
+    return batch, [engine._generate_cdrs(params, rng) for _ in range(n)]
+
+def residue_frequencies(loops, position):
+    """Residue -> fraction among loops long enough to have position"""
+    residues = [loop[position] for loop in loops if len(loop) > position]
+    if not residues:
+        return {}, 0
+    return {aa: residues.count(aa) / len(residues) for aa in 'ACDEFGHIKLMNPQRSTVWY'}, len(residues)
+
+def test_batch_cdr_lengths_follow_scalar_rules(engine):
+    batch, scalar = sample_cdrs(engine, PARAMS, 3000, seed=11)
+    for cdr_type in CDR_TYPES:
+        bounds = engine.cdr_lengths[cdr_type]
+        lengths = {
+            path: np.array([len(cdrs[cdr_type]) for cdrs in sets])
+            for path, sets in (('batch', batch), ('scalar', scalar))
+        }
+        for path_lengths in lengths.values():
+            assert bounds['min'] <= path_lengths.min() and path_lengths.max() <= bounds['max']
+        # Same truncated-normal length distribution: means and histograms agree
+        assert abs(lengths['batch'].mean() - lengths['scalar'].mean()) < 0.25
+        histograms = [
+            np.bincount(path_lengths, minlength=bounds['max'] + 1) / len(path_lengths)
+            for path_lengths in lengths.values()
+        ]
+        assert 0.5 * np.abs(histograms[0] - histograms[1]).sum() < 0.05
+    
+    fixed = {'cdr_length_sampling': 'fixed', 'H1_length': 7, 'H3_length': 0, 'L2_length': 18}
+    batch, scalar = sample_cdrs(engine, fixed, 50, seed=12)
+    for cdrs in batch + scalar:
+        assert {cdr_type: len(loop) for cdr_type, loop in cdrs.items()} == {
+            'H1': 7, 'H2': 10, 'H3': 0, 'L1': 10, 'L2': 18, 'L3': 10
+        }
+
+def test_batch_cdr_residues_follow_scalar_preferences(engine):
+    batch, scalar = sample_cdrs(engine, PARAMS, 3000, seed=13)
+    for cdr_type in CDR_TYPES:
+        preferred = engine.cdr_preferences[cdr_type]
+        for position in range(engine.cdr_lengths[cdr_type]['max']):
+            batch_freq, batch_count = residue_frequencies([cdrs[cdr_type] for cdrs in batch], position)
+            scalar_freq, scalar_count = residue_frequencies([cdrs[cdr_type] for cdrs in scalar], position)
+            if min(batch_count, scalar_count) < 500:
+                continue
+            assert max(abs(batch_freq[aa] - scalar_freq[aa]) for aa in batch_freq) < 0.05
+            if position < len(preferred):
+                # The preferred residue wins 70% of flips plus its share of random picks
+                assert abs(batch_freq[preferred[position]] - 0.715) < 0.05
+
+def test_batch_cdrs_enrich_paratope_residues_like_scalar(engine):
+    paratope = set('YWRHDE')
+    lengths = {f'{cdr_type}_length': 20 for cdr_type in CDR_TYPES}
+    
+    def paratope_fraction(sets):
+        # Only positions past every preference string, where enrichment applies
+        residues = [loop[position] for cdrs in sets for loop in cdrs.values() for position in range(17, 20)]
+        return sum(residue in paratope for residue in residues) / len(residues)
+    
+    fractions = {}
+    for weight in (0.3, 0.8):
+        params = dict(lengths, cdr_length_sampling='fixed', epitope_weight=weight)
+        batch, scalar = sample_cdrs(engine, params, 600, seed=14)
+        fractions[weight] = paratope_fraction(batch)
+        assert abs(fractions[weight] - paratope_fraction(scalar)) < 0.03
+    assert fractions[0.3] == pytest.approx(6 / 20, abs=0.03)
+    assert fractions[0.8] == pytest.approx(0.3 + 0.7 * 6 / 20, abs=0.03)
+
+def test_vectorized_properties_match_scalar(engine):
+    rng = np.random.default_rng(15)
+    alphabet = np.array(list(engine.amino_acids))
+    chains = [''.join(rng.choice(alphabet, length)) for length in rng.integers(1, 300, 200)]
+    chains += ['', 'ACDXEFB', 'X', engine.frameworks['heavy_fr1']]
+    
+    encoded, lengths = engine.encode_sequences(chains)
+    assert lengths.tolist() == [len(chain) for chain in chains]
+    for row in (0, len(chains) - 3):
+        assert np.array_equal(encoded[row, :lengths[row]], engine.encode_sequence(chains[row]))
+        assert (encoded[row, lengths[row]:] == engine.pad_code).all()
+    
+    properties = engine.calculate_sequence_properties((encoded, lengths))
+    with np.errstate(invalid='ignore'), pytest.warns(RuntimeWarning):
+        hydrophobicity = [engine._calculate_hydrophobicity(chain) for chain in chains]
+    net_charge = [engine._calculate_net_charge(chain) for chain in chains]
+    assert np.allclose(properties['hydrophobicity'], hydrophobicity, equal_nan=True)
+    assert np.allclose(properties['net_charge'], net_charge)
+    assert np.isnan(properties['hydrophobicity'][-4])
+    assert properties['net_charge'][-4] == 0
+    # Unknown residues count towards length but add nothing
+    assert properties['composition'][-3].sum() == 5
+    assert properties['hydrophobicity'][-2] == pytest.approx(4.5 / 9.0)
+    
+    # A plain list of chains takes the same path
+    listed = engine.calculate_sequence_properties(chains)
+    assert np.array_equal(listed['net_charge'], properties['net_charge'])
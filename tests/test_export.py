@@ -0,0 +1,76 @@
+import bz2
+import csv
+import gzip
+import io
+import json
+import lzma
+
+import pytest
+
+from abgenesis.export import (
+    COMPRESSIONS, CSV_COLUMNS, EXPORT_FORMATS, export_filename, guess_export_options,
+    iter_export, spool_export, write_export
+)
+
+DECOMPRESS = {None: lambda data: data, 'gzip': gzip.decompress, 'bz2': bz2.decompress, 'lzma': lzma.decompress}
+
+def export_text(designs, fmt, compression=None, chunk_size=1 << 16):
+    data = b''.join(iter_export(designs, fmt, compression, chunk_size))
+    return DECOMPRESS[compression](data).decode('utf-8')
+
+def parse(text, fmt):
+    """Design IDs in an export, in order"""
+    if fmt == 'json':
+        return [design['design_id'] for design in json.loads(text)['designs']]
+    if fmt == 'jsonl':
+        return [json.loads(line)['design_id'] for line in text.splitlines()]
+    if fmt == 'csv':
+        rows = list(csv.reader(io.StringIO(text)))
+        assert rows[0] == CSV_COLUMNS
+        return [row[0] for row in rows[1:]]
+    headers = [line[1:].split(' | ')[0] for line in text.splitlines() if line.startswith('>')]
+    assert len(headers) % 2 == 0
+    return [header[:-len('_heavy')] for header in headers[::2]]
+
+@pytest.mark.parametrize('fmt', sorted(EXPORT_FORMATS))
+@pytest.mark.parametrize('compression', [None] + sorted(COMPRESSIONS))
+def test_round_trip(designs, fmt, compression):
+    ids = [design['design_id'] for design in designs]
+    assert parse(export_text(designs, fmt, compression), fmt) == ids
+
+@pytest.mark.parametrize('fmt', sorted(EXPORT_FORMATS))
+def test_chunking_does_not_change_output(designs, fmt):
+    whole = export_text(designs, fmt)
+    if fmt == 'json':
+        # The metadata header carries the export time
+        whole, tiny = (json.loads(text)['designs'] for text in (whole, export_text(designs, fmt, chunk_size=1)))
+        assert whole == tiny
+    else:
+        assert export_text(designs, fmt, chunk_size=1) == whole
+
+@pytest.mark.parametrize('fmt', sorted(EXPORT_FORMATS))
+def test_empty_export(fmt):
+    assert parse(export_text([], fmt), fmt) == []
+
+def test_generators_are_streamed(designs):
+    # A one-shot iterator works, so designs are never materialized as a list
+    assert parse(export_text(iter(designs), 'json'), 'json') == [design['design_id'] for design in designs]
+
+def test_write_to_path_and_spool(designs, tmp_path):
+    path = tmp_path / 'designs.csv.gz'
+    written = write_export(designs, path, 'csv', 'gzip')
+    assert written == path.stat().st_size
+    assert gzip.decompress(path.read_bytes()).decode('utf-8') == export_text(designs, 'csv')
+    assert spool_export(designs, 'csv', 'gzip').read() == path.read_bytes()
+
+def test_unknown_options_raise(designs):
+    with pytest.raises(ValueError):
+        list(iter_export(designs, 'xml'))
+    with pytest.raises(ValueError):
+        list(iter_export(designs, 'csv', 'zip'))
+
+def test_file_names_round_trip():
+    for fmt in EXPORT_FORMATS:
+        for compression in [None] + sorted(COMPRESSIONS):
+            assert guess_export_options(export_filename('designs', fmt, compression)) == (fmt, compression)
+    assert guess_export_options('designs.txt') == ('jsonl', None)
@@ -0,0 +1,123 @@
+import threading
+
+import pytest
+
+from abgenesis.jobs import Job, JobCancelled, JobRunner, design_run
+
+from conftest import PARAMS
+
+@pytest.fixture
+def runner():
+    runner = JobRunner(max_workers=1, keep=3)
+    yield runner
+    runner.shutdown()
+
+def wait(job):
+    job.future.result(timeout=30)
+    return job
+
+def test_job_reports_progress_and_results(runner):
+    def work(job, items):
+        job.update(done=0, total=len(items), message='Working')
+        for done, item in enumerate(items, 1):
+            job.add_results([item])
+            job.update(done=done)
+    
+    job = wait(runner.submit('count', work, [1, 2, 3], owner='alice'))
+    assert (job.state, job.progress, job.result_count) == ('completed', 1.0, 3)
+    assert job.results() == [1, 2, 3]
+    assert job.started <= job.finished and not job.active
+
+def test_drained_job_no_longer_holds_results(runner, engine):
+    job = wait(runner.submit('batch', design_run, engine, 'HER2', PARAMS, 30, chunk_size=10))
+    made = job.result_count
+    drained = job.drain_results()
+    assert len(drained) == made > 0
+    assert job.results() == [] and job.drain_results() == []
+    assert job._results == []
+    # The count still reports everything the job published
+    assert job.result_count == made
+
+def test_drain_only_returns_new_results():
+    job = Job('steps')
+    job.add_results([1, 2])
+    assert job.drain_results() == [1, 2]
+    job.add_results([3])
+    assert job.drain_results() == [3]
+    assert job.result_count == 3
+
+def test_failed_job_keeps_the_error(runner):
+    def work(job):
+        job.add_results(['partial'])
+        raise RuntimeError('engine exploded')
+    
+    job = wait(runner.submit('fail', work))
+    assert (job.state, job.error) == ('failed', 'engine exploded')
+    assert job.results() == ['partial']
+
+def test_cancel_running_and_queued_jobs(runner):
+    started, release = threading.Event(), threading.Event()
+    
+    def work(job):
+        started.set()
+        release.wait(10)
+        job.check_cancelled()
+        job.add_results(['never'])
+    
+    running = runner.submit('running', work)
+    queued = runner.submit('queued', work)
+    assert started.wait(10)
+    running.cancel()
+    queued.cancel()
+    release.set()
+    wait(running)
+    assert (running.state, running.results()) == ('cancelled', [])
+    assert queued.state == 'cancelled' and queued.started is None
+
+def test_runner_forgets_oldest_finished_jobs(runner):
+    jobs = [wait(runner.submit(f"job {n}", lambda job: None, owner=n % 2)) for n in range(5)]
+    runner.submit('trigger prune', lambda job: None)
+    known = runner.jobs()
+    assert len(known) <= 4
+    assert runner.get(jobs[0].id) is None
+    assert runner.get(jobs[4].id) is jobs[4]
+    assert all(job.owner == 1 for job in runner.jobs(owner=1))
+
+def test_batch_run_publishes_chunks_and_sinks(runner, engine):
+    stored = []
+    job = wait(runner.submit('batch', design_run, engine, 'HER2', PARAMS, 45, chunk_size=20, sink=stored.extend))
+    assert job.state == 'completed'
+    assert job.total == 45 and job.progress == 1.0
+    assert stored == job.results()
+    assert 0 < len(stored) <= 45
+
+def test_cancelled_batch_keeps_finished_chunks(engine):
+    job = Job('batch')
+    chunks = []
+    
+    def sink(designs):
+        chunks.append(designs)
+        if len(chunks) == 2:
+            job.cancel()
+    
+    with pytest.raises(JobCancelled):
+        design_run(job, engine, 'HER2', PARAMS, 100, chunk_size=10, sink=sink)
+    assert len(chunks) == 2
+    assert job.results() == chunks[0] + chunks[1]
+    assert job.progress == 0.2
+
+@pytest.mark.parametrize('mode', ['optimized', 'ensemble'])
+def test_other_modes_finish(runner, engine, mode):
+    params = dict(PARAMS, optimization_level='fast')
+    job = wait(runner.submit(mode, design_run, engine, 'HER2', params, 3, mode=mode, diversity=0.2))
+    assert job.state == 'completed'
+    assert 0 < job.result_count <= 3
+    assert job.progress == 1.0
+
+def test_design_run_skips_known_ids(engine):
+    first = design_run(Job('direct'), engine, 'HER2', PARAMS, 30)
+    skip = {design['design_id'] for design in first}
+    again = design_run(Job('direct'), engine, 'HER2', PARAMS, 30, skip=skip)
+    assert not skip & {design['design_id'] for design in again}
+    with pytest.raises(ValueError):
+        design_run(Job('direct'), engine, 'HER2', PARAMS, 3, mode='random')
@@ -0,0 +1,24 @@
+import json
+
+from abgenesis.__main__ import main
+from abgenesis.repository import DesignRepository
+
+def run(tmp_path, name, *extra):
+    output = tmp_path / name
+    assert main(['--antigen', 'HER2', '--count', '40', '--seed', '5', '--workers', '1', '--output', str(output), *extra]) == 0
+    return output
+
+def test_seeded_runs_write_the_same_designs(tmp_path):
+    first = run(tmp_path, 'a.jsonl').read_text().splitlines()
+    second = run(tmp_path, 'b.jsonl').read_text().splitlines()
+    assert [json.loads(line)['design_id'] for line in first] == [json.loads(line)['design_id'] for line in second]
+    assert 0 < len(first) <= 40
+
+def test_db_skips_designs_already_stored(tmp_path):
+    db = str(tmp_path / 'library.db')
+    first = run(tmp_path, 'a.jsonl', '--db', db).read_text().splitlines()
+    second = run(tmp_path, 'b.jsonl', '--db', db).read_text().splitlines()
+    assert second == []
+    repository = DesignRepository(db)
+    assert repository.count() == len(first)
+    repository.close()
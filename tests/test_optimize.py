@@ -0,0 +1,172 @@
+import numpy as np
+import pytest
+
+from abgenesis.optimize import AnnealingSampler, CDRPopulation, GeneticOptimizer, population_fitness, select_diverse
+
+from conftest import PARAMS
+
+def cdr_sets_of(designs):
+    return [design['cdrs'] for design in designs]
+
+def expected_fitness(engine, cdrs, weights):
+    """Reference fitness through the scalar scoring path"""
+    physics, developability = engine._compute_sequence_terms(
+        engine._assemble_heavy_chain(cdrs) + engine._assemble_light_chain(cdrs)
+    )
+    return weights['physics'] * min(physics, 1.0) + weights['developability'] * developability
+
+def test_population_round_trips_cdr_sets(engine, designs):
+    population = CDRPopulation.from_cdr_sets(engine, cdr_sets_of(designs))
+    assert len(population) == len(designs)
+    assert population.cdr_sets(engine) == cdr_sets_of(designs)
+    assert population.take([3, 1]).cdr_sets(engine) == cdr_sets_of([designs[3], designs[1]])
+    assert len(set(population.keys())) == len(designs)
+
+def test_assemble_matches_scalar_chains(engine, designs):
+    population = CDRPopulation.from_cdr_sets(engine, cdr_sets_of(designs))
+    encoded, lengths = population.assemble(engine)
+    expected, expected_lengths = engine.encode_sequences(
+        [design['heavy_chain'] + design['light_chain'] for design in designs]
+    )
+    assert np.array_equal(lengths, expected_lengths)
+    assert np.array_equal(encoded, expected)
+
+def test_population_fitness_matches_scalar_scores(engine, designs):
+    weights = engine._score_weights(PARAMS)
+    population = CDRPopulation.from_cdr_sets(engine, cdr_sets_of(designs))
+    fitness = population_fitness(engine, population, weights)
+    expected = [expected_fitness(engine, design['cdrs'], weights) for design in designs]
+    assert fitness == pytest.approx(expected, abs=1e-12)
+
+def test_genetic_optimizer_returns_best_distinct_sets(engine):
+    optimizer = GeneticOptimizer(engine, PARAMS, np.random.default_rng(0), population_size=24, generations=6)
+    best = []
+    cdr_sets, fitness = optimizer.run(keep=5, progress=lambda generation, total, value: best.append(value))
+    
+    assert len(cdr_sets) == 5
+    assert len({tuple(sorted(cdrs.items())) for cdrs in cdr_sets}) == 5
+    assert fitness == sorted(fitness, reverse=True)
+    weights = engine._score_weights(PARAMS)
+    assert fitness == pytest.approx([expected_fitness(engine, cdrs, weights) for cdrs in cdr_sets], abs=1e-12)
+    # Elites survive every generation, so the best fitness never drops
+    assert len(best) == 6
+    assert best == sorted(best)
+    assert fitness[0] == pytest.approx(best[-1])
+
+def test_genetic_optimizer_is_seeded(engine):
+    runs = [
+        GeneticOptimizer(engine, PARAMS, np.random.default_rng(4), population_size=16, generations=3).run(keep=3)
+        for _ in range(2)
+    ]
+    assert runs[0] == runs[1]
+
+def test_mutations_stay_inside_loops(engine):
+    optimizer = GeneticOptimizer(engine, PARAMS, np.random.default_rng(1), population_size=32, mutation_rate=0.5)
+    initial = engine._generate_cdrs_batch(PARAMS, 32, np.random.default_rng(1))
+    population = CDRPopulation.from_cdr_sets(engine, initial)
+    children = optimizer._breed(population, population_fitness(engine, population, optimizer.weights), 64)
+    for cdr_type, loop in children.loops.items():
+        inside = np.arange(loop.shape[1]) < children.lengths[cdr_type][:, None]
+        assert (loop[inside] < engine.pad_code).all()
+        assert (loop[~inside] == engine.pad_code).all()
+
+def test_for_level_budgets(engine):
+    assert GeneticOptimizer.for_level(engine, PARAMS, level='fast').generations == 10
+    optimizer = GeneticOptimizer.for_level(engine, dict(PARAMS, optimization_level='Thorough'))
+    assert (optimizer.population_size, optimizer.generations) == (256, 80)
+    assert GeneticOptimizer.for_level(engine, PARAMS, level='unknown').population_size == 96
+
+def test_optimize_designs_skips_known_ids(engine):
+    params = dict(PARAMS, optimization_level='fast')
+    designs = engine.optimize_designs('HER2', params, 4, rng=np.random.default_rng(2))
+    assert len(designs) == 4
+    assert len({design['design_id'] for design in designs}) == 4
+    
+    skip = {designs[0]['design_id']}
+    again = engine.optimize_designs('HER2', params, 4, rng=np.random.default_rng(2), skip=skip)
+    assert not skip & {design['design_id'] for design in again}
+    assert engine.optimize_designs('HER2', params, 0) == []
+
+def test_annealing_best_matches_scalar_rescore(engine, designs):
+    weights = engine._score_weights(PARAMS)
+    cdrs = dict(designs[0]['cdrs'], H3='LVFFAGNNQQNY', L3='NFGAIL')
+    for t_start in (0.02, 1.0):
+        sampler = AnnealingSampler(engine, PARAMS, np.random.default_rng(5), t_start=t_start, chunk_size=500)
+        refined, best, accepted = sampler.run(cdrs, steps=3000)
+        assert 0 < accepted <= 3000
+        assert best == pytest.approx(expected_fitness(engine, refined, weights), abs=1e-9)
+        assert best >= expected_fitness(engine, cdrs, weights) - 1e-12
+        assert {cdr_type: len(loop) for cdr_type, loop in refined.items()} == {
+            cdr_type: len(loop) for cdr_type, loop in cdrs.items()
+        }
+
+def test_annealing_is_seeded_and_keeps_input(engine, designs):
+    cdrs = dict(designs[1]['cdrs'])
+    runs = [AnnealingSampler(engine, PARAMS, np.random.default_rng(6)).run(cdrs, steps=2000) for _ in range(2)]
+    assert runs[0] == runs[1]
+    assert cdrs == designs[1]['cdrs']
+
+def test_annealing_without_steps_or_loops(engine, designs):
+    weights = engine._score_weights(PARAMS)
+    cdrs = designs[2]['cdrs']
+    refined, best, accepted = AnnealingSampler(engine, PARAMS, np.random.default_rng(0)).run(cdrs, steps=0)
+    assert (refined, accepted) == (cdrs, 0)
+    assert best == pytest.approx(expected_fitness(engine, cdrs, weights), abs=1e-9)
+    
+    empty = {cdr_type: '' for cdr_type in cdrs}
+    refined, best, accepted = AnnealingSampler(engine, PARAMS, np.random.default_rng(0)).run(empty)
+    assert refined == empty and np.isnan(best) and accepted == 0
+
+def test_refine_design_rescores_the_refined_cdrs(engine, designs):
+    design = designs[3]
+    refined = engine.refine_design(design, steps=2000, rng=np.random.default_rng(7))
+    assert refined['antigen_name'] == design['antigen_name']
+    assert refined['heavy_chain'] == engine._assemble_heavy_chain(refined['cdrs'])
+    assert refined['metadata']['params'] == design['metadata']['params']
+
+def cdr_distance(first, second):
+    """Fraction of aligned CDR positions that differ, padding against padding ignored"""
+    differing = compared = 0
+    for cdr_type in first:
+        a, b = first[cdr_type], second[cdr_type]
+        for position in range(max(len(a), len(b))):
+            compared += 1
+            differing += position >= len(a) or position >= len(b) or a[position] != b[position]
+    return differing / max(compared, 1)
+
+def test_select_diverse_is_greedy_max_min(engine, designs):
+    cdr_sets = cdr_sets_of(designs)
+    population = CDRPopulation.from_cdr_sets(engine, cdr_sets)
+    fitness = population_fitness(engine, population, engine._score_weights(PARAMS))
+    rows = select_diverse(population, engine.pad_code, 8, fitness=fitness).tolist()
+    
+    assert rows[0] == int(np.argmax(fitness))
+    for count in range(1, len(rows)):
+        nearest = [
+            min(cdr_distance(cdr_sets[row], cdr_sets[chosen]) for chosen in rows[:count])
+            for row in range(len(cdr_sets))
+        ]
+        assert nearest[rows[count]] == pytest.approx(max(nearest))
+
+def test_select_diverse_respects_min_distance(engine, designs):
+    cdr_sets = cdr_sets_of(designs) + cdr_sets_of(designs[:5])
+    population = CDRPopulation.from_cdr_sets(engine, cdr_sets)
+    rows = select_diverse(population, engine.pad_code, len(cdr_sets), min_distance=0.5).tolist()
+    assert len(rows) == len(set(rows)) < len(cdr_sets)
+    for index, row in enumerate(rows):
+        for other in rows[:index]:
+            assert cdr_distance(cdr_sets[row], cdr_sets[other]) >= 0.5
+    
+    # Exact duplicates are never both picked, even with no minimum
+    rows = select_diverse(population, engine.pad_code, len(cdr_sets), min_distance=1e-9).tolist()
+    assert len({population.keys()[row] for row in rows}) == len(rows)
+    assert select_diverse(population, engine.pad_code, 0).tolist() == []
+    assert select_diverse(population.take([]), engine.pad_code, 3).tolist() == []
+
+def test_ensemble_members_are_spread_apart(engine):
+    ensemble = engine.generate_ensemble('HER2', PARAMS, 6, diversity=0.4, oversample=20, rng=np.random.default_rng(8))
+    assert 0 < len(ensemble) <= 6
+    for index, design in enumerate(ensemble):
+        for other in ensemble[:index]:
+            assert cdr_distance(design['cdrs'], other['cdrs']) >= 0.4
+    assert engine.generate_ensemble('HER2', PARAMS, 0) == []
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from abgenesis.pareto import PARETO_OBJECTIVES, crowding_distance, front_rows, non_dominated_sort, pareto_rank
+from abgenesis.store import DesignStore
+
+def brute_force_fronts(values):
+    """Front index by peeling off non-dominated rows with pairwise checks"""
+    values = np.asarray(values, dtype=np.float64)
+    ranks = np.full(len(values), -1)
+    front = 0
+    while (ranks < 0).any():
+        remaining = np.flatnonzero(ranks < 0)
+        for row in remaining:
+            others = values[remaining]
+            dominated = ((others >= values[row]).all(axis=1) & (others > values[row]).any(axis=1)).any()
+            if not dominated:
+                ranks[row] = front
+        front += 1
+    return ranks
+
+def brute_force_crowding(values, ranks):
+    distance = np.zeros(len(values))
+    for front in np.unique(ranks):
+        rows = np.flatnonzero(ranks == front)
+        for column in range(values.shape[1]):
+            ordered = sorted(rows, key=lambda row: values[row, column])
+            low, high = values[ordered[0], column], values[ordered[-1], column]
+            distance[ordered[0]] = distance[ordered[-1]] = np.inf
+            for previous, row, following in zip(ordered, ordered[1:], ordered[2:]):
+                if high > low:
+                    distance[row] += (values[following, column] - values[previous, column]) / (high - low)
+    return distance
+
+@pytest.mark.parametrize('objectives', [2, 3])
+@pytest.mark.parametrize('levels', [None, 4])
+def test_fronts_match_brute_force(objectives, levels):
+    rng = np.random.default_rng(objectives * 10 + (levels or 0))
+    for n in (1, 2, 7, 60, 250):
+        values = rng.random((n, objectives))
+        if levels is not None:
+            # Few distinct levels give ties and identical rows
+            values = np.floor(values * levels)
+        assert non_dominated_sort(values).tolist() == brute_force_fronts(values).tolist()
+
+def test_identical_rows_share_a_front():
+    values = np.array([[1, 1, 1], [1, 1, 1], [0, 0, 0], [2, 0, 0], [0, 0, 0]])
+    assert non_dominated_sort(values).tolist() == [0, 0, 1, 0, 1]
+
+def test_anticorrelated_rows_form_one_front():
+    x = np.linspace(0, 1, 50)
+    assert (non_dominated_sort(np.column_stack([x, 1 - x])) == 0).all()
+    assert non_dominated_sort(np.column_stack([x, x])).tolist() == list(range(49, -1, -1))
+
+def test_rejects_other_shapes():
+    for values in (np.zeros(5), np.zeros((5, 1)), np.zeros((5, 4))):
+        with pytest.raises(ValueError):
+            non_dominated_sort(values)
+    assert non_dominated_sort(np.zeros((0, 3))).tolist() == []
+
+@pytest.mark.parametrize('levels', [None, 5])
+def test_crowding_matches_brute_force(levels):
+    rng = np.random.default_rng(11)
+    values = rng.random((120, 3))
+    if levels is not None:
+        values = np.floor(values * levels)
+    ranks = non_dominated_sort(values)
+    expected = brute_force_crowding(values, ranks)
+    assert crowding_distance(values, ranks) == pytest.approx(expected)
+
+def test_crowding_boundaries_are_infinite():
+    values = np.array([[0.0, 1.0], [0.5, 0.5], [1.0, 0.0], [0.2, 0.2]])
+    ranks = non_dominated_sort(values)
+    distance = crowding_distance(values, ranks)
+    assert ranks.tolist() == [0, 0, 0, 1]
+    assert np.isinf(distance[[0, 2, 3]]).all()
+    assert distance[1] == pytest.approx(2.0)
+    assert crowding_distance(np.zeros((0, 2)), np.zeros(0, dtype=np.int64)).tolist() == []
+
+def test_front_rows_most_isolated_first():
+    ranks = np.array([0, 1, 0, 0, 1])
+    crowding = np.array([0.5, np.inf, np.inf, 1.5, 0.1])
+    assert front_rows(ranks, crowding, 0).tolist() == [2, 3, 0]
+    assert front_rows(ranks, crowding, 1).tolist() == [1, 4]
+    assert front_rows(ranks, crowding, 2).tolist() == []
+
+def test_pareto_rank_reads_store_scores(designs):
+    store = DesignStore(designs)
+    ranks, crowding = pareto_rank(store)
+    values = np.array([[design['scores'][name] for name in PARETO_OBJECTIVES] for design in designs])
+    assert ranks.tolist() == brute_force_fronts(values).tolist()
+    assert crowding == pytest.approx(brute_force_crowding(values, ranks))
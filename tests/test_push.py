@@ -0,0 +1,86 @@
+import json
+import threading
+
+import pytest
+
+from abgenesis.push import (
+    DesignPusher, GitHubTransport, SimulatedTransport, StubGitHubServer, commit_files, git_blob_sha
+)
+
+@pytest.fixture
+def server():
+    with StubGitHubServer() as server:
+        yield server
+
+def test_blob_sha_matches_git():
+    # git hash-object of "hello\n" and of an empty file
+    assert git_blob_sha('hello\n') == 'ce013625030ba8dba906f756967f9e9ca394464a'
+    assert git_blob_sha('') == 'e69de29bb2d1d6434b8b29ae775ad8c2e48c5391'
+
+def test_commit_file_layouts(designs):
+    files = commit_files(designs[:3])
+    assert sorted(files) == sorted(f"designs/HER2/{design['design_id']}.json" for design in designs[:3])
+    assert json.loads(files[f"designs/HER2/{designs[0]['design_id']}.json"]) == designs[0]
+    
+    (path, text), = commit_files(designs[:3], layout='jsonl').items()
+    assert path.startswith('designs/runs/') and path.endswith('.jsonl')
+    assert [json.loads(line) for line in text.splitlines()] == designs[:3]
+    with pytest.raises(ValueError):
+        commit_files(designs, layout='zip')
+
+def test_transport_commits_on_top_of_head(server, designs):
+    transport = GitHubTransport(server.url, token='secret', blob_workers=3)
+    first = transport.commit('lab/designs', commit_files(designs[:4]), 'First run')
+    second = transport.commit('lab/designs', commit_files(designs[4:6]), 'Second run')
+    assert first != second
+    assert server.log('lab/designs') == ['Second run', 'First run', 'Initial commit']
+    assert server.files('lab/designs') == commit_files(designs[:6])
+
+def test_transport_reports_http_errors(server):
+    transport = GitHubTransport(server.url)
+    with pytest.raises(RuntimeError, match='HTTP 404'):
+        transport.commit('lab/designs', {'a.json': '{}'}, 'Missing branch', branch='nope')
+
+def test_pusher_serializes_commits_per_branch(server, designs):
+    pusher = DesignPusher(GitHubTransport(server.url), max_workers=4)
+    results = []
+    done = threading.Event()
+    
+    def callback(result):
+        results.append(result)
+        if len(results) == 10:
+            done.set()
+    
+    futures = [
+        pusher.push('lab/designs', designs[run * 5:run * 5 + 5], f"Run {run}", callback=callback)
+        for run in range(10)
+    ]
+    outcomes = [future.result() for future in futures]
+    pusher.shutdown()
+    assert done.wait(5)
+    assert all(result['error'] is None and result['files'] == 5 for result in outcomes)
+    # Every commit landed on the branch, none lost to a non-fast-forward update
+    assert len(server.log('lab/designs')) == 11
+    assert server.files('lab/designs') == commit_files(designs)
+
+def test_pusher_returns_errors_in_the_result(server, designs):
+    pusher = DesignPusher(GitHubTransport(server.url))
+    result = pusher.push('lab/designs', designs[:2], 'Run', branch='nope').result()
+    bad_layout = pusher.push('lab/designs', designs[:2], 'Run', layout='zip').result()
+    pusher.shutdown()
+    assert result['commit'] is None and 'HTTP 404' in result['error']
+    assert bad_layout['files'] == 0 and 'Unknown push layout' in bad_layout['error']
+
+def test_stub_rejects_non_fast_forward(server):
+    transport = GitHubTransport(server.url)
+    base = transport.commit('lab/designs', {'a.json': '1'}, 'One')
+    transport.commit('lab/designs', {'b.json': '2'}, 'Two')
+    status, _ = server.handle('PATCH', 'lab/designs', 'refs/heads', 'main', {'sha': base})
+    assert status == 422
+
+def test_simulated_transport_is_deterministic(designs):
+    transport = SimulatedTransport(latency=0)
+    files = commit_files(designs[:2])
+    sha = transport.commit('lab/designs', files, 'Run')
+    assert sha == transport.commit('lab/designs', files, 'Run')
+    assert sha != transport.commit('lab/designs', files, 'Other run')
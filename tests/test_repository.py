@@ -0,0 +1,98 @@
+import copy
+
+import pytest
+
+from abgenesis.repository import DesignRepository
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = DesignRepository(str(tmp_path / 'designs.db'))
+    yield repository
+    repository.close()
+
+def stamped(designs, created):
+    """Copies of designs with metadata.created overridden, in order"""
+    out = []
+    for design, stamp in zip(designs, created):
+        design = copy.deepcopy(design)
+        design['metadata']['created'] = stamp
+        out.append(design)
+    return out
+
+def ids(designs):
+    return [design['design_id'] for design in designs]
+
+def test_add_many_skips_stored_ids(repository, designs):
+    assert repository.add_many(designs[:10], batch_size=3) == 10
+    assert repository.add_many(designs[5:20], batch_size=4) == 10
+    assert repository.add(designs[0]) == 0
+    assert repository.count() == 20
+    assert designs[3]['design_id'] in repository
+    assert 'missing' not in repository
+
+def test_get_round_trips_payload(repository, designs):
+    repository.add_many(designs)
+    assert repository.get(designs[7]['design_id']) == designs[7]
+    assert repository.get('missing') is None
+
+def test_counts_and_antigens(repository, designs):
+    repository.add_many(designs)
+    assert repository.antigens() == ['HER2', 'PD-L1']
+    assert repository.count('HER2') == 30
+    assert repository.count('PD-L1') == 20
+    assert repository.count('EGFR') == 0
+
+def test_recent_and_top_orderings(repository, designs):
+    created = [f'2024-01-01T00:{minute:02d}:00' for minute in range(len(designs))][::-1]
+    designs = stamped(designs, created)
+    repository.add_many(designs)
+    assert ids(repository.recent(5)) == ids(designs[:5])
+    assert ids(repository.recent(2, antigen='PD-L1')) == ids(designs[30:32])
+    best = sorted(designs, key=lambda design: design['scores']['overall'], reverse=True)
+    assert ids(repository.top(5)) == ids(best[:5])
+    her2 = [design for design in best if design['antigen_name'] == 'HER2']
+    assert ids(repository.top(3, antigen='HER2')) == ids(her2[:3])
+    with pytest.raises(ValueError):
+        repository.page(order_by='design_id')
+
+def test_pages_cover_library_once(repository, designs):
+    repository.add_many(designs)
+    paged = []
+    for offset in range(0, len(designs), 7):
+        paged.extend(repository.page(7, offset, order_by='overall', descending=False))
+    assert sorted(ids(paged)) == sorted(ids(designs))
+    scores = [design['scores']['overall'] for design in paged]
+    assert scores == sorted(scores)
+
+def test_keyset_iteration_breaks_created_ties_by_insertion(repository, designs):
+    created = ['2024-01-02'] * 10 + ['2024-01-01'] * 10 + ['2024-01-03'] * 10
+    batch = stamped(designs[:30], created)
+    repository.add_many(batch)
+    expected = ids(batch[10:20] + batch[:10] + batch[20:])
+    for page_size in (1, 4, 10, 1000):
+        assert ids(repository.iter_designs(page_size=page_size)) == expected
+
+def test_query_filters_by_antigen(repository, designs):
+    repository.add_many(designs)
+    query = repository.query('PD-L1', page_size=6)
+    assert len(query) == 20
+    assert sorted(ids(query)) == sorted(ids(designs[30:]))
+    assert not repository.query('EGFR')
+
+def test_delete_and_clear(repository, designs):
+    repository.add_many(designs)
+    assert repository.delete([designs[0]['design_id'], designs[1]['design_id'], 'missing']) == 2
+    assert repository.count() == len(designs) - 2
+    assert designs[0]['design_id'] not in repository
+    repository.clear()
+    assert repository.count() == 0
+    assert list(repository.iter_designs()) == []
+
+def test_reopen_keeps_designs(tmp_path, designs):
+    path = str(tmp_path / 'designs.db')
+    repository = DesignRepository(path)
+    repository.add_many(designs[:5])
+    repository.close()
+    repository = DesignRepository(path)
+    assert ids(repository.iter_designs()) == ids(designs[:5])
+    repository.close()
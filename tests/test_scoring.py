@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from abgenesis.scoring import sequence_scores
+
+def test_hand_computed_scores():
+    # Balanced chain: ideal length, neutral, 4 cysteines, 5% proline, no motifs
+    physics, developability = sequence_scores(0.5, 0.0, 220, 4, 0.05, 0)
+    assert physics == pytest.approx(1.0)
+    assert developability == pytest.approx(0.8)
+    # Short, charged, cysteine-rich, proline-poor, two motif hits (capped at 2)
+    physics, developability = sequence_scores(0.9, -10.0, 100, 8, 0.0, 3)
+    assert physics == pytest.approx(0.5 + 0.2 * 0.6)
+    assert developability == pytest.approx(0.3)
+
+def test_arrays_match_scalars_elementwise():
+    rng = np.random.default_rng(0)
+    n = 500
+    terms = [
+        rng.random(n), rng.normal(0, 6, n), rng.integers(50, 400, n),
+        rng.integers(0, 10, n), rng.random(n) * 0.12, rng.integers(0, 4, n)
+    ]
+    physics, developability = sequence_scores(*terms)
+    for row in range(n):
+        expected = sequence_scores(*(term[row].item() for term in terms))
+        assert (physics[row], developability[row]) == expected
+
+def test_developability_stays_in_unit_interval():
+    _, developability = sequence_scores(
+        np.full(3, 0.5), np.zeros(3), np.full(3, 220), np.array([0, 4, 12]),
+        np.array([0.0, 0.05, 0.5]), np.array([5, 0, 2])
+    )
+    assert developability.tolist() == pytest.approx([0.4, 0.8, 0.3])
+    assert ((developability >= 0) & (developability <= 1)).all()
@@ -0,0 +1,105 @@
+import copy
+
+import numpy as np
+import pytest
+
+from abgenesis.store import SEQUENCE_PARTS, DesignStore
+
+def test_designs_round_trip_exactly(designs):
+    store = DesignStore(designs)
+    assert len(store) == len(designs)
+    assert list(store) == designs
+    assert store[-1] == designs[-1]
+    assert store[2:5] == designs[2:5]
+    with pytest.raises(IndexError):
+        store[len(designs)]
+
+def test_off_layout_designs_are_kept_verbatim(designs):
+    odd = copy.deepcopy(designs[0])
+    odd['design_id'] = 'custom'
+    odd['notes'] = 'hand edited'
+    odd['scores']['overall'] = 'n/a'
+    store = DesignStore([odd])
+    assert store[0] == odd
+    assert np.isnan(store.column('overall')[0])
+
+def test_duplicate_ids_keep_their_row(designs):
+    store = DesignStore(designs[:3])
+    assert store.append(designs[1]) == 1
+    assert store.extend(designs[:5]) == 2
+    assert store.design_ids == [design['design_id'] for design in designs[:5]]
+
+def test_columns_and_sequences(designs):
+    store = DesignStore(designs)
+    assert store.column('overall').tolist() == [design['scores']['overall'] for design in designs]
+    assert store.column('H3_length').tolist() == [len(design['cdrs']['H3']) for design in designs]
+    for row in (0, 17):
+        assert store.sequence(row, 'heavy_chain') == designs[row]['heavy_chain']
+        assert store.sequence(row, 'L2') == designs[row]['cdrs']['L2']
+    assert set(SEQUENCE_PARTS) >= {'heavy_chain', 'light_chain', 'H3'}
+
+def test_antigen_index_and_ordering(designs):
+    store = DesignStore(designs)
+    assert store.antigens == ['HER2', 'PD-L1']
+    her2 = store.rows_for_antigen('HER2')
+    assert [store[row]['antigen_name'] for row in her2.tolist()] == ['HER2'] * len(her2)
+    assert len(store.rows_for_antigen('unknown')) == 0
+    
+    rows = store.query_rows('PD-L1', 'overall')
+    scores = store.column('overall')[rows]
+    assert np.all(scores[:-1] >= scores[1:])
+    assert store.query_rows().tolist() == list(range(len(store)))[::-1]
+
+def test_search_ids(designs):
+    store = DesignStore(designs)
+    target = designs[4]['design_id']
+    fragment = target.split('_', 1)[1][:6]
+    assert target in store.search_ids(fragment)
+    assert store.search_ids(target) == [target]
+    assert len(store.search_ids('ABG2_', limit=7)) == 7
+    
+    # The sorted index follows later appends
+    store = DesignStore(designs[:10])
+    store.search_ids('x')
+    store.extend(designs[10:])
+    assert store.search_ids(target) == [target]
+
+def test_frame_and_subset(designs):
+    store = DesignStore(designs)
+    view = store.subset([3, 1])
+    assert len(view) == 2 and list(view) == [designs[3], designs[1]]
+    assert view.design_ids == [designs[3]['design_id'], designs[1]['design_id']]
+    assert view.column('physics').tolist() == [designs[3]['scores']['physics'], designs[1]['scores']['physics']]
+    
+    frame = view.frame([('Overall', 'overall')])
+    assert list(frame.index) == view.design_ids
+    assert frame['Overall'].tolist() == [designs[3]['scores']['overall'], designs[1]['scores']['overall']]
+
+def test_version_and_fingerprint(designs):
+    store = DesignStore(designs[:10])
+    version, fingerprint = store.cache_key
+    
+    # Known IDs change nothing
+    store.append(designs[0])
+    assert store.cache_key == (version, fingerprint)
+    
+    store.append(designs[10])
+    assert store.version > version and store.fingerprint != fingerprint
+    
+    # Equal contents give equal fingerprints; versions only ever go up
+    assert DesignStore(designs[:11]).fingerprint == store.fingerprint
+    before = store.version
+    store.clear()
+    assert store.version > before and len(store) == 0
+    assert store.fingerprint == DesignStore().fingerprint
+
+def test_view_cache_key(designs):
+    store = DesignStore(designs)
+    assert store.subset([1, 2]).cache_key == store.subset([1, 2]).cache_key
+    assert store.subset([1, 2]).cache_key != store.subset([2, 1]).cache_key
+    assert store.subset([1, 2], token='a').cache_key == store.cache_key + ('a',)
+    
+    view = store.subset([1, 2])
+    key = view.cache_key
+    store.append(designs[0] | {'design_id': 'extra'})
+    assert view.cache_key != key
@@ -0,0 +1,87 @@
+import threading
+
+import numpy as np
+import pytest
+
+from abgenesis.engine import AntibodyDesignEngine
+from abgenesis.timing import StageTimings
+
+from conftest import PARAMS
+
+def test_summary_of_recent_window():
+    timings = StageTimings(window=4)
+    for seconds in (0.010, 0.001, 0.002, 0.003, 0.004):
+        timings.record('scoring', seconds)
+    timings.record('assembly', 0.5)
+    rows = {row['stage']: row for row in timings.summary()}
+    assert timings.stages == ['scoring', 'assembly']
+    # Lifetime count and total, but window statistics without the oldest sample
+    assert rows['scoring']['count'] == 5
+    assert rows['scoring']['total_s'] == 0.02
+    assert rows['scoring']['mean_ms'] == 2.5
+    assert rows['scoring']['p50_ms'] == 2.5
+    assert rows['scoring']['max_ms'] == 4.0
+    assert rows['assembly']['p95_ms'] == 500.0
+
+def test_disabled_and_cleared_timings_are_empty():
+    timings = StageTimings(enabled=False)
+    timings.record('scoring', 0.1)
+    assert timings.summary() == []
+    timings.enabled = True
+    timings.record('scoring', 0.1)
+    timings.clear()
+    assert timings.stages == [] and timings.summary() == []
+
+def test_time_records_when_the_block_raises():
+    timings = StageTimings()
+    with pytest.raises(RuntimeError):
+        with timings.time('render'):
+            raise RuntimeError
+    with timings.time('render'):
+        pass
+    assert timings.summary()[0]['count'] == 2
+
+def test_histogram_spans_recent_samples():
+    timings = StageTimings()
+    for seconds in np.geomspace(1e-5, 1e-1, 50):
+        timings.record('scoring', seconds)
+    edges, counts = timings.histogram('scoring', bins=8)
+    assert len(edges) == 9 and counts.sum() == 50
+    assert edges[0] == pytest.approx(0.01) and edges[-1] == pytest.approx(100.0)
+    timings.record('flat', 0.002)
+    edges, counts = timings.histogram('flat')
+    assert counts.sum() == 1
+    assert timings.histogram('missing')[1].size == 0
+
+def test_concurrent_record_summary_and_clear():
+    timings = StageTimings(window=64)
+    stop = threading.Event()
+    errors = []
+    
+    def writer():
+        while not stop.is_set():
+            timings.record('scoring', 0.001)
+            timings.clear()
+    
+    def reader():
+        try:
+            for _ in range(2000):
+                timings.summary()
+                timings.histogram('scoring')
+        except Exception as error:
+            errors.append(error)
+    
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads[1:]:
+        thread.join()
+    stop.set()
+    threads[0].join()
+    assert errors == []
+
+def test_engine_records_design_stages():
+    timings = StageTimings()
+    engine = AntibodyDesignEngine(timings=timings)
+    engine.generate_antibody_design('HER2', PARAMS, seed=1)
+    assert {'assembly', 'scoring', 'analysis'} <= set(timings.stages)